@@ -1,5 +1,5 @@
 import os
-from pydantic import BaseSettings
+from pydantic_settings import BaseSettings
 from typing import Optional
 
 
@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     WEATHER_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
 
+    # API Base URLs - benchmark için yerel sahte sunuculara yönlendirilebilir
+    GOOGLE_PLACES_BASE_URL: str = "https://maps.googleapis.com/maps/api/place"
+    OPENWEATHERMAP_BASE_URL: str = "http://api.openweathermap.org/data/2.5"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"  # OpenAI uyumlu herhangi bir sunucu olabilir
+
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -36,18 +41,108 @@ class Settings(BaseSettings):
     DEBUG: bool = True
 
     # Chatbot Settings
-    MAX_CONVERSATION_HISTORY: int = 50
+    MAX_CONVERSATION_HISTORY: int = 50  # Konuşma başına sıcak tabloda tutulan en yeni mesaj sayısı
     DEFAULT_FEEDBACK_POINTS: int = 2
     PROMPT_RIGHTS_THRESHOLD: int = 50
 
+    # AI Responses
+    AI_MODEL: str = "gpt-4o-mini"
+    AI_MAX_CONCURRENCY: int = 4  # Aynı anda açık LLM çağrısı, fazlası sırada bekler
+    AI_MAX_TOKENS: int = 300
+    AI_TEMPERATURE: float = 0.7
+    AI_TIMEOUT_SECONDS: float = 30.0
+    AI_CACHE_TTL_SECONDS: int = 60 * 60
+    AI_CACHE_MAX_ENTRIES: int = 2000
+
+    # Message Write-Behind
+    MESSAGE_WRITE_BEHIND_ENABLED: bool = True  # False: her mesaj anında yazılır
+    MESSAGE_WRITE_BEHIND_FLUSH_MS: float = 20.0
+    MESSAGE_WRITE_BEHIND_BATCH_SIZE: int = 500  # Bu kadar mesaj birikince beklemeden yazılır
+
+    # Message Archive
+    MESSAGE_COMPACTION_ENABLED: bool = True
+    MESSAGE_COMPACTION_INTERVAL_SECONDS: int = 10 * 60
+    MESSAGE_COMPACTION_BATCH_SIZE: int = 100  # Bir turda sıkıştırılan konuşma sayısı
+    MESSAGE_ARCHIVE_WINDOW_SECONDS: int = 24 * 60 * 60  # Arşiv bloklarının zaman penceresi
+
     # Travel Planning
     MAX_RECOMMENDATIONS_PER_CATEGORY: int = 3
     DEFAULT_TRIP_DURATION: int = 5
     WEATHER_FORECAST_DAYS: int = 5
+    PLAN_GEO_CLUSTERING: bool = True
+    PLAN_OFF_CLUSTER_PENALTY: float = 15.0  # Günün kümesi dışındaki adaylara puan cezası
+    PLAN_DIVERSITY_PENALTY: float = 5.0  # Gün içinde aynı tipten her önceki seçim için ceza
+
+    # Route Optimization
+    ROUTE_OPTIMIZATION: bool = True
+    ROUTE_SWAP_CANDIDATES: int = 2
+    ROUTE_MIN_SWAP_SAVING_KM: float = 0.5
+    ROUTE_AVERAGE_SPEED_KMH: float = 20.0
+    ROUTE_PROCESS_POOL_MIN_DAYS: int = 7
+    ROUTE_PROCESS_POOL_WORKERS: int = 2
+
+    # Plan Jobs
+    PLAN_JOB_WORKERS: int = 2  # 0: yalnızca ayrı worker süreci çalıştırır
+    PLAN_JOB_POLL_SECONDS: float = 1.0
+    PLAN_JOB_TIMEOUT_SECONDS: int = 10 * 60
+    PLAN_JOB_SWEEP_SECONDS: int = 60  # Zaman aşımına uğramış işlerin yoklanma aralığı
+    PLAN_JOB_MAX_ATTEMPTS: int = 3  # Bu kadar denemede bitmeyen iş başarısız sayılır
 
     # Rate Limiting
     GOOGLE_API_REQUESTS_PER_MINUTE: int = 60
     WEATHER_API_REQUESTS_PER_MINUTE: int = 60
+    AI_REQUESTS_PER_MINUTE: int = 120
+
+    # Outbound HTTP
+    HTTP_POOL_CONNECTIONS: int = 10
+    HTTP_POOL_MAXSIZE: int = 20
+    HTTP_MAX_CONCURRENCY: int = 20
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+
+    # Outbound Governor
+    OUTBOUND_BREAKER_FAILURE_RATE: float = 0.5
+    OUTBOUND_BREAKER_MIN_REQUESTS: int = 10
+    OUTBOUND_BREAKER_WINDOW_SECONDS: float = 60.0
+    OUTBOUND_BREAKER_OPEN_SECONDS: float = 30.0
+    OUTBOUND_MAX_RETRIES: int = 2
+    OUTBOUND_RETRY_BASE_DELAY_MS: float = 200.0
+    OUTBOUND_HEDGING: bool = True
+    OUTBOUND_HEDGE_DELAY_MS: float = 800.0  # Gözlenen p95 daha yüksekse o kullanılır
+
+    # Places Cache
+    PLACES_RESULTS_PER_QUERY: int = 20  # Text search tek sayfada en fazla 20 sonuç döner
+    PLACES_NEXT_PAGE_DELAY_SECONDS: float = 2.0  # next_page_token'ın geçerli olması için bekleme
+    PLACES_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    PLACES_CACHE_MAX_ENTRIES: int = 2000
+    PLACES_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+
+    # Destination Packs
+    DESTINATION_PACK_DIR: Optional[str] = None  # Verilirse en yeni paket açılışta kataloğa yüklenir
+    OFFLINE_MODE: bool = False  # True: istek yolunda dış API çağrısı yapılmaz
+
+    # Warmup
+    WARMUP_ENABLED: bool = True  # Popüler destinasyonlar açılışta ve süresi dolmadan ısıtılır
+    WARMUP_CONCURRENCY: int = 2  # Aynı anda ısıtılan destinasyon sayısı
+    WARMUP_REFRESH_MARGIN_SECONDS: int = 30 * 60  # Places önbelleği bu kadar süre kala yenilenir
+    WARMUP_READY_TIMEOUT_SECONDS: int = 60  # Isıtma bitmese de bu süreden sonra hazır sayılır
+    WARMUP_RETRY_SECONDS: int = 5 * 60  # Başarısız ısıtmanın yeniden deneme aralığı
+
+    # Places Catalog (kalıcı)
+    PLACES_CATALOG_FRESH_SECONDS: int = 24 * 60 * 60
+    PLACES_CATALOG_MAX_STALE_SECONDS: int = 30 * 24 * 60 * 60
+
+    # Weather Cache
+    WEATHER_FORECAST_INTERVAL_SECONDS: int = 3 * 60 * 60  # OpenWeatherMap tahmin adımı
+    WEATHER_FORECAST_PUBLISH_DELAY_SECONDS: int = 10 * 60
+    WEATHER_CURRENT_TTL_SECONDS: int = 10 * 60
+    WEATHER_MIN_TTL_SECONDS: int = 5 * 60
+    WEATHER_CACHE_MAX_ENTRIES: int = 500
+    WEATHER_STALE_TTL_SECONDS: int = 24 * 60 * 60  # API hatasında sunulabilecek en eski veri
+
+    # Plan Cache
+    PLAN_CACHE_TTL_SECONDS: int = 60 * 60
+    PLAN_CACHE_MAX_ENTRIES: int = 500
+    PLAN_CACHE_MAX_BYTES: int = 100 * 1024 * 1024
 
     class Config:
         env_file = ".env"
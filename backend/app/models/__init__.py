@@ -3,6 +3,9 @@ from app.models.conversation import Conversation, Message, TravelFeedback, UserP
 from app.models.trip import Trip, TravelRecommendation, DailyPlan
 from app.models.user import User
 from app.models.feedback import Feedback
+from app.models.place import Place
+from app.models.job import PlanJob
+from app.models.message_archive import MessageArchive
 
 __all__ = [
     "Base",
@@ -14,5 +17,8 @@ __all__ = [
     "TravelRecommendation",
     "DailyPlan",
     "User",
-    "Feedback"
+    "Feedback",
+    "Place",
+    "PlanJob",
+    "MessageArchive"
 ]
\ No newline at end of file
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+from app.utils.database import Base
+
+
+class PlanJob(Base):
+    """
+    Arka planda üretilen seyahat planı işleri
+    """
+    __tablename__ = "plan_jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    user_id = Column(String, nullable=False, index=True)
+
+    # Plan girdileri
+    destination = Column(String, nullable=False)
+    days = Column(Integer, nullable=False)
+    start_date = Column(DateTime, nullable=True)
+    preferences = Column(JSON)
+
+    # Durum
+    status = Column(String, default="queued", nullable=False)  # queued, running, completed, failed
+    progress = Column(JSON)  # {"days_completed": 2, "total_days": 5}
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    worker_id = Column(String)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_plan_jobs_status_created", "status", "created_at"),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "user_id": self.user_id,
+            "destination": self.destination,
+            "days": self.days,
+            "status": self.status,
+            "progress": self.progress or {"days_completed": 0, "total_days": self.days},
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, Index
+from datetime import datetime
+from app.utils.database import Base
+
+
+class MessageArchive(Base):
+    """
+    Sıcak tablodan taşınan eski mesajların sıkıştırılmış arşiv blokları
+
+    Her blok bir konuşmanın bir zaman penceresindeki mesajlarını
+    (timestamp, id) sırasıyla zlib ile sıkıştırılmış JSON olarak tutar.
+    Kalabalık pencereler birden fazla bloğa bölünür.
+    """
+    __tablename__ = "message_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    conversation_id = Column(Integer, nullable=False)
+
+    # Pencere ve içerdiği mesaj aralığı
+    window_start = Column(DateTime, nullable=False)
+    first_timestamp = Column(DateTime, nullable=False)
+    last_timestamp = Column(DateTime, nullable=False)
+    last_message_id = Column(Integer, nullable=False)
+    message_count = Column(Integer, nullable=False)
+
+    payload = Column(LargeBinary, nullable=False)  # zlib(JSON [[id, timestamp, user_message, bot_response], ...])
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_message_archives_conversation_window", "conversation_id", "window_start"),
+    )
@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Float, Index
+from datetime import datetime
+from app.utils.database import Base
+
+
+class Place(Base):
+    """
+    Google Places sonuçlarının kalıcı kataloğu
+    """
+    __tablename__ = "places"
+
+    id = Column(Integer, primary_key=True, index=True)
+    destination_key = Column(String, nullable=False)  # Normalize edilmiş destinasyon
+    category = Column(String, nullable=False)  # restaurant, museum, park, etc.
+    position = Column(Integer, default=0)  # Arama sonucundaki sıra
+
+    # Places API'den normalize edilen alanlar
+    google_place_id = Column(String, index=True)
+    name = Column(String, nullable=False)
+    rating = Column(Float, default=0)
+    price_level = Column(Integer, default=0)
+    address = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    types = Column(JSON)
+    photos = Column(JSON)
+    opening_hours = Column(Boolean, nullable=True)
+
+    # Zaman bilgileri
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_places_destination_category", "destination_key", "category", "position"),
+    )
+
+    def to_dict(self) -> dict:
+        """
+        Kaydı planlayıcının kullandığı yer formatına çevirir
+        """
+        return {
+            "google_place_id": self.google_place_id,
+            "name": self.name,
+            "category": self.category,
+            "rating": self.rating or 0,
+            "price_level": self.price_level or 0,
+            "address": self.address or "",
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "photos": self.photos or [],
+            "opening_hours": self.opening_hours,
+            "types": self.types or []
+        }
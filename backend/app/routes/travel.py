@@ -1,15 +1,117 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 from datetime import datetime
 from sqlalchemy.orm import Session
-from app.utils.database import get_db
-from app.services.travel_planner import TravelPlannerService
-from app.services.chatbot_service import ChatbotService
+from app.utils.database import SessionLocal, get_db
+from app.services.travel_planner import client_plan, travel_planner
+from app.services.chatbot_service import chatbot_service
+from app.services.ai_service import ai_service
+from app.services.conversation_history import decode_cursor, ensure_history_index, iter_history
+from app.services.message_archive import message_archiver
+from app.services.message_writer import message_writer
+from app.services.plan_cache import plan_cache
+from app.services.job_queue import plan_job_queue
+from app.services.destination_pack import load_latest_pack
+from app.services.destinations import POPULAR_DESTINATIONS
+from app.services.warmup import warmup_service
+from app.services.places_service import get_places_cache_stats
+from app.services.weather_service import weather_service
+from app.services.route_optimizer import shutdown_process_pool
+from app.utils.http_client import close_session
+from app.utils.outbound import get_outbound_stats
+from app.config import settings
 
 router = APIRouter(prefix="/travel", tags=["travel"])
 
 
+@router.on_event("startup")
+async def load_destination_pack():
+    """
+    Ayarlıysa en yeni destinasyon paketini yer kataloğuna yükler
+    """
+    if not settings.DESTINATION_PACK_DIR:
+        return
+
+    try:
+        summary = await asyncio.to_thread(load_latest_pack, settings.DESTINATION_PACK_DIR)
+        if summary:
+            print(f"📦 Destinasyon paketi yüklendi: {summary['version']} ({summary['places']} yer)")
+    except Exception as e:
+        print(f"Destinasyon paketi yüklenemedi: {e}")
+
+
+@router.on_event("startup")
+async def prepare_history_storage():
+    """
+    Geçmiş index'ini ve arşiv tablosunu hazırlar, periyodik sıkıştırmayı başlatır
+    """
+    try:
+        await asyncio.to_thread(ensure_history_index)
+        await asyncio.to_thread(message_archiver.ensure_table)
+    except Exception as e:
+        print(f"Geçmiş tabloları hazırlanamadı: {e}")
+        return
+
+    message_archiver.start()
+
+
+@router.on_event("startup")
+async def start_message_writer():
+    """
+    Sohbet mesajlarını toplu yazan kuyruğu başlatır
+    """
+    message_writer.start()
+
+
+@router.on_event("startup")
+async def start_plan_workers():
+    """
+    Uygulama içi plan worker'larını başlatır
+    """
+    plan_job_queue.start(settings.PLAN_JOB_WORKERS)
+
+
+@router.on_event("startup")
+async def start_warmup():
+    """
+    Popüler destinasyonları arka planda ısıtmaya başlar (açılışı bekletmez)
+    """
+    warmup_service.start()
+
+
+@router.on_event("shutdown")
+async def stop_plan_workers():
+    await plan_job_queue.stop()
+
+
+@router.on_event("shutdown")
+async def stop_warmup():
+    await warmup_service.stop()
+
+
+@router.on_event("shutdown")
+async def stop_message_compaction():
+    await message_archiver.stop()
+
+
+@router.on_event("shutdown")
+async def stop_message_writer():
+    await message_writer.stop()
+
+
+@router.on_event("shutdown")
+async def close_outbound_resources():
+    """
+    Rota süreç havuzunu ve HTTP bağlantı havuzunu kapatır (diğer servisler durduktan sonra)
+    """
+    shutdown_process_pool()
+    close_session()
+
+
 # Request Models
 class TravelPlanRequest(BaseModel):
     user_id: str
@@ -27,6 +129,14 @@ class ChatRequest(BaseModel):
     conversation_id: Optional[int] = None
 
 
+class RegeneratePlanRequest(BaseModel):
+    user_id: str
+    day: int
+    time_slot: Optional[str] = None  # Verilmezse tüm gün yeniden oluşturulur
+    exclude_place_ids: Optional[List[str]] = None  # Beğenilmeyen öneriler
+    refresh_weather: bool = False
+
+
 class FeedbackRequest(BaseModel):
     conversation_id: int
     recommendation_id: str
@@ -42,15 +152,36 @@ class FeedbackRequest(BaseModel):
 @router.post("/plan")
 async def create_travel_plan(
         request: TravelPlanRequest,
+        async_: bool = Query(False, alias="async"),
         db: Session = Depends(get_db)
 ):
     """
     Yeni seyahat planı oluşturur
+
+    async=true ile plan kuyruğa alınır ve iş id'si döner.
     """
     try:
-        planner = TravelPlannerService(db)
+        if async_:
+            job_id = await plan_job_queue.enqueue(
+                db,
+                user_id=request.user_id,
+                destination=request.destination,
+                days=request.days,
+                start_date=request.start_date,
+                preferences=request.preferences or {}
+            )
+
+            return JSONResponse(status_code=202, content={
+                "status": "accepted",
+                "data": {
+                    "job_id": job_id,
+                    "status_url": f"/travel/jobs/{job_id}"
+                },
+                "message": f"{request.destination} için planınız hazırlanıyor"
+            })
 
-        result = await planner.generate_travel_plan(
+        result = await travel_planner.generate_travel_plan(
+            db=db,
             user_id=request.user_id,
             destination=request.destination,
             days=request.days,
@@ -58,6 +189,9 @@ async def create_travel_plan(
             preferences=request.preferences or {}
         )
 
+        if result.get("plan"):
+            result = dict(result, plan=client_plan(result["plan"]))
+
         return {
             "status": "success",
             "data": result,
@@ -68,6 +202,99 @@ async def create_travel_plan(
         raise HTTPException(status_code=500, detail=f"Plan oluşturulurken hata: {str(e)}")
 
 
+@router.post("/plan/stream")
+async def stream_travel_plan(
+        request: TravelPlanRequest,
+        format: str = "ndjson",
+        db: Session = Depends(get_db)
+):
+    """
+    Seyahat planını gün gün akış olarak döndürür (NDJSON veya SSE)
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format 'ndjson' veya 'sse' olmalı")
+
+    async def event_stream():
+        async for event in travel_planner.stream_travel_plan(
+                db=db,
+                user_id=request.user_id,
+                destination=request.destination,
+                days=request.days,
+                start_date=request.start_date,
+                preferences=request.preferences or {}
+        ):
+            if format == "sse":
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False, default=str)}\n\n"
+            else:
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+
+@router.get("/jobs/{job_id}")
+async def get_plan_job(
+        job_id: str,
+        db: Session = Depends(get_db)
+):
+    """
+    Arka plandaki plan işinin durumunu getirir
+    """
+    try:
+        job = plan_job_queue.get(db, job_id)
+
+        if not job:
+            raise HTTPException(status_code=404, detail="İş bulunamadı")
+
+        if job.get("result") and job["result"].get("plan"):
+            job["result"] = dict(job["result"], plan=client_plan(job["result"]["plan"]))
+
+        return {
+            "status": "success",
+            "data": job
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"İş durumu getirilirken hata: {str(e)}")
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Dış API çağrıları ve önbellekler için çalışma zamanı metrikleri
+    """
+    return {
+        "status": "success",
+        "data": {
+            "outbound": get_outbound_stats(),
+            "places_cache": get_places_cache_stats(),
+            "weather": weather_service.stats(),
+            "plan_cache": plan_cache.stats(),
+            "warmup": warmup_service.status(),
+            "message_writer": message_writer.stats(),
+            "ai": ai_service.stats()
+        }
+    }
+
+
+@router.get("/ready")
+async def get_readiness():
+    """
+    Yük dengeleyici için hazır olma durumu (ısıtma bitene kadar 503)
+    """
+    status = warmup_service.status()
+
+    return JSONResponse(
+        status_code=200 if status["ready"] else 503,
+        content={
+            "status": "ready" if status["ready"] else "warming",
+            "data": status
+        }
+    )
+
+
 @router.get("/plan/{conversation_id}")
 async def get_travel_plan(
         conversation_id: int,
@@ -108,6 +335,63 @@ async def get_travel_plan(
         raise HTTPException(status_code=500, detail=f"Plan getirilirken hata: {str(e)}")
 
 
+@router.post("/plan/{conversation_id}/regenerate")
+async def regenerate_travel_plan(
+        conversation_id: int,
+        request: RegeneratePlanRequest,
+        db: Session = Depends(get_db)
+):
+    """
+    Kayıtlı planın bir gününü veya zaman dilimini yeniden oluşturur
+    """
+    try:
+        from app.models.conversation import Conversation
+
+        conversation = db.query(Conversation).filter(
+            Conversation.id == conversation_id,
+            Conversation.user_id == request.user_id
+        ).first()
+
+        if not conversation:
+            raise HTTPException(status_code=404, detail="Konuşma bulunamadı")
+
+        if not conversation.travel_plan:
+            raise HTTPException(status_code=404, detail="Bu konuşmada henüz bir plan oluşturulmamış")
+
+        result = await travel_planner.regenerate_plan_fragment(
+            db=db,
+            user_id=request.user_id,
+            travel_plan=conversation.travel_plan,
+            day=request.day,
+            time_slot=request.time_slot,
+            exclude_place_ids=request.exclude_place_ids,
+            refresh_weather=request.refresh_weather
+        )
+
+        if result["status"] != "success":
+            raise HTTPException(status_code=400, detail=result["message"])
+
+        # Yalnızca değişen parçalar yazılır
+        travel_planner.persist_plan_updates(db, conversation, result["updates"])
+
+        return {
+            "status": "success",
+            "data": {
+                "conversation_id": conversation.id,
+                "day": result["day"],
+                "time_slot": result["time_slot"],
+                "daily_plan": result["daily_plan"],
+                "updated_paths": list(result["updates"])
+            },
+            "message": result["message"]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Plan yeniden oluşturulurken hata: {str(e)}")
+
+
 # Chatbot Endpoints
 @router.post("/chat")
 async def chat_with_bot(
@@ -118,9 +402,8 @@ async def chat_with_bot(
     Chatbot ile konuşma
     """
     try:
-        chatbot = ChatbotService(db)
-
-        result = await chatbot.process_message(
+        result = await chatbot_service.process_message(
+            db=db,
             user_id=request.user_id,
             message=request.message,
             conversation_id=request.conversation_id
@@ -132,6 +415,164 @@ async def chat_with_bot(
         raise HTTPException(status_code=500, detail=f"Chatbot hatası: {str(e)}")
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_bot(
+        request: ChatRequest,
+        format: str = "ndjson",
+        db: Session = Depends(get_db)
+):
+    """
+    Chatbot yanıtını akış olarak döndürür (NDJSON veya SSE)
+
+    AI yanıtları token token ("token"), plan üretimi gün gün ("plan_progress")
+    iletilir; son olay /chat ile aynı gövdeyi taşıyan "response" olur. AI akışı
+    yarıda kesilirse "reset" gelir ve o ana kadarki token'lar atılmalıdır.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format 'ndjson' veya 'sse' olmalı")
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def push_progress(progress: Dict):
+        await events.put({"event": "plan_progress", "data": progress})
+
+    async def push_token(token: str):
+        await events.put({"event": "token", "data": {"text": token}})
+
+    async def push_reset():
+        await events.put({"event": "reset", "data": {}})
+
+    async def run_turn():
+        try:
+            result, _ = await chatbot_service.process_turn(
+                db,
+                request.user_id,
+                request.message,
+                request.conversation_id,
+                on_progress=push_progress,
+                on_token=push_token,
+                on_reset=push_reset
+            )
+            await events.put({"event": "response", "data": result})
+        finally:
+            await events.put(None)
+
+    async def event_stream():
+        turn = asyncio.ensure_future(run_turn())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+
+                if format == "sse":
+                    yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False, default=str)}\n\n"
+                else:
+                    yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        finally:
+            # İstemci koparsa tur iptal edilir
+            if not turn.done():
+                turn.cancel()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+
+@router.websocket("/ws/chat")
+async def chat_websocket(
+        websocket: WebSocket,
+        user_id: str,
+        conversation_id: Optional[int] = None
+):
+    """
+    Chatbot ile WebSocket üzerinden konuşma
+
+    İstemci {"message": "..."} gönderir; sunucu plan üretilirken
+    {"type": "plan_progress"}, AI yanıtı üretilirken {"type": "token"} ve
+    her tur sonunda {"type": "response"} iletir. AI akışı yarıda kesilirse
+    {"type": "reset"} gönderilir; o ana kadarki token'lar atılmalıdır.
+    Bağlantı boyunca yalnızca konuşmanın çözülmüş planı bellekte tutulur; her
+    tur kendi oturumunu açar ve puan gibi alanları güncel haliyle okur, böylece
+    boştaki soketler bağlantı havuzunu tutmaz. Mesaj kayıtları yazma kuyruğu
+    üzerinden toplu yazılır.
+    """
+    await websocket.accept()
+
+    async def send(payload: Dict):
+        await websocket.send_text(json.dumps(payload, ensure_ascii=False, default=str))
+
+    if conversation_id is not None:
+        db = SessionLocal()
+        try:
+            owned = chatbot_service.owns_conversation(db, conversation_id, user_id)
+        finally:
+            db.close()
+
+        if not owned:
+            await send({"type": "error", "message": "Konuşma bulunamadı"})
+            await websocket.close(code=1008)
+            return
+
+    # Bağlantıda tutulan plan; None değeri de geçerli olduğu için ayrı bayrakla izlenir
+    travel_plan = None
+    plan_loaded = False
+
+    async def push_progress(progress: Dict):
+        await send({"type": "plan_progress", "data": progress})
+
+    async def push_token(token: str):
+        await send({"type": "token", "data": {"text": token}})
+
+    async def push_reset():
+        await send({"type": "reset"})
+
+    try:
+        while True:
+            try:
+                payload = json.loads(await websocket.receive_text())
+                message = payload["message"]
+            except (ValueError, TypeError, KeyError):
+                await send({"type": "error", "message": "Geçersiz mesaj: JSON içinde \"message\" alanı olmalı"})
+                continue
+
+            db = SessionLocal()
+            # Tur sonundaki commit planı yeniden okutmasın
+            db.expire_on_commit = False
+            try:
+                conversation = None
+                if conversation_id is not None:
+                    if plan_loaded:
+                        conversation = chatbot_service.get_conversation_with_plan(
+                            db, conversation_id, user_id, travel_plan
+                        )
+                    else:
+                        conversation = chatbot_service.get_conversation(db, conversation_id, user_id)
+
+                result, turn_conversation = await chatbot_service.process_turn(
+                    db,
+                    user_id,
+                    message,
+                    conversation_id,
+                    conversation,
+                    push_progress,
+                    push_token,
+                    push_reset
+                )
+
+                # Hatalı turda önceki durum korunur
+                if turn_conversation is not None:
+                    conversation_id = turn_conversation.id
+                    travel_plan = turn_conversation.travel_plan
+                    plan_loaded = True
+            finally:
+                db.close()
+
+            await send(dict(result, type="response"))
+
+    except WebSocketDisconnect:
+        pass
+
+
 @router.post("/feedback")
 async def submit_feedback(
         request: FeedbackRequest,
@@ -207,23 +648,54 @@ async def submit_feedback(
 async def get_conversation_history(
         conversation_id: int,
         user_id: str,
+        limit: int = Query(50, ge=1, le=500),
+        cursor: Optional[str] = None,
+        format: str = "json",
         db: Session = Depends(get_db)
 ):
     """
     Konuşma geçmişini getirir
+
+    json: imleçli sayfalar (next_cursor ile devam edilir), ndjson: tüm geçmiş akış olarak
     """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format 'json' veya 'ndjson' olmalı")
+
     try:
-        chatbot = ChatbotService(db)
-        history = await chatbot.get_conversation_history(conversation_id, user_id)
+        # Kuyrukta bekleyen son mesajlar da geçmişte görünsün
+        await message_writer.flush()
+
+        if format == "ndjson":
+            if not chatbot_service.owns_conversation(db, conversation_id, user_id):
+                raise HTTPException(status_code=404, detail="Konuşma bulunamadı")
+
+            if cursor:
+                decode_cursor(cursor)
+
+            # Senkron üreteç thread havuzunda tüketilir, sayfalar sırayla okunur
+            def history_stream():
+                for entry in iter_history(db, conversation_id, limit, cursor):
+                    yield json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+            return StreamingResponse(history_stream(), media_type="application/x-ndjson")
+
+        page = await chatbot_service.get_conversation_history(db, conversation_id, user_id, limit, cursor)
+        if page is None:
+            raise HTTPException(status_code=404, detail="Konuşma bulunamadı")
 
         return {
             "status": "success",
             "data": {
                 "conversation_id": conversation_id,
-                "history": history
+                "history": page["history"],
+                "next_cursor": page["next_cursor"]
             }
         }
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Geçmiş getirilirken hata: {str(e)}")
 
@@ -237,8 +709,7 @@ async def get_user_stats(
     Kullanıcı istatistiklerini getirir
     """
     try:
-        chatbot = ChatbotService(db)
-        stats = await chatbot.get_user_stats(user_id)
+        stats = await chatbot_service.get_user_stats(db, user_id)
 
         return {
             "status": "success",
@@ -337,34 +808,7 @@ async def get_popular_destinations():
     """
     Popüler destinasyonları getirir
     """
-    popular_destinations = [
-        {
-            "name": "Bakü",
-            "country": "Azerbaycan",
-            "description": "Hazar Denizi kıyısındaki modern şehir",
-            "image": "baku.jpg",
-            "recommended_days": 5,
-            "best_season": "Nisan-Ekim"
-        },
-        {
-            "name": "İstanbul",
-            "country": "Türkiye",
-            "description": "İki kıtanın buluştuğu tarih şehri",
-            "image": "istanbul.jpg",
-            "recommended_days": 4,
-            "best_season": "Mart-Kasım"
-        },
-        {
-            "name": "Paris",
-            "country": "Fransa",
-            "description": "Aşk ve sanat şehri",
-            "image": "paris.jpg",
-            "recommended_days": 6,
-            "best_season": "Nisan-Ekim"
-        }
-    ]
-
     return {
         "status": "success",
-        "data": popular_destinations
+        "data": POPULAR_DESTINATIONS
     }
\ No newline at end of file
@@ -1,38 +1,34 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+
+from app.services.weather_service import weather_service
 
 router = APIRouter(prefix="/weather", tags=["weather"])
 
 
+@router.get("/test")
+async def weather_test():
+    return {"message": "Weather route çalışıyor!"}
+
+
 @router.get("/{city}")
 async def get_weather(city: str):
     """Şehir için hava durumu"""
 
-    return {
-        "city": city,
-        "temperature": 22,
-        "description": "güneşli",
-        "humidity": 65,
-        "wind_speed": 3.2,
-        "feels_like": 25,
-        "note": "Test verisi"
-    }
+    weather = await weather_service.get_current_weather(city)
+
+    if "error" in weather:
+        raise HTTPException(status_code=503, detail=weather["error"])
+
+    return weather
 
 
 @router.get("/forecast/{city}")
 async def get_forecast(city: str):
     """5 günlük hava durumu tahmini"""
 
-    forecast = []
-    for i in range(5):
-        forecast.append({
-            "date": f"2025-07-{14 + i}",
-            "temperature": 20 + i,
-            "description": "parçalı bulutlu"
-        })
+    try:
+        forecast = await weather_service.get_daily_forecast(city)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Hava durumu tahmini alınamadı: {str(e)}")
 
     return {"city": city, "forecast": forecast}
-
-
-@router.get("/test")
-async def weather_test():
-    return {"message": "Weather route çalışıyor!"}
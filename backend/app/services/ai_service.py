@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import get_settings
+from app.utils.cache import TTLCache
+from app.utils.http_client import get_session
+from app.utils.outbound import LatencyHistogram, ThrottledError, get_governor
+
+settings = get_settings()
+
+CHAT_COMPLETIONS_URL = f"{settings.OPENAI_BASE_URL}/chat/completions"
+
+SYSTEM_PROMPT = (
+    "Sen Your Way Ally adlı bir seyahat asistanısın. Kullanıcıya Türkçe, kısa ve "
+    "somut yanıtlar ver. Bilmediğin bir bilgiyi uydurma."
+)
+
+# Akışın bittiğini tüketiciye bildiren işaret
+_END = object()
+
+
+def normalize_prompt(message: str) -> str:
+    """
+    Önbellek anahtarı için mesajı sadeleştirir (büyük/küçük harf, boşluk ve sondaki noktalama farkı yok)
+    """
+    return " ".join(message.casefold().split()).rstrip("?!. ")
+
+
+class AIService:
+    """
+    OpenAI uyumlu sohbet API'si üzerinden yanıt üreten servis
+
+    Yanıtlar token token akış olarak alınır, böylece kullanıcı ilk token'ı
+    tüm yanıtı beklemeden görür. Aynı anda açık çağrı sayısı sınırlanır ve
+    tamamlanan yanıtlar normalize mesaj + konuşma bağlamı anahtarıyla saklanır.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(
+            ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+            max_entries=settings.AI_CACHE_MAX_ENTRIES
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._first_token = LatencyHistogram()
+        self._stats = {"requests": 0, "errors": 0, "in_flight": 0}
+
+    def is_enabled(self) -> bool:
+        return bool(settings.OPENAI_API_KEY) and not settings.OFFLINE_MODE
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        return self._semaphore
+
+    def cache_key(self, message: str, context: Optional[Dict] = None) -> str:
+        raw = json.dumps({"prompt": normalize_prompt(message), "context": context or {}}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def build_messages(self, message: str, context: Optional[Dict] = None) -> List[Dict]:
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+
+        if context and context.get("destination"):
+            trip = f"Kullanıcının planladığı seyahat: {context['destination']}"
+            if context.get("days"):
+                trip += f", {context['days']} gün"
+            if context.get("has_plan"):
+                trip += " (plan hazır)"
+            messages.append({"role": "system", "content": trip})
+
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    async def stream(self, message: str, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        """
+        Yanıtı geldikçe parça parça üretir; önbellekteki yanıt tek parça döner
+        """
+        key = self.cache_key(message, context)
+        cached = self._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        payload = {
+            "model": settings.AI_MODEL,
+            "messages": self.build_messages(message, context),
+            "max_tokens": settings.AI_MAX_TOKENS,
+            "temperature": settings.AI_TEMPERATURE,
+            "stream": True
+        }
+
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            cancelled = threading.Event()
+            opened: Dict = {}
+            workers: List[asyncio.Future] = []
+            started = time.monotonic()
+            parts = []
+
+            self._stats["requests"] += 1
+            self._stats["in_flight"] += 1
+
+            # requests senkron olduğu için bağlantı ve akış thread'lerde yürür; görevler
+            # saklanır ki semafor tüm thread'ler bitmeden bırakılmasın
+            def run_in_thread(func, *args) -> asyncio.Future:
+                worker = asyncio.ensure_future(asyncio.to_thread(func, *args))
+                workers.append(worker)
+                return asyncio.shield(worker)
+
+            try:
+                # Bağlantı sağlayıcı yöneticisinden geçer (limit, devre kesici, tekrar);
+                # aynı yanıt iki kez akmasın diye hedging kapalıdır
+                response = await get_governor("openai").call(
+                    lambda: run_in_thread(self._open_stream, payload, opened, cancelled),
+                    hedge=False
+                )
+                run_in_thread(self._read_stream, response, loop, queue, cancelled)
+
+                while True:
+                    item = await queue.get()
+                    if item is _END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+
+                    if not parts:
+                        self._first_token.record((time.monotonic() - started) * 1000)
+                    parts.append(item)
+                    yield item
+
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+
+            finally:
+                # Tüketici erken bırakırsa bağlantı buradan kapatılır, okuyan thread
+                # bloklandığı satırdan çıkar; semafor thread'ler bitince bırakılır
+                cancelled.set()
+                if opened.get("response") is not None:
+                    opened["response"].close()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self._stats["in_flight"] -= 1
+
+        text = "".join(parts)
+        if text.strip():
+            self._cache.set(key, text)
+
+    def _open_stream(self, payload: Dict, opened: Dict, cancelled: threading.Event):
+        """
+        Akışlı isteği açar; durum kodu hatalıysa bağlantıyı kapatıp hata fırlatır
+        """
+        response = get_session().post(
+            CHAT_COMPLETIONS_URL,
+            json=payload,
+            headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+            stream=True,
+            timeout=settings.AI_TIMEOUT_SECONDS
+        )
+        opened["response"] = response
+
+        try:
+            if response.status_code == 429:
+                raise ThrottledError(f"HTTP 429: {CHAT_COMPLETIONS_URL}")
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+
+        # Bağlantı kurulurken tüketici vazgeçtiyse açık bağlantı bırakılmaz
+        if cancelled.is_set():
+            response.close()
+
+        return response
+
+    def _read_stream(
+            self,
+            response,
+            loop: asyncio.AbstractEventLoop,
+            queue: asyncio.Queue,
+            cancelled: threading.Event
+    ):
+        """
+        SSE akışını okuyup her içerik parçasını event loop'taki kuyruğa koyar
+        """
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop kapanmışsa okuyacak kimse kalmamıştır
+                cancelled.set()
+
+        try:
+            with response:
+                for line in response.iter_lines():
+                    if cancelled.is_set():
+                        return
+                    if not line.startswith(b"data:"):
+                        continue
+
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+
+                    choices = json.loads(data).get("choices") or []
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        put(content)
+
+            put(_END)
+
+        except Exception as e:
+            # Bağlantı tüketici tarafından kapatıldıysa hata kimseye iletilmez
+            if not cancelled.is_set():
+                put(e)
+
+    async def complete(self, message: str, context: Optional[Dict] = None) -> str:
+        """
+        Akışı sonuna kadar okuyup tüm yanıtı döndürür
+        """
+        return "".join([part async for part in self.stream(message, context)])
+
+    def stats(self) -> Dict:
+        return dict(
+            self._stats,
+            enabled=self.is_enabled(),
+            cache=self._cache.stats(),
+            first_token=self._first_token.snapshot()
+        )
+
+
+# Süreç genelinde paylaşılan AI servisi
+ai_service = AIService()
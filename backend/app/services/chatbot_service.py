@@ -1,47 +1,52 @@
-import re
-import json
+import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from sqlalchemy.orm import Session
-from app.models.conversation import Conversation, Message, TravelFeedback, UserPreference
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.conversation import Conversation, TravelFeedback, UserPreference
 from app.models.trip import Trip
-from app.services.travel_planner import TravelPlannerService
+from app.services.travel_planner import TravelPlannerService, client_plan, travel_planner
+from app.services.ai_service import ai_service
+from app.services.intent_classifier import intent_classifier
+from app.services.conversation_history import fetch_history_page
+from app.services.message_writer import message_writer
+
+
+GREETINGS = [
+    "Merhaba! Size nasıl yardımcı olabilirim? 🌍",
+    "Selam! Hangi şehre seyahat etmek istiyorsunuz? ✈️",
+    "Hey! Size harika bir seyahat planı hazırlayabilirim. Nereye gitmek istiyorsunuz?"
+]
+
+GENERAL_RESPONSES = [
+    "Anlayabilmek için biraz daha detay verebilir misiniz? 🤔",
+    "Size nasıl yardımcı olabilirim? Seyahat planı oluşturmak ister misiniz? ✈️",
+    "Daha spesifik bir soru sorabilir misiniz? Örneğin hangi şehre seyahat etmek istiyorsunuz? 🌍"
+]
+
+USER_LEVELS = [
+    {"level": 1, "name": "Yeni Gezgin", "min_score": 0},
+    {"level": 2, "name": "Deneyimli Gezgin", "min_score": 100},
+    {"level": 3, "name": "Seyahat Uzmanı", "min_score": 300},
+    {"level": 4, "name": "Seyahat Gurusu", "min_score": 600},
+    {"level": 5, "name": "Dünya Gezgini", "min_score": 1000}
+]
 
 
 class ChatbotService:
     """
     Chatbot mantığını yöneten servis
+
+    Süreç başına tek örnek kullanılır (chatbot_service); veritabanı oturumu
+    isteğe aittir ve her çağrıda parametre olarak verilir.
     """
 
-    def __init__(self, db: Session):
-        self.db = db
-        self.travel_planner = TravelPlannerService(db)
-
-        # Intent tanımlama patterns
-        self.intent_patterns = {
-            "travel_request": [
-                r"(\w+)(\s+için|\s+ye|\s+ya|\s+da|\s+de).*?(\d+)\s*gün",
-                r"(\d+)\s*gün.*?(\w+)(\s+seyahat|\s+gitmek|\s+gideceğim)",
-                r"(\w+)\s+(\d+)\s*günlük\s*plan"
-            ],
-            "feedback": [
-                r"(beğendim|güzel|harika|mükemmel|süper)",
-                r"(beğenmedim|kötü|berbat|hiç iyi değil)",
-                r"(\d+)\s*(puan|yıldız|star)"
-            ],
-            "question": [
-                r"(nedir|nasıl|ne zaman|nerede|kim|hangi)",
-                r"\?",
-                r"(önerir misin|tavsiye|öneri)"
-            ],
-            "greeting": [
-                r"(merhaba|selam|hey|hi|hello)",
-                r"(nasılsın|naber|ne var ne yok)"
-            ]
-        }
+    def __init__(self, planner: TravelPlannerService):
+        self.travel_planner = planner
 
     async def process_message(
             self,
+            db: Session,
             user_id: str,
             message: str,
             conversation_id: Optional[int] = None
@@ -49,113 +54,93 @@ class ChatbotService:
         """
         Kullanıcı mesajını işler ve uygun yanıt üretir
         """
+        result, _ = await self.process_turn(db, user_id, message, conversation_id)
+        return result
+
+    async def process_turn(
+            self,
+            db: Session,
+            user_id: str,
+            message: str,
+            conversation_id: Optional[int] = None,
+            conversation: Optional[Conversation] = None,
+            on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None,
+            on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+            on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Tuple[Dict, Optional[Conversation]]:
+        """
+        Bir sohbet turunu işler, yanıtla birlikte turdaki konuşmayı döndürür
+
+        Bağlantı boyunca açık kalan istemciler (WebSocket) önceki turdan kalan
+        konuşmayı verir; böylece her mesajda konuşma ve planı yeniden okunmaz.
+        on_progress plan ilerlemesini, on_token AI yanıtının parçalarını alır;
+        akış yarıda kesilirse gönderilen parçaların atılması için on_reset çağrılır.
+        """
         try:
             # Intent'i tespit et
             intent, entities = self._detect_intent(message)
 
             # Konuşmayı al veya oluştur
-            conversation = await self._get_or_create_conversation(
-                user_id, conversation_id, entities
-            )
+            if conversation is None or conversation.user_id != user_id:
+                conversation = await self._get_or_create_conversation(
+                    db, user_id, conversation_id, entities
+                )
 
             # Intent'e göre yanıt üret
             response = await self._generate_response(
-                intent, entities, conversation, message
+                db, intent, entities, conversation, message, on_progress, on_token, on_reset
             )
 
-            # Mesajı kaydet
-            await self._save_message(conversation.id, message, response["message"])
+            # Turun tüm değişiklikleri tek işlemde yazılır (yeni konuşmanın id'si burada atanır)
+            db.flush()
+            saved_conversation_id = conversation.id
+            db.commit()
+
+            data = response.get("data")
+            if isinstance(data, dict) and "conversation_id" in data:
+                data["conversation_id"] = saved_conversation_id
+
+            # Mesaj kaydı arka planda toplu yazılır
+            await self._save_message(saved_conversation_id, message, response["message"])
 
             return {
                 "status": "success",
-                "conversation_id": conversation.id,
+                "conversation_id": saved_conversation_id,
                 "intent": intent,
                 "response": response["message"],
                 "data": response.get("data"),
                 "suggestions": response.get("suggestions", [])
-            }
+            }, conversation
 
         except Exception as e:
+            db.rollback()
             return {
                 "status": "error",
                 "message": f"Üzgünüm, bir hata oluştu: {str(e)}",
                 "conversation_id": conversation_id
-            }
+            }, None
 
     def _detect_intent(self, message: str) -> Tuple[str, Dict]:
         """
         Mesajdan intent ve entity'leri çıkarır
         """
-        message_lower = message.lower()
-        entities = {}
-
-        # Seyahat talebi kontrolü
-        for pattern in self.intent_patterns["travel_request"]:
-            match = re.search(pattern, message_lower)
-            if match:
-                groups = match.groups()
-
-                # Destinasyon ve gün sayısını çıkar
-                for group in groups:
-                    if group and group.isdigit():
-                        entities["days"] = int(group)
-                    elif group and not group.isdigit() and len(group) > 2:
-                        # Bağlaç olmayan kelimeleri destinasyon olarak al
-                        if group not in ["için", "ye", "ya", "da", "de", "seyahat", "gitmek", "gideceğim", "günlük",
-                                         "plan"]:
-                            entities["destination"] = group.title()
-
-                if "days" in entities and "destination" in entities:
-                    return "travel_request", entities
-
-        # Feedback kontrolü
-        for pattern in self.intent_patterns["feedback"]:
-            if re.search(pattern, message_lower):
-                # Puanlama varsa çıkar
-                rating_match = re.search(r"(\d+)\s*(puan|yıldız|star)", message_lower)
-                if rating_match:
-                    entities["rating"] = int(rating_match.group(1))
-
-                # Pozitif/negatif sentiment
-                if any(word in message_lower for word in ["beğendim", "güzel", "harika", "mükemmel", "süper"]):
-                    entities["sentiment"] = "positive"
-                    if "rating" not in entities:
-                        entities["rating"] = 5
-                elif any(word in message_lower for word in ["beğenmedim", "kötü", "berbat", "hiç iyi değil"]):
-                    entities["sentiment"] = "negative"
-                    if "rating" not in entities:
-                        entities["rating"] = 1
-
-                return "feedback", entities
-
-        # Soru kontrolü
-        for pattern in self.intent_patterns["question"]:
-            if re.search(pattern, message_lower):
-                return "question", entities
-
-        # Selamlama kontrolü
-        for pattern in self.intent_patterns["greeting"]:
-            if re.search(pattern, message_lower):
-                return "greeting", entities
-
-        # Varsayılan
-        return "general", entities
+        return intent_classifier.classify(message)
 
     async def _get_or_create_conversation(
             self,
+            db: Session,
             user_id: str,
             conversation_id: Optional[int],
             entities: Dict
     ) -> Conversation:
         """
         Konuşmayı alır veya yeni oluşturur
+
+        Yeni konuşma yalnızca oturuma eklenir; plan üretilirken SQLite yazma
+        kilidi tutulmasın diye tur sonundaki commit'te yazılır.
         """
         if conversation_id:
-            conversation = self.db.query(Conversation).filter(
-                Conversation.id == conversation_id,
-                Conversation.user_id == user_id
-            ).first()
-
+            conversation = self.get_conversation(db, conversation_id, user_id)
             if conversation:
                 return conversation
 
@@ -164,21 +149,25 @@ class ChatbotService:
             user_id=user_id,
             destination=entities.get("destination", ""),
             days=entities.get("days", 0),
+            total_score=0,
+            prompt_rights=0,
             is_active=True
         )
 
-        self.db.add(conversation)
-        self.db.commit()
-        self.db.refresh(conversation)
+        db.add(conversation)
 
         return conversation
 
     async def _generate_response(
             self,
+            db: Session,
             intent: str,
             entities: Dict,
             conversation: Conversation,
-            original_message: str
+            original_message: str,
+            on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None,
+            on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+            on_reset: Optional[Callable[[], Awaitable[None]]] = None
     ) -> Dict:
         """
         Intent'e göre yanıt üretir
@@ -187,30 +176,23 @@ class ChatbotService:
             return await self._handle_greeting()
 
         elif intent == "travel_request":
-            return await self._handle_travel_request(entities, conversation)
+            return await self._handle_travel_request(db, entities, conversation, on_progress)
 
         elif intent == "feedback":
-            return await self._handle_feedback(entities, conversation, original_message)
+            return await self._handle_feedback(db, entities, conversation, original_message)
 
         elif intent == "question":
-            return await self._handle_question(original_message, conversation)
+            return await self._handle_question(original_message, conversation, on_token, on_reset)
 
         else:
-            return await self._handle_general(original_message, conversation)
+            return await self._handle_general(original_message, conversation, on_token, on_reset)
 
     async def _handle_greeting(self) -> Dict:
         """
         Selamlama mesajlarını yanıtlar
         """
-        greetings = [
-            "Merhaba! Size nasıl yardımcı olabilirim? 🌍",
-            "Selam! Hangi şehre seyahat etmek istiyorsunuz? ✈️",
-            "Hey! Size harika bir seyahat planı hazırlayabilirim. Nereye gitmek istiyorsunuz?"
-        ]
-
-        import random
         return {
-            "message": random.choice(greetings),
+            "message": random.choice(GREETINGS),
             "suggestions": [
                 "Bakü'ye 5 gün seyahat edeceğim",
                 "İstanbul'da 3 günlük plan yap",
@@ -218,7 +200,13 @@ class ChatbotService:
             ]
         }
 
-    async def _handle_travel_request(self, entities: Dict, conversation: Conversation) -> Dict:
+    async def _handle_travel_request(
+            self,
+            db: Session,
+            entities: Dict,
+            conversation: Conversation,
+            on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None
+    ) -> Dict:
         """
         Seyahat talebi işler
         """
@@ -235,28 +223,28 @@ class ChatbotService:
                 ]
             }
 
-        # Konuşmayı güncelle
+        # Konuşmayı güncelle (tur sonunda yazılır)
         conversation.destination = destination
         conversation.days = days
-        self.db.commit()
 
         # Seyahat planı oluştur
         plan_result = await self.travel_planner.generate_travel_plan(
+            db=db,
             user_id=conversation.user_id,
             destination=destination,
             days=days,
-            start_date=datetime.now() + timedelta(days=7)  # 1 hafta sonra varsayılan
+            start_date=datetime.now() + timedelta(days=7),  # 1 hafta sonra varsayılan
+            on_progress=on_progress
         )
 
         if plan_result["status"] == "success":
             # Planı konuşmaya kaydet
             conversation.travel_plan = plan_result["plan"]
-            self.db.commit()
 
             return {
                 "message": f"Harika! {destination} için {days} günlük seyahat planınızı hazırladım! 🎉\n\nPlanınızda toplam {plan_result['plan']['summary']['total_recommendations']} öneri var. Her öneri için geri bildirimde bulunarak beni eğitebilir ve puan kazanabilirsiniz! 🌟",
                 "data": {
-                    "travel_plan": plan_result["plan"],
+                    "travel_plan": client_plan(plan_result["plan"]),
                     "conversation_id": conversation.id
                 },
                 "suggestions": [
@@ -275,7 +263,7 @@ class ChatbotService:
                 ]
             }
 
-    async def _handle_feedback(self, entities: Dict, conversation: Conversation, message: str) -> Dict:
+    async def _handle_feedback(self, db: Session, entities: Dict, conversation: Conversation, message: str) -> Dict:
         """
         Geri bildirim işler
         """
@@ -297,7 +285,7 @@ class ChatbotService:
             comment=message
         )
 
-        self.db.add(feedback)
+        db.add(feedback)
 
         # Puan hesapla ve ekle
         points_earned = rating * 2  # Her puan için 2 puan
@@ -309,8 +297,6 @@ class ChatbotService:
             new_prompt_rights = 1
             conversation.prompt_rights += 1
 
-        self.db.commit()
-
         response_message = f"Geri bildiriminiz için teşekkürler! {points_earned} puan kazandınız. 🎁\n\nToplam puanınız: {conversation.total_score}"
 
         if new_prompt_rights > 0:
@@ -330,9 +316,15 @@ class ChatbotService:
             ]
         }
 
-    async def _handle_question(self, message: str, conversation: Conversation) -> Dict:
+    async def _handle_question(
+            self,
+            message: str,
+            conversation: Conversation,
+            on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+            on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Dict:
         """
-        Genel soruları yanıtlar
+        Genel soruları yanıtlar (plandan cevaplanamayanlar AI'a gider)
         """
         message_lower = message.lower()
 
@@ -355,72 +347,141 @@ class ChatbotService:
             }
 
         # Genel seyahat soruları
-        else:
-            return {
-                "message": "Bu konuda size daha iyi yardımcı olabilmek için önce bir seyahat planı oluşturalım. Hangi şehre kaç gün seyahat etmek istiyorsunuz?",
-                "suggestions": [
-                    "Bakü'ye 5 gün",
-                    "İstanbul'a 3 gün",
-                    "Seyahat tavsiyeleri"
-                ]
-            }
+        return await self._ai_response(message, conversation, {
+            "message": "Bu konuda size daha iyi yardımcı olabilmek için önce bir seyahat planı oluşturalım. Hangi şehre kaç gün seyahat etmek istiyorsunuz?",
+            "suggestions": [
+                "Bakü'ye 5 gün",
+                "İstanbul'a 3 gün",
+                "Seyahat tavsiyeleri"
+            ]
+        }, on_token, on_reset)
 
-    async def _handle_general(self, message: str, conversation: Conversation) -> Dict:
+    async def _handle_general(
+            self,
+            message: str,
+            conversation: Conversation,
+            on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+            on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Dict:
         """
         Genel mesajları işler
         """
-        responses = [
-            "Anlayabilmek için biraz daha detay verebilir misiniz? 🤔",
-            "Size nasıl yardımcı olabilirim? Seyahat planı oluşturmak ister misiniz? ✈️",
-            "Daha spesifik bir soru sorabilir misiniz? Örneğin hangi şehre seyahat etmek istiyorsunuz? 🌍"
-        ]
-
-        import random
-        return {
-            "message": random.choice(responses),
+        return await self._ai_response(message, conversation, {
+            "message": random.choice(GENERAL_RESPONSES),
             "suggestions": [
                 "Seyahat planı oluştur",
                 "Popüler destinasyonlar",
                 "Yardım"
             ]
+        }, on_token, on_reset)
+
+    async def _ai_response(
+            self,
+            message: str,
+            conversation: Conversation,
+            fallback: Dict,
+            on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+            on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Dict:
+        """
+        Yanıtı AI'dan akış olarak üretir; AI kapalıysa veya hata verirse hazır yanıt döner
+
+        Akış parçalar gönderildikten sonra kesilirse hazır yanıttan önce on_reset
+        çağrılır; istemci yarım metni atar, geçmişe yalnızca hazır yanıt yazılır.
+        """
+        if not ai_service.is_enabled():
+            return fallback
+
+        context = {
+            "destination": conversation.destination or None,
+            "days": conversation.days or None,
+            "has_plan": bool(conversation.travel_plan)
         }
 
+        parts = []
+        stream = ai_service.stream(message, context)
+        try:
+            async for token in stream:
+                parts.append(token)
+                if on_token is not None:
+                    await on_token(token)
+        except Exception as e:
+            print(f"AI yanıtı alınamadı: {e}")
+            if parts and on_reset is not None:
+                await on_reset()
+            return fallback
+        finally:
+            # İstemci koptuysa akış hemen kapatılır, eş zamanlılık kotası boşalır
+            await stream.aclose()
+
+        text = "".join(parts).strip()
+        if not text:
+            if parts and on_reset is not None:
+                await on_reset()
+            return fallback
+
+        return dict(fallback, message=text)
+
     async def _save_message(self, conversation_id: int, user_message: str, bot_response: str):
         """
-        Mesajı veritabanına kaydeder
+        Mesajı yazma kuyruğuna ekler, birkaç milisaniyede bir toplu yazılır
         """
-        message = Message(
-            conversation_id=conversation_id,
-            user_message=user_message,
-            bot_response=bot_response,
-            timestamp=datetime.utcnow()
-        )
+        await message_writer.enqueue(conversation_id, user_message, bot_response)
 
-        self.db.add(message)
-        self.db.commit()
+    async def get_conversation_history(
+            self,
+            db: Session,
+            conversation_id: int,
+            user_id: str,
+            limit: int = 50,
+            cursor: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Konuşma geçmişinin bir sayfasını getirir, konuşma kullanıcının değilse None döner
+        """
+        if not self.owns_conversation(db, conversation_id, user_id):
+            return None
+
+        return fetch_history_page(db, conversation_id, limit, cursor)
+
+    def get_conversation(self, db: Session, conversation_id: int, user_id: str) -> Optional[Conversation]:
+        return db.query(Conversation).filter(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        ).first()
 
-    async def get_conversation_history(self, conversation_id: int, user_id: str) -> List[Dict]:
+    def get_conversation_with_plan(
+            self,
+            db: Session,
+            conversation_id: int,
+            user_id: str,
+            travel_plan: Optional[Dict]
+    ) -> Optional[Conversation]:
         """
-        Konuşma geçmişini getirir
+        Konuşmanın güncel puan ve haklarını okur, planı tekrar çözmeden verilen kopyadan atar
         """
-        messages = self.db.query(Message).filter(
-            Message.conversation_id == conversation_id
-        ).order_by(Message.timestamp).all()
+        conversation = db.query(Conversation).options(defer(Conversation.travel_plan)).filter(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        ).first()
 
-        history = []
-        for msg in messages:
-            history.extend([
-                {"type": "user", "message": msg.user_message, "timestamp": msg.timestamp},
-                {"type": "bot", "message": msg.bot_response, "timestamp": msg.timestamp}
-            ])
+        if conversation is not None:
+            # Değişiklik sayılmaz; tur planı değiştirmezse yeniden yazılmaz
+            set_committed_value(conversation, "travel_plan", travel_plan)
 
-        return history
+        return conversation
 
-    async def get_user_stats(self, user_id: str) -> Dict:
+    def owns_conversation(self, db: Session, conversation_id: int, user_id: str) -> bool:
+        return db.query(Conversation.id).filter(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        ).first() is not None
+
+    async def get_user_stats(self, db: Session, user_id: str) -> Dict:
         """
         Kullanıcı istatistiklerini getirir
         """
-        conversations = self.db.query(Conversation).filter(
+        conversations = db.query(Conversation).filter(
             Conversation.user_id == user_id
         ).all()
 
@@ -439,17 +500,13 @@ class ChatbotService:
         """
         Kullanıcı seviyesini hesaplar
         """
-        levels = [
-            {"level": 1, "name": "Yeni Gezgin", "min_score": 0},
-            {"level": 2, "name": "Deneyimli Gezgin", "min_score": 100},
-            {"level": 3, "name": "Seyahat Uzmanı", "min_score": 300},
-            {"level": 4, "name": "Seyahat Gurusu", "min_score": 600},
-            {"level": 5, "name": "Dünya Gezgini", "min_score": 1000}
-        ]
-
-        current_level = levels[0]
-        for level in levels:
+        current_level = USER_LEVELS[0]
+        for level in USER_LEVELS:
             if total_score >= level["min_score"]:
                 current_level = level
 
-        return current_level
\ No newline at end of file
+        return current_level
+
+
+# Süreç genelinde paylaşılan chatbot
+chatbot_service = ChatbotService(travel_planner)
@@ -0,0 +1,124 @@
+import base64
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Index, or_
+from sqlalchemy.orm import Session
+
+from app.models.conversation import Message
+from app.services.message_archive import message_archiver
+from app.utils.database import engine
+
+# Sayfalama (conversation_id, timestamp, id) sırasıyla bu index üzerinden ilerler
+message_history_index = Index(
+    "ix_messages_conversation_timestamp",
+    Message.conversation_id,
+    Message.timestamp,
+    Message.id
+)
+
+
+def ensure_history_index():
+    """
+    Mevcut veritabanlarında index'i oluşturur (yeni tablolarda create_all ile gelir)
+    """
+    message_history_index.create(bind=engine, checkfirst=True)
+
+
+def encode_cursor(timestamp: datetime, message_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{message_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    İmleci (timestamp, id) çiftine çözer, bozuk imleçte ValueError fırlatır
+    """
+    try:
+        timestamp, message_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except Exception:
+        raise ValueError("Geçersiz imleç")
+
+
+def _history_entries(row) -> List[Dict]:
+    return [
+        {"type": "user", "message": row.user_message, "timestamp": row.timestamp},
+        {"type": "bot", "message": row.bot_response, "timestamp": row.timestamp}
+    ]
+
+
+def fetch_history_page(
+        db: Session,
+        conversation_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None
+) -> Dict:
+    """
+    İmleçten sonraki en fazla limit mesajı döndürür
+
+    Önce arşiv blokları, sonra sıcak tablo okunur; arşivlenen mesajlar her zaman
+    sıcak olanlardan eski olduğu için sayfalar iki katman arasında kesintisizdir.
+    Koşul index'in sırasıyla aynı olduğundan konuşma ne kadar uzun olursa
+    olsun her sayfa yalnızca okunan satırlar kadar maliyetlidir.
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    # Bir fazla satır okunarak sonraki sayfanın varlığı anlaşılır
+    rows = list(islice(message_archiver.iter_archived(db, conversation_id, after), limit + 1))
+    if rows:
+        after = (rows[-1].timestamp, rows[-1].id)
+
+    if len(rows) <= limit:
+        rows.extend(_fetch_hot_rows(db, conversation_id, limit + 1 - len(rows), after))
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    history = []
+    for row in rows:
+        history.extend(_history_entries(row))
+
+    return {
+        "history": history,
+        "next_cursor": encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+    }
+
+
+def _fetch_hot_rows(db: Session, conversation_id: int, limit: int, after: Optional[Tuple[datetime, int]]) -> List:
+    # Yalnızca gereken kolonlar okunur, ORM nesneleri oturumda birikmez
+    query = db.query(
+        Message.id,
+        Message.timestamp,
+        Message.user_message,
+        Message.bot_response
+    ).filter(Message.conversation_id == conversation_id)
+
+    if after is not None:
+        timestamp, message_id = after
+        # >= alt sınırı index aralığını verir, eşit zaman damgaları id ile ayrılır
+        query = query.filter(
+            Message.timestamp >= timestamp,
+            or_(Message.timestamp > timestamp, Message.id > message_id)
+        )
+
+    return query.order_by(Message.timestamp, Message.id).limit(limit).all()
+
+
+def iter_history(
+        db: Session,
+        conversation_id: int,
+        batch_size: int = 200,
+        cursor: Optional[str] = None
+) -> Iterator[Dict]:
+    """
+    Geçmişi (verilirse imleçten itibaren) sayfa sayfa okuyarak kayıt kayıt üretir
+    """
+    while True:
+        page = fetch_history_page(db, conversation_id, batch_size, cursor)
+        yield from page["history"]
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
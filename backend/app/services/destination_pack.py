@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.services.place_catalog import place_catalog
+from app.services.places_service import places_service
+from app.services.travel_planner import SLOT_CATEGORIES
+
+settings = get_settings()
+
+PACK_FORMAT = "your-way-ally-destination-pack"
+PACK_FORMAT_VERSION = 1
+PACK_FILE_PREFIX = "destinations-"
+PACK_FILE_SUFFIX = ".json.gz"
+
+
+def pack_categories() -> List[str]:
+    """
+    Planlayıcının zaman dilimlerinde kullandığı tüm kategoriler
+    """
+    return list(dict.fromkeys(category for categories in SLOT_CATEGORIES.values() for category in categories))
+
+
+async def build_pack(
+        cities: List[str],
+        categories: Optional[List[str]] = None,
+        max_pages: int = 3,
+        concurrency: int = 4
+) -> Dict:
+    """
+    Şehirlerin tüm kategorilerini sayfalayarak çeker ve paket sözlüğünü oluşturur
+
+    Çekilemeyen sorgular pakete boş girmez, "errors" listesine yazılır.
+    """
+    categories = categories or pack_categories()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(city: str, category: str):
+        async with semaphore:
+            try:
+                return await places_service.fetch_all_pages(city, category, max_pages)
+            except Exception as e:
+                return e
+
+    destinations = []
+    errors = []
+
+    for city in cities:
+        results = await asyncio.gather(*[fetch(city, category) for category in categories])
+
+        destination = {
+            "name": city,
+            "key": places_service.cache_key(city, "")[0],
+            "categories": {}
+        }
+        for category, result in zip(categories, results):
+            if isinstance(result, Exception):
+                errors.append({"destination": city, "category": category, "error": str(result)})
+                continue
+            destination["categories"][category] = result
+
+        destinations.append(destination)
+
+    created_at = datetime.utcnow()
+    return {
+        "format": PACK_FORMAT,
+        "format_version": PACK_FORMAT_VERSION,
+        "version": created_at.strftime("%Y%m%dT%H%M%SZ"),
+        "created_at": created_at.isoformat(),
+        "language": places_service.language,
+        "region": places_service.region,
+        "categories": categories,
+        "destinations": destinations,
+        "errors": errors
+    }
+
+
+def write_pack(pack: Dict, directory: str) -> str:
+    """
+    Paketi sürüm adlı gzip JSON dosyasına atomik olarak yazar
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{PACK_FILE_PREFIX}{pack['version']}{PACK_FILE_SUFFIX}")
+    temporary_path = f"{path}.tmp"
+
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as f:
+        json.dump(pack, f, ensure_ascii=False)
+    os.replace(temporary_path, path)
+
+    return path
+
+
+def read_pack(path: str) -> Dict:
+    """
+    Paketi okur ve biçimini doğrular
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        pack = json.load(f)
+
+    if pack.get("format") != PACK_FORMAT:
+        raise ValueError(f"Destinasyon paketi değil: {path}")
+
+    if pack.get("format_version") != PACK_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen paket sürümü: {pack.get('format_version')}")
+
+    return pack
+
+
+def latest_pack_path(directory: str) -> Optional[str]:
+    """
+    Klasördeki en yeni paket dosyası (sürüm adları zaman damgası olduğu için sıralanabilir)
+    """
+    paths = sorted(glob.glob(os.path.join(directory, f"{PACK_FILE_PREFIX}*{PACK_FILE_SUFFIX}")))
+    return paths[-1] if paths else None
+
+
+def ingest_pack(pack: Dict) -> int:
+    """
+    Paketteki tüm sonuçları tek işlemde yer kataloğuna yükler, satır sayısını döner
+
+    Katalog kayıtları paketin oluşturulma zamanını taşır, böylece çevrim içi
+    modda yaşlanan paket verisi normal şekilde yenilenir.
+    """
+    if (pack.get("language"), pack.get("region")) != (places_service.language, places_service.region):
+        raise ValueError("Paketin dil/bölge ayarı uygulamayla uyuşmuyor")
+
+    # Anahtar yeniden hesaplanır, böylece normalizasyon değişse de eski paketler çalışır
+    entries = [
+        (places_service.cache_key(destination["name"], "")[0], category, places)
+        for destination in pack["destinations"]
+        for category, places in destination["categories"].items()
+    ]
+    return place_catalog.store_many_blocking(entries, fetched_at=datetime.fromisoformat(pack["created_at"]))
+
+
+def load_pack(path: str) -> Dict:
+    """
+    Paketi okuyup kataloğa yükler ve özetini döndürür
+    """
+    pack = read_pack(path)
+    rows = ingest_pack(pack)
+
+    return {
+        "path": path,
+        "version": pack["version"],
+        "destinations": [destination["name"] for destination in pack["destinations"]],
+        "places": rows
+    }
+
+
+def load_latest_pack(directory: str) -> Optional[Dict]:
+    """
+    Klasördeki en yeni paketi yükler, paket yoksa None döner
+    """
+    path = latest_pack_path(directory)
+    return load_pack(path) if path else None
+
+
+def _read_cities(args: argparse.Namespace) -> List[str]:
+    cities = [city.strip() for city in (args.cities or "").split(",") if city.strip()]
+
+    if args.cities_file:
+        with open(args.cities_file, encoding="utf-8") as f:
+            cities.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    return list(dict.fromkeys(cities))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çevrimdışı destinasyon paketi aracı")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Places'tan çekip paket oluşturur")
+    build_parser.add_argument("--cities", help="Virgülle ayrılmış şehirler")
+    build_parser.add_argument("--cities-file", help="Her satırda bir şehir")
+    build_parser.add_argument("--categories", help="Virgülle ayrılmış kategoriler (varsayılan: planlayıcının tümü)")
+    build_parser.add_argument("--max-pages", type=int, default=3)
+    build_parser.add_argument("--concurrency", type=int, default=4)
+    build_parser.add_argument("--output-dir", default=settings.DESTINATION_PACK_DIR or "destination_packs")
+    build_parser.add_argument("--no-ingest", action="store_true", help="Yalnızca dosya üret, kataloğa yükleme")
+
+    load_parser = subparsers.add_parser("load", help="Paketi yer kataloğuna yükler")
+    load_parser.add_argument("--path", help="Paket dosyası (varsayılan: klasördeki en yeni)")
+    load_parser.add_argument("--dir", default=settings.DESTINATION_PACK_DIR or "destination_packs")
+
+    inspect_parser = subparsers.add_parser("inspect", help="Paket özetini gösterir")
+    inspect_parser.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        cities = _read_cities(args)
+        if not cities:
+            parser.error("En az bir şehir verilmeli (--cities veya --cities-file)")
+
+        categories = [c.strip() for c in args.categories.split(",")] if args.categories else None
+        pack = asyncio.run(build_pack(cities, categories, args.max_pages, args.concurrency))
+        path = write_pack(pack, args.output_dir)
+
+        summary = {
+            "path": path,
+            "version": pack["version"],
+            "places": sum(len(p) for d in pack["destinations"] for p in d["categories"].values()),
+            "errors": pack["errors"]
+        }
+        if not args.no_ingest:
+            summary["ingested"] = ingest_pack(pack)
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+    elif args.command == "load":
+        path = args.path or latest_pack_path(args.dir)
+        if not path:
+            parser.error(f"Paket bulunamadı: {args.dir}")
+        print(json.dumps(load_pack(path), indent=2, ensure_ascii=False))
+
+    elif args.command == "inspect":
+        pack = read_pack(args.path)
+        print(json.dumps({
+            "version": pack["version"],
+            "created_at": pack["created_at"],
+            "categories": pack["categories"],
+            "destinations": {
+                destination["name"]: {category: len(places) for category, places in destination["categories"].items()}
+                for destination in pack["destinations"]
+            },
+            "errors": pack.get("errors", [])
+        }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
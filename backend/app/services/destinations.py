@@ -0,0 +1,36 @@
+from typing import Dict, List
+
+# En çok trafik alan destinasyonlar (GET /travel/destinations/popular ve ısıtma)
+POPULAR_DESTINATIONS: List[Dict] = [
+    {
+        "name": "Bakü",
+        "country": "Azerbaycan",
+        "description": "Hazar Denizi kıyısındaki modern şehir",
+        "image": "baku.jpg",
+        "recommended_days": 5,
+        "best_season": "Nisan-Ekim"
+    },
+    {
+        "name": "İstanbul",
+        "country": "Türkiye",
+        "description": "İki kıtanın buluştuğu tarih şehri",
+        "image": "istanbul.jpg",
+        "recommended_days": 4,
+        "best_season": "Mart-Kasım"
+    },
+    {
+        "name": "Paris",
+        "country": "Fransa",
+        "description": "Aşk ve sanat şehri",
+        "image": "paris.jpg",
+        "recommended_days": 6,
+        "best_season": "Nisan-Ekim"
+    }
+]
+
+
+def popular_destination_names() -> List[str]:
+    """
+    Popüler destinasyonların adları
+    """
+    return [destination["name"] for destination in POPULAR_DESTINATIONS]
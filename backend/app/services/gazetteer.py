@@ -0,0 +1,217 @@
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Bilinen destinasyonlar: kanonik id, görünen ad ve yazım varyantları
+DESTINATIONS: List[Dict] = [
+    {"id": "baku", "name": "Bakü", "country": "Azerbaycan", "timezone": "Asia/Baku", "currency": "AZN",
+     "language": "Azerbaycan Türkçesi", "aliases": ["Baku", "Bakı", "Baki"]},
+    {"id": "gence", "name": "Gence", "country": "Azerbaycan", "timezone": "Asia/Baku", "currency": "AZN",
+     "language": "Azerbaycan Türkçesi", "aliases": ["Gəncə", "Ganja"]},
+    {"id": "istanbul", "name": "İstanbul", "country": "Türkiye", "timezone": "Europe/Istanbul", "currency": "TRY",
+     "language": "Türkçe", "aliases": ["Stanbul"]},
+    {"id": "ankara", "name": "Ankara", "country": "Türkiye", "timezone": "Europe/Istanbul", "currency": "TRY",
+     "language": "Türkçe", "aliases": []},
+    {"id": "izmir", "name": "İzmir", "country": "Türkiye", "timezone": "Europe/Istanbul", "currency": "TRY",
+     "language": "Türkçe", "aliases": ["Smyrna"]},
+    {"id": "antalya", "name": "Antalya", "country": "Türkiye", "timezone": "Europe/Istanbul", "currency": "TRY",
+     "language": "Türkçe", "aliases": []},
+    {"id": "kapadokya", "name": "Kapadokya", "country": "Türkiye", "timezone": "Europe/Istanbul", "currency": "TRY",
+     "language": "Türkçe", "aliases": ["Cappadocia", "Göreme"]},
+    {"id": "tiflis", "name": "Tiflis", "country": "Gürcistan", "timezone": "Asia/Tbilisi", "currency": "GEL",
+     "language": "Gürcüce", "aliases": ["Tbilisi"]},
+    {"id": "batum", "name": "Batum", "country": "Gürcistan", "timezone": "Asia/Tbilisi", "currency": "GEL",
+     "language": "Gürcüce", "aliases": ["Batumi"]},
+    {"id": "paris", "name": "Paris", "country": "Fransa", "timezone": "Europe/Paris", "currency": "EUR",
+     "language": "Fransızca", "aliases": []},
+    {"id": "roma", "name": "Roma", "country": "İtalya", "timezone": "Europe/Rome", "currency": "EUR",
+     "language": "İtalyanca", "aliases": ["Rome"]},
+    {"id": "londra", "name": "Londra", "country": "Birleşik Krallık", "timezone": "Europe/London", "currency": "GBP",
+     "language": "İngilizce", "aliases": ["London"]},
+    {"id": "berlin", "name": "Berlin", "country": "Almanya", "timezone": "Europe/Berlin", "currency": "EUR",
+     "language": "Almanca", "aliases": []},
+    {"id": "amsterdam", "name": "Amsterdam", "country": "Hollanda", "timezone": "Europe/Amsterdam", "currency": "EUR",
+     "language": "Felemenkçe", "aliases": []},
+    {"id": "barselona", "name": "Barselona", "country": "İspanya", "timezone": "Europe/Madrid", "currency": "EUR",
+     "language": "İspanyolca", "aliases": ["Barcelona"]},
+    {"id": "madrid", "name": "Madrid", "country": "İspanya", "timezone": "Europe/Madrid", "currency": "EUR",
+     "language": "İspanyolca", "aliases": []},
+    {"id": "viyana", "name": "Viyana", "country": "Avusturya", "timezone": "Europe/Vienna", "currency": "EUR",
+     "language": "Almanca", "aliases": ["Vienna", "Wien"]},
+    {"id": "prag", "name": "Prag", "country": "Çekya", "timezone": "Europe/Prague", "currency": "CZK",
+     "language": "Çekçe", "aliases": ["Prague", "Praha"]},
+    {"id": "budapeste", "name": "Budapeşte", "country": "Macaristan", "timezone": "Europe/Budapest", "currency": "HUF",
+     "language": "Macarca", "aliases": ["Budapest"]},
+    {"id": "atina", "name": "Atina", "country": "Yunanistan", "timezone": "Europe/Athens", "currency": "EUR",
+     "language": "Yunanca", "aliases": ["Athens"]},
+    {"id": "dubai", "name": "Dubai", "country": "Birleşik Arap Emirlikleri", "timezone": "Asia/Dubai",
+     "currency": "AED", "language": "Arapça", "aliases": ["Dubay"]},
+    {"id": "new_york", "name": "New York", "country": "ABD", "timezone": "America/New_York", "currency": "USD",
+     "language": "İngilizce", "aliases": ["NYC"]},
+    {"id": "tokyo", "name": "Tokyo", "country": "Japonya", "timezone": "Asia/Tokyo", "currency": "JPY",
+     "language": "Japonca", "aliases": []}
+]
+
+# Ad sonuna kesme işaretsiz eklenebilen hal ekleri (katlanmış yazımla)
+CASE_SUFFIXES = {
+    "a", "e", "i", "u",
+    "ya", "ye", "yi", "yu",
+    "da", "de", "ta", "te",
+    "dan", "den", "tan", "ten",
+    "in", "un", "nin", "nun",
+    "la", "le", "yla", "yle",
+    "daki", "deki", "taki", "teki"
+}
+
+APOSTROPHES = "'’`"
+
+_LETTERS = re.compile(r"[^\W\d_]*")
+
+
+def _build_fold_map() -> Dict[int, str]:
+    """
+    Latin harflerin aksansız karşılıkları (NFKD ayrıştırması bir kez yapılır)
+    """
+    fold_map = {ord("ı"): "i", ord("ə"): "e", ord("’"): "'", ord("`"): "'", 0x0307: ""}
+    for code in range(0x00C0, 0x0250):
+        decomposed = unicodedata.normalize("NFKD", chr(code))
+        base = "".join(char for char in decomposed if not unicodedata.combining(char))
+        if base and base != chr(code):
+            fold_map.setdefault(code, base)
+    return fold_map
+
+
+_FOLD_MAP = _build_fold_map()
+
+
+def fold(text: str) -> str:
+    """
+    Karşılaştırma için yazımı sadeleştirir (küçük harf, aksan ve noktasız i farkı yok)
+    """
+    return text.casefold().translate(_FOLD_MAP)
+
+
+class _TrieNode:
+    __slots__ = ("children", "destination_id")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.destination_id: Optional[str] = None
+
+
+class Gazetteer:
+    """
+    Şehir adları ve takma adları üzerinde önek ağacıyla çalışan destinasyon sözlüğü
+
+    "Bakü'ye", "baku" ve "BAKÜ" aynı kanonik destinasyona çözülür; tüm önbellek
+    katmanları canonical_key ile aynı anahtarı kullanır.
+    """
+
+    def __init__(self, destinations: List[Dict]):
+        self._root = _TrieNode()
+        self._destinations: Dict[str, Dict] = {}
+
+        for destination in destinations:
+            self._destinations[destination["id"]] = destination
+            for name in [destination["name"], *destination["aliases"]]:
+                self._insert(fold(name), destination["id"])
+
+        # Yalnızca bir adın ilk harfiyle başlayan kelimeler denenir
+        first_letters = "".join(sorted(self._root.children))
+        self._word_start = re.compile(rf"(?<![^\W\d_])[{re.escape(first_letters)}]")
+
+    def _insert(self, key: str, destination_id: str):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        node.destination_id = destination_id
+
+    def _match_at(self, folded: str, start: int) -> Optional[Tuple[str, int, int]]:
+        """
+        start konumundan başlayan en uzun adı bulur; adın ardından kelime bitmeli
+        ya da yalnızca hal eki gelmeli. (id, adın bitişi, kelimenin bitişi) döner.
+        """
+        node = self._root
+        best = None
+
+        for position in range(start, len(folded) + 1):
+            if node.destination_id is not None:
+                end = self._suffix_end(folded, position)
+                if end is not None:
+                    best = (node.destination_id, position, end)
+
+            if position == len(folded):
+                break
+            node = node.children.get(folded[position])
+            if node is None:
+                break
+
+        return best
+
+    def _suffix_end(self, folded: str, position: int) -> Optional[int]:
+        """
+        Adın bittiği yerden sonraki ek geçerliyse kelimenin bitişini döner
+        """
+        if position < len(folded) and folded[position] == "'":
+            return _LETTERS.match(folded, position + 1).end()
+
+        end = _LETTERS.match(folded, position).end()
+        if end == position or folded[position:end] in CASE_SUFFIXES:
+            return end
+
+        return None
+
+    def find(self, text: str) -> Optional[Dict]:
+        """
+        Serbest metinde geçen ilk bilinen destinasyonu döndürür
+        """
+        for destination, _ in self.mentions(text):
+            return destination
+        return None
+
+    def mentions(self, text: str) -> Iterator[Tuple[Dict, str]]:
+        """
+        Metinde geçen bilinen destinasyonları ve aldıkları eki ("Bakü'den" -> "den") sırayla üretir
+        """
+        folded = fold(text)
+        for match in self._word_start.finditer(folded):
+            found = self._match_at(folded, match.start())
+            if found:
+                destination_id, name_end, end = found
+                yield self._destinations[destination_id], folded[name_end:end].lstrip("'")
+
+    def resolve(self, name: str) -> Optional[Dict]:
+        """
+        Adın tamamı bilinen bir destinasyona (ekleriyle birlikte) karşılık geliyorsa döndürür
+        """
+        folded = fold(" ".join(name.split()))
+        found = self._match_at(folded, 0)
+        if found and found[2] == len(folded):
+            return self._destinations[found[0]]
+        return None
+
+    def canonical_name(self, name: str) -> str:
+        """
+        Görünen kanonik ad; bilinmeyen adlarda kesme işaretinden sonraki ek atılır
+        """
+        destination = self.resolve(name)
+        if destination:
+            return destination["name"]
+
+        name = " ".join(name.split())
+        for apostrophe in APOSTROPHES:
+            name = name.split(apostrophe)[0]
+        return name
+
+    def canonical_key(self, name: str) -> str:
+        """
+        Önbellek anahtarlarında kullanılan normalize değer
+        """
+        destination = self.resolve(name)
+        if destination:
+            return destination["id"]
+        return fold(self.canonical_name(name))
+
+
+# Süreç başına bir kez kurulur
+gazetteer = Gazetteer(DESTINATIONS)
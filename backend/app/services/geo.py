@@ -0,0 +1,104 @@
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """
+    İki nokta (veya nokta dizileri) arasındaki büyük daire mesafesi, km
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lng1, lat2, lng2))
+
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _project(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """
+    Şehir ölçeğinde öklid mesafesi kullanabilmek için eşdikdörtgen izdüşüm (km)
+    """
+    reference_lat = np.radians(np.mean(latitude))
+    x = np.radians(longitude) * np.cos(reference_lat) * EARTH_RADIUS_KM
+    y = np.radians(latitude) * EARTH_RADIUS_KM
+    return np.column_stack([x, y])
+
+
+def kmeans(points: np.ndarray, k: int, iterations: int = 25, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k-means++ başlangıçlı k-means kümeleme
+
+    (etiketler, merkezler) döner.
+    """
+    n = len(points)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+
+    # k-means++ başlangıcı
+    centroids = np.empty((k, points.shape[1]), dtype=np.float64)
+    centroids[0] = points[rng.integers(n)]
+    closest = np.sum((points - centroids[0]) ** 2, axis=1)
+    for i in range(1, k):
+        total = closest.sum()
+        index = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+        centroids[i] = points[index]
+        closest = np.minimum(closest, np.sum((points - centroids[i]) ** 2, axis=1))
+
+    labels = np.zeros(n, dtype=np.int64)
+    for _ in range(iterations):
+        distances = np.sum((points[:, None, :] - centroids[None, :, :]) ** 2, axis=2)
+        new_labels = np.argmin(distances, axis=1)
+
+        counts = np.bincount(new_labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, new_labels, points)
+
+        # Boş kalan küme mevcut merkezini korur
+        non_empty = counts > 0
+        centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    return labels, centroids
+
+
+def cluster_by_day(latitude: np.ndarray, longitude: np.ndarray, days: int, seed: int = 0) -> np.ndarray:
+    """
+    Konumu bilinen adayları her güne bir küme düşecek şekilde kümeler
+
+    Konumu olmayan adaylar -1 etiketi alır ve her güne atanabilir.
+    """
+    labels = np.full(len(latitude), -1, dtype=np.int64)
+    located = ~(np.isnan(latitude) | np.isnan(longitude))
+
+    if days <= 1 or located.sum() < 2:
+        labels[located] = 0
+        return labels
+
+    points = _project(latitude[located], longitude[located])
+    cluster_labels, centroids = kmeans(points, days, seed=seed)
+
+    # Kümeleri merkezden dışa doğru sırala, ilk günler merkeze yakın olsun
+    center = points.mean(axis=0)
+    order = np.argsort(np.sum((centroids - center) ** 2, axis=1), kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    labels[located] = rank[cluster_labels]
+    return labels
+
+
+def pairwise_haversine_km(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """
+    Tüm nokta çiftleri arasındaki mesafe matrisi, km
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+
+    return haversine_km(latitude[:, None], longitude[:, None], latitude[None, :], longitude[None, :])
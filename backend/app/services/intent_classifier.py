@@ -0,0 +1,131 @@
+import re
+from typing import Dict, Optional, Tuple
+
+from app.services.gazetteer import gazetteer
+
+POSITIVE_WORDS = ["beğendim", "güzel", "harika", "mükemmel", "süper"]
+NEGATIVE_WORDS = ["beğenmedim", "kötü", "berbat", "hiç iyi değil"]
+QUESTION_WORDS = ["nedir", "nasıl", "ne zaman", "nerede", "kim", "hangi", "?", "önerir misin", "tavsiye", "öneri"]
+GREETING_WORDS = ["merhaba", "selam", "hey", "hi", "hello", "nasılsın", "naber", "ne var ne yok"]
+
+# Geçmiş bir seyahati anlatan fiiller ("5 gün kaldım") yeni plan talebi değildir
+PAST_TRAVEL_WORDS = ["kaldım", "kaldık", "gittim", "gittik", "gezdim", "gezdik", "döndüm", "döndük", "geldim", "geldik",
+                     "ziyaret ettim", "ziyaret ettik"]
+
+# Çıkma durumu ekleri: "Bakü'den" gidilecek yer değil çıkış noktasıdır
+ORIGIN_SUFFIXES = {"dan", "den", "tan", "ten"}
+
+# Sözlükte olmayan şehir yalnızca özel ad yazımıyla alınır ("Kyoto'ya", "Kyoto için")
+UNKNOWN_DESTINATION_PATTERN = r"(?<![\w'’])([A-ZÇĞİÖŞÜ]\w{2,})(?:['’](\w+)|\s+için\b)"
+
+
+def _alternation(words) -> str:
+    # Uzun kelimeler önce denenir ki kısa olanı ("öneri") uzununu ("önerir misin") gölgelemesin
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+class IntentClassifier:
+    """
+    Mesajın intent, duygu ve puanını çıkaran derlenmiş sınıflandırıcı
+
+    Tüm anahtar kelimeler isimli gruplarla tek bir regex'te birleştirilir ve
+    mesaj bir kez taranır. Destinasyon ayrıca gazetteer'da aranır; özel ad
+    kalıbı yalnızca gün sayısı olup sözlükte şehir bulunamazsa denenir.
+    Öncelik eski sınıflandırıcıdaki gibidir: puan/duygu içeren mesaj geri bildirimdir.
+    """
+
+    def __init__(self):
+        self._keywords = re.compile("|".join([
+            # "3 gün sonra" süre değil zaman belirtir
+            r"(?P<days>(?P<days_value>\d+)\s*gün(?!\w*\s+(?:sonra|önce)))",
+            r"(?P<rating>(?P<rating_value>\d+)\s*(?:puan|yıldız|star))",
+            rf"(?P<negative>{_alternation(NEGATIVE_WORDS)})",
+            rf"(?P<positive>{_alternation(POSITIVE_WORDS)})",
+            rf"(?P<question>{_alternation(QUESTION_WORDS)})",
+            rf"(?P<greeting>{_alternation(GREETING_WORDS)})",
+            rf"(?P<past>{_alternation(PAST_TRAVEL_WORDS)})"
+        ]))
+        self._unknown_destination = re.compile(UNKNOWN_DESTINATION_PATTERN)
+
+    def _scan(self, text: str) -> Dict[str, re.Match]:
+        """
+        Mesajı bir kez tarar, her türün ilk eşleşmesini döndürür
+        """
+        found: Dict[str, re.Match] = {}
+        for match in self._keywords.finditer(text):
+            kind = match.lastgroup
+            if kind not in found:
+                found[kind] = match
+        return found
+
+    def _find_destination(self, message: str) -> Optional[str]:
+        """
+        Gidilecek yeri bulur; çıkma durumundaki ("Bakü'den") adlar atlanır
+        """
+        for destination, suffix in gazetteer.mentions(message):
+            if suffix not in ORIGIN_SUFFIXES:
+                return destination["name"]
+        return None
+
+    def _find_unknown_destination(self, message: str) -> Optional[str]:
+        """
+        Sözlükte olmayan şehri özel ad yazımından alır
+        """
+        for match in self._unknown_destination.finditer(message):
+            suffix = (match.group(2) or "").lower()
+            if suffix not in ORIGIN_SUFFIXES:
+                return match.group(1)
+        return None
+
+    def classify(self, message: str) -> Tuple[str, Dict]:
+        """
+        Mesajdan intent ve entity'leri çıkarır
+        """
+        text = message.lower()
+        found = self._scan(text)
+        entities: Dict = {}
+
+        # Destinasyon ("Bakü'ye", "baku" -> "Bakü")
+        destination = self._find_destination(message)
+        if destination:
+            entities["destination"] = destination
+
+        # Feedback kontrolü ("5 gün kaldım, harikaydı" seyahat talebi sayılmaz)
+        if "positive" in found or "negative" in found or "rating" in found:
+            if "rating" in found:
+                entities["rating"] = int(found["rating"].group("rating_value"))
+
+            # Pozitif/negatif sentiment
+            if "positive" in found:
+                entities["sentiment"] = "positive"
+                entities.setdefault("rating", 5)
+            elif "negative" in found:
+                entities["sentiment"] = "negative"
+                entities.setdefault("rating", 1)
+
+            return "feedback", entities
+
+        # Seyahat talebi kontrolü
+        if "days" in found:
+            entities["days"] = int(found["days"].group("days_value"))
+
+            if "destination" not in entities:
+                destination = self._find_unknown_destination(message)
+                if destination:
+                    entities["destination"] = destination
+
+            if "destination" in entities and "past" not in found:
+                return "travel_request", entities
+
+        if "question" in found:
+            return "question", entities
+
+        if "greeting" in found:
+            return "greeting", entities
+
+        # Varsayılan
+        return "general", entities
+
+
+# Süreç başına bir kez derlenir
+intent_classifier = IntentClassifier()
@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.job import PlanJob
+from app.services.travel_planner import travel_planner
+from app.utils.database import SessionLocal, engine
+
+settings = get_settings()
+
+
+class PlanJobQueue:
+    """
+    Plan üretimini istek dışında çalıştıran, durumu veritabanında tutan iş kuyruğu
+
+    İşler plan_jobs tablosundan atomik olarak sahiplenildiği için aynı
+    kuyruğu hem uygulama içi worker'lar hem ayrı worker süreçleri işleyebilir.
+    """
+
+    def __init__(self):
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _ensure_table(self):
+        if self._table_ready:
+            return
+
+        with self._table_lock:
+            if not self._table_ready:
+                PlanJob.__table__.create(bind=engine, checkfirst=True)
+                self._table_ready = True
+
+    async def enqueue(
+            self,
+            db: Session,
+            user_id: str,
+            destination: str,
+            days: int,
+            start_date: Optional[datetime] = None,
+            preferences: Optional[Dict] = None
+    ) -> str:
+        """
+        Yeni plan işini kuyruğa ekler ve iş id'sini döndürür
+        """
+        self._ensure_table()
+
+        job = PlanJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            destination=destination,
+            days=days,
+            start_date=start_date,
+            preferences=preferences or {},
+            status="queued",
+            progress={"days_completed": 0, "total_days": days}
+        )
+
+        db.add(job)
+        db.commit()
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        return job.id
+
+    def get(self, db: Session, job_id: str) -> Optional[Dict]:
+        """
+        İşin durumunu döndürür
+        """
+        self._ensure_table()
+
+        job = db.query(PlanJob).filter(PlanJob.id == job_id).first()
+        return job.to_dict() if job else None
+
+    def start(self, workers: int):
+        """
+        Uygulama içi worker'ları başlatır
+        """
+        if self._workers or workers <= 0:
+            return
+
+        self._ensure_table()
+
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.ensure_future(self._worker_loop(f"{self._worker_prefix}:{index}"))
+            for index in range(workers)
+        ]
+        self._workers.append(asyncio.ensure_future(self._sweep_loop()))
+
+    async def join(self):
+        """
+        Worker'lar durana kadar bekler (ayrı worker süreci için)
+        """
+        await asyncio.gather(*self._workers)
+
+    async def stop(self):
+        """
+        Worker'ları durdurur, yarım kalan işler zaman aşımından sonra tekrar kuyruğa alınır
+        """
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker_loop(self, worker_id: str):
+        while True:
+            try:
+                job_id = await asyncio.to_thread(self._claim_next, worker_id)
+            except Exception as e:
+                print(f"Plan işi alınamadı: {e}")
+                job_id = None
+
+            if job_id is None:
+                await self._wait_for_work()
+                continue
+
+            await self._run_job(job_id, worker_id)
+
+    async def _sweep_loop(self):
+        """
+        Çökme veya yeniden başlatmada sahipsiz kalan işleri periyodik olarak toplar
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self._requeue_stale_jobs)
+            except Exception as e:
+                print(f"Zaman aşımına uğrayan işler toplanamadı: {e}")
+
+            await asyncio.sleep(settings.PLAN_JOB_SWEEP_SECONDS)
+
+    async def _wait_for_work(self):
+        if self._wakeup is None:
+            await asyncio.sleep(settings.PLAN_JOB_POLL_SECONDS)
+            return
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=settings.PLAN_JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def _claim_next(self, worker_id: str) -> Optional[str]:
+        """
+        Sıradaki işi atomik olarak sahiplenir
+        """
+        db = SessionLocal()
+        try:
+            while True:
+                job = db.query(PlanJob.id).filter(
+                    PlanJob.status == "queued"
+                ).order_by(PlanJob.created_at).first()
+
+                if job is None:
+                    return None
+
+                claimed = db.execute(
+                    update(PlanJob)
+                    .where(PlanJob.id == job.id, PlanJob.status == "queued")
+                    .values(
+                        status="running",
+                        worker_id=worker_id,
+                        started_at=datetime.utcnow(),
+                        attempts=PlanJob.attempts + 1
+                    )
+                ).rowcount
+                db.commit()
+
+                # Başka bir worker önce aldıysa sıradakini dene
+                if claimed:
+                    return job.id
+        finally:
+            db.close()
+
+    def _requeue_stale_jobs(self):
+        """
+        Zaman aşımına uğramış çalışan işleri tekrar kuyruğa alır
+
+        Deneme hakkı biten işler (ör. worker'ı her seferinde çökerten) başarısız sayılır.
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            deadline = now - timedelta(seconds=settings.PLAN_JOB_TIMEOUT_SECONDS)
+            stale = [PlanJob.status == "running", PlanJob.started_at < deadline]
+
+            db.execute(
+                update(PlanJob)
+                .where(*stale, PlanJob.attempts >= settings.PLAN_JOB_MAX_ATTEMPTS)
+                .values(
+                    status="failed",
+                    worker_id=None,
+                    error=f"İş {settings.PLAN_JOB_MAX_ATTEMPTS} denemede tamamlanamadı",
+                    finished_at=now,
+                    updated_at=now
+                )
+            )
+            db.execute(
+                update(PlanJob)
+                .where(*stale, PlanJob.attempts < settings.PLAN_JOB_MAX_ATTEMPTS)
+                .values(status="queued", worker_id=None, updated_at=now)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _update_job(self, job_id: str, worker_id: str, **values) -> bool:
+        """
+        İş hâlâ bu worker'da çalışıyorsa günceller
+
+        Zaman aşımıyla tekrar kuyruğa alınan işin eski denemesi yeni denemenin
+        sonucunun üzerine yazamaz; False dönerse iş artık bu worker'ın değildir.
+        """
+        db = SessionLocal()
+        try:
+            updated = db.execute(
+                update(PlanJob)
+                .where(PlanJob.id == job_id, PlanJob.worker_id == worker_id, PlanJob.status == "running")
+                .values(updated_at=datetime.utcnow(), **values)
+            ).rowcount
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+
+    async def _run_job(self, job_id: str, worker_id: str):
+        """
+        İşi çalıştırır, her gün tamamlandıkça ilerlemeyi kaydeder
+        """
+        db = SessionLocal()
+        try:
+            job = db.query(PlanJob).filter(PlanJob.id == job_id).first()
+
+            travel_plan: Dict = {}
+            message = None
+            days_completed = 0
+
+            async for event in travel_planner.stream_travel_plan(
+                    db=db,
+                    user_id=job.user_id,
+                    destination=job.destination,
+                    days=job.days,
+                    start_date=job.start_date,
+                    preferences=job.preferences or {},
+                    include_candidate_pool=True
+            ):
+                data = event["data"]
+
+                if event["event"] == "header":
+                    travel_plan = dict(data, daily_plans=[])
+
+                elif event["event"] == "candidate_pool":
+                    # Senkron plandaki gibi saklanır, yeniden üretimde yerler tekrar çekilmez
+                    travel_plan["candidate_pool"] = data
+
+                elif event["event"] == "day":
+                    travel_plan["daily_plans"].append(data)
+                    days_completed += 1
+                    owned = await asyncio.to_thread(
+                        self._update_job,
+                        job_id,
+                        worker_id,
+                        progress={"days_completed": days_completed, "total_days": job.days, "current_day": data["day"]}
+                    )
+                    if not owned:
+                        print(f"Plan işi {job_id} başka bir denemeye geçti, bu deneme bırakıldı")
+                        return
+
+                elif event["event"] == "summary":
+                    summary = dict(data)
+                    message = summary.pop("message", None)
+                    travel_plan["summary"] = summary
+
+                elif event["event"] == "error":
+                    raise RuntimeError(data["message"])
+
+            completed = await asyncio.to_thread(
+                self._update_job,
+                job_id,
+                worker_id,
+                status="completed",
+                result={"status": "success", "plan": travel_plan, "message": message},
+                finished_at=datetime.utcnow()
+            )
+            if not completed:
+                print(f"Plan işi {job_id} başka bir denemeye geçti, sonuç yazılmadı")
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            print(f"Plan işi {job_id} başarısız: {e}")
+            await asyncio.to_thread(
+                self._update_job,
+                job_id,
+                worker_id,
+                status="failed",
+                error=str(e),
+                finished_at=datetime.utcnow()
+            )
+
+        finally:
+            db.close()
+
+
+plan_job_queue = PlanJobQueue()
+
+
+async def _run_standalone(workers: int):
+    """
+    Ayrı süreçte yalnızca veritabanını yoklayan worker'lar çalıştırır
+    """
+    plan_job_queue.start(workers)
+    try:
+        await plan_job_queue.join()
+    finally:
+        await plan_job_queue.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seyahat planı worker süreci")
+    parser.add_argument("--workers", type=int, default=max(settings.PLAN_JOB_WORKERS, 1))
+    args = parser.parse_args()
+
+    print(f"🚀 {args.workers} plan worker'ı başlatılıyor...")
+    asyncio.run(_run_standalone(args.workers))
+
+
+if __name__ == "__main__":
+    main()
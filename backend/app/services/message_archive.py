@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import threading
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.conversation import Message
+from app.models.message_archive import MessageArchive
+from app.utils.database import SessionLocal, engine
+
+settings = get_settings()
+
+# Arşivden okunan mesaj, sıcak tablodan okunan satırla aynı alanlara sahiptir
+ArchivedMessage = namedtuple("ArchivedMessage", ["id", "timestamp", "user_message", "bot_response"])
+
+EPOCH = datetime(1970, 1, 1)
+MAX_MESSAGES_PER_BLOCK = 500
+DELETE_CHUNK_SIZE = 500
+
+
+def pack_messages(messages: List[ArchivedMessage]) -> bytes:
+    rows = [[m.id, m.timestamp.isoformat(), m.user_message, m.bot_response] for m in messages]
+    return zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+
+
+def unpack_messages(payload: bytes) -> List[ArchivedMessage]:
+    return [
+        ArchivedMessage(message_id, datetime.fromisoformat(timestamp), user_message, bot_response)
+        for message_id, timestamp, user_message, bot_response in json.loads(zlib.decompress(payload))
+    ]
+
+
+def window_start_for(timestamp: datetime) -> datetime:
+    """
+    Mesajın düştüğü arşiv penceresinin başlangıcı
+    """
+    window = settings.MESSAGE_ARCHIVE_WINDOW_SECONDS
+    seconds = int((timestamp - EPOCH).total_seconds()) // window * window
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class MessageArchiver:
+    """
+    Konuşma başına en yeni mesajları sıcak tutup eskilerini arşiv bloklarına taşır
+
+    Sıkıştırma (timestamp, id) sırasıyla en eskiden başladığı için arşivdeki
+    her mesaj sıcak tablodaki tüm mesajlardan önce gelir; geçmiş sayfalaması
+    önce arşivi sonra sıcak tabloyu okuyarak kesintisiz ilerler.
+    """
+
+    def __init__(self):
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_table(self):
+        if self._table_ready:
+            return
+
+        with self._table_lock:
+            if not self._table_ready:
+                MessageArchive.__table__.create(bind=engine, checkfirst=True)
+                self._table_ready = True
+
+    def compact_conversation(self, db: Session, conversation_id: int, keep: int) -> int:
+        """
+        En yeni keep mesaj dışındakileri arşive taşır (commit çağırana aittir)
+
+        Taşınan mesaj sayısını döndürür.
+        """
+        cutoff = db.query(Message.timestamp, Message.id).filter(
+            Message.conversation_id == conversation_id
+        ).order_by(Message.timestamp.desc(), Message.id.desc()).offset(keep).first()
+
+        if cutoff is None:
+            return 0
+
+        rows = db.query(
+            Message.id,
+            Message.timestamp,
+            Message.user_message,
+            Message.bot_response
+        ).filter(
+            Message.conversation_id == conversation_id,
+            Message.timestamp <= cutoff.timestamp,
+            or_(Message.timestamp < cutoff.timestamp, Message.id <= cutoff.id)
+        ).order_by(Message.timestamp, Message.id).all()
+
+        windows: Dict[datetime, List[ArchivedMessage]] = {}
+        for row in rows:
+            windows.setdefault(window_start_for(row.timestamp), []).append(ArchivedMessage(*row))
+
+        for window_start, messages in windows.items():
+            self._append_to_window(db, conversation_id, window_start, messages)
+
+        ids = [row.id for row in rows]
+        deleted = 0
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            deleted += db.query(Message).filter(
+                Message.id.in_(ids[start:start + DELETE_CHUNK_SIZE])
+            ).delete(synchronize_session=False)
+
+        # Aynı konuşmayı eş zamanlı sıkıştıran başka bir süreç varsa işlem geri alınır
+        if deleted != len(ids):
+            raise RuntimeError(f"Konuşma {conversation_id} eş zamanlı sıkıştırıldı")
+
+        return len(ids)
+
+    def _append_to_window(
+            self,
+            db: Session,
+            conversation_id: int,
+            window_start: datetime,
+            messages: List[ArchivedMessage]
+    ):
+        """
+        Mesajları penceredeki son bloğa ekler, blok doluysa yenilerini açar
+        """
+        block = db.query(MessageArchive).filter(
+            MessageArchive.conversation_id == conversation_id,
+            MessageArchive.window_start == window_start
+        ).order_by(MessageArchive.id.desc()).first()
+
+        if block is not None and block.message_count < MAX_MESSAGES_PER_BLOCK:
+            room = MAX_MESSAGES_PER_BLOCK - block.message_count
+            merged = unpack_messages(block.payload) + messages[:room]
+            self._fill_block(block, merged)
+            messages = messages[room:]
+
+        for start in range(0, len(messages), MAX_MESSAGES_PER_BLOCK):
+            block = MessageArchive(conversation_id=conversation_id, window_start=window_start)
+            self._fill_block(block, messages[start:start + MAX_MESSAGES_PER_BLOCK])
+            db.add(block)
+
+    def _fill_block(self, block: MessageArchive, messages: List[ArchivedMessage]):
+        block.first_timestamp = messages[0].timestamp
+        block.last_timestamp = messages[-1].timestamp
+        block.last_message_id = messages[-1].id
+        block.message_count = len(messages)
+        block.payload = pack_messages(messages)
+
+    def compact_batch(self, keep: Optional[int] = None, batch_size: Optional[int] = None) -> Dict:
+        """
+        Sınırı aşan konuşmalardan bir grubu sıkıştırır, her konuşma ayrı işlemde
+        """
+        keep = settings.MAX_CONVERSATION_HISTORY if keep is None else keep
+        batch_size = batch_size or settings.MESSAGE_COMPACTION_BATCH_SIZE
+        self.ensure_table()
+
+        db = SessionLocal()
+        try:
+            conversation_ids = [
+                row.conversation_id
+                for row in db.query(Message.conversation_id).group_by(
+                    Message.conversation_id
+                ).having(func.count(Message.id) > keep).limit(batch_size).all()
+            ]
+
+            archived = 0
+            for conversation_id in conversation_ids:
+                try:
+                    archived += self.compact_conversation(db, conversation_id, keep)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    print(f"Konuşma {conversation_id} sıkıştırılamadı: {e}")
+
+            return {"conversations": len(conversation_ids), "archived_messages": archived}
+        finally:
+            db.close()
+
+    def iter_archived(
+            self,
+            db: Session,
+            conversation_id: int,
+            after: Optional[Tuple[datetime, int]] = None
+    ) -> Iterator[ArchivedMessage]:
+        """
+        Arşivdeki mesajları (timestamp, id) sırasıyla, verilirse after'dan sonrası için üretir
+        """
+        self.ensure_table()
+
+        query = db.query(MessageArchive.id).filter(MessageArchive.conversation_id == conversation_id)
+        if after is not None:
+            # İmleçten önce biten bloklar açılmaz
+            query = query.filter(MessageArchive.last_timestamp >= after[0])
+
+        # Bloklar tek tek açılır, sayfa dolunca kalanlar hiç okunmaz
+        block_ids = [row.id for row in query.order_by(MessageArchive.window_start, MessageArchive.id).all()]
+        for block_id in block_ids:
+            payload = db.query(MessageArchive.payload).filter(MessageArchive.id == block_id).scalar()
+            for message in unpack_messages(payload):
+                if after is None or (message.timestamp, message.id) > after:
+                    yield message
+
+    def start(self):
+        """
+        Periyodik sıkıştırmayı arka planda başlatır
+        """
+        if self._task is not None or not settings.MESSAGE_COMPACTION_ENABLED:
+            return
+
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                result = await asyncio.to_thread(self.compact_batch)
+            except Exception as e:
+                print(f"Mesaj sıkıştırma hatası: {e}")
+                result = {"conversations": 0, "archived_messages": 0}
+
+            # Dolu ve iş yapan tur birikmiş iş olduğunu gösterir, beklemeden devam edilir
+            if result["conversations"] < settings.MESSAGE_COMPACTION_BATCH_SIZE or result["archived_messages"] == 0:
+                await asyncio.sleep(settings.MESSAGE_COMPACTION_INTERVAL_SECONDS)
+
+
+message_archiver = MessageArchiver()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eski mesajları arşiv bloklarına taşır")
+    parser.add_argument("--keep", type=int, default=settings.MAX_CONVERSATION_HISTORY)
+    parser.add_argument("--batch-size", type=int, default=settings.MESSAGE_COMPACTION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    total = {"conversations": 0, "archived_messages": 0}
+    while True:
+        result = message_archiver.compact_batch(args.keep, args.batch_size)
+        total["conversations"] += result["conversations"]
+        total["archived_messages"] += result["archived_messages"]
+        if result["conversations"] < args.batch_size or result["archived_messages"] == 0:
+            break
+
+    print(json.dumps(total, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.models.conversation import Message
+from app.utils.database import SessionLocal
+
+settings = get_settings()
+
+MAX_WRITE_ATTEMPTS = 3
+
+
+class MessageWriter:
+    """
+    Sohbet mesajlarını bellekte biriktirip tek işlemde toplu yazan kuyruk
+
+    Her tur ayrı commit (SQLite'ta ayrı fsync) yerine birkaç milisaniyede bir
+    tek INSERT işlemi yapılır. Zaman damgası kuyruğa eklenirken alındığı için
+    geçmiş sırası değişmez. Süreç çökerse en fazla bir flush aralığı kaybolur.
+    """
+
+    def __init__(self):
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"written": 0, "batches": 0, "failures": 0, "dropped": 0}
+
+    def start(self):
+        if self._task is not None or not settings.MESSAGE_WRITE_BEHIND_ENABLED:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """
+        Döngüyü durdurur ve bekleyen mesajları yazar
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+
+    async def enqueue(self, conversation_id: int, user_message: str, bot_response: str):
+        """
+        Mesajı kuyruğa ekler; kuyruk başlatılmamışsa başlatır, kapalıysa hemen yazar
+        """
+        row = {
+            "conversation_id": conversation_id,
+            "user_message": user_message,
+            "bot_response": bot_response,
+            "timestamp": datetime.utcnow(),
+            "attempts": 0
+        }
+
+        if self._task is None:
+            self.start()
+
+        if self._task is None:
+            # Write-behind kapalı: yazma event loop'u bloklamasın diye thread'de yapılır
+            await asyncio.to_thread(self._insert_batch, [row])
+            return
+
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= settings.MESSAGE_WRITE_BEHIND_BATCH_SIZE
+
+        if full:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        interval = settings.MESSAGE_WRITE_BEHIND_FLUSH_MS / 1000
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            await self.flush()
+
+    async def flush(self):
+        """
+        Bekleyen mesajları tek işlemde yazar
+
+        Geçmiş okunmadan önce de çağrılır, böylece kullanıcı son mesajını görür.
+        """
+        if self._flush_lock is None:
+            return
+
+        async with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+
+            if not rows:
+                return
+
+            try:
+                await asyncio.to_thread(self._insert_batch, rows)
+            except Exception as e:
+                self._stats["failures"] += 1
+                print(f"Mesajlar yazılamadı ({len(rows)} kayıt): {e}")
+
+                # Başarısız grup sıranın başına geri konur, sınırlı sayıda denenir
+                for row in rows:
+                    row["attempts"] += 1
+                retry = [row for row in rows if row["attempts"] < MAX_WRITE_ATTEMPTS]
+                with self._lock:
+                    self._pending = retry + self._pending
+
+                # Son denemede kayıtlar tek tek yazılır, yalnızca bozuk olan düşer
+                last = [row for row in rows if row["attempts"] >= MAX_WRITE_ATTEMPTS]
+                if last:
+                    await asyncio.to_thread(self._insert_each, last)
+
+    def _insert_batch(self, rows: List[Dict]):
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(Message, [
+                {key: value for key, value in row.items() if key != "attempts"}
+                for row in rows
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self._stats["written"] += len(rows)
+        self._stats["batches"] += 1
+
+    def _insert_each(self, rows: List[Dict]):
+        for row in rows:
+            try:
+                self._insert_batch([row])
+            except Exception as e:
+                self._stats["dropped"] += 1
+                print(f"Mesaj kaydı atlandı (konuşma {row['conversation_id']}): {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+
+        return dict(self._stats, pending=pending)
+
+
+message_writer = MessageWriter()
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.models.place import Place
+from app.utils.database import SessionLocal, engine
+
+settings = get_settings()
+
+
+class PlaceCatalog:
+    """
+    Places sonuçlarını veritabanında saklayan kalıcı katalog
+    """
+
+    def __init__(self):
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+
+    def _ensure_table(self):
+        """
+        places tablosu yoksa oluşturur
+        """
+        if self._table_ready:
+            return
+
+        with self._table_lock:
+            if not self._table_ready:
+                Place.__table__.create(bind=engine, checkfirst=True)
+                self._table_ready = True
+
+    def _lookup_blocking(self, destination_key: str, category: str) -> Optional[Tuple[List[Dict], datetime]]:
+        self._ensure_table()
+
+        db = SessionLocal()
+        try:
+            rows = db.query(Place).filter(
+                Place.destination_key == destination_key,
+                Place.category == category
+            ).order_by(Place.position).all()
+
+            if not rows:
+                return None
+
+            fetched_at = min(row.fetched_at for row in rows)
+            return [row.to_dict() for row in rows], fetched_at
+        finally:
+            db.close()
+
+    def _store_blocking(self, destination_key: str, category: str, places: List[Dict]):
+        self.store_many_blocking([(destination_key, category, places)])
+
+    def store_many_blocking(
+            self,
+            entries: List[Tuple[str, str, List[Dict]]],
+            fetched_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Birden fazla (destinasyon, kategori) sonucunu tek işlemde yazar, yazılan satır sayısını döner
+        """
+        self._ensure_table()
+
+        db = SessionLocal()
+        try:
+            fetched_at = fetched_at or datetime.utcnow()
+            rows = []
+
+            for destination_key, category, places in entries:
+                # Boş sonuç mevcut kayıtları (ör. paketten gelenleri) silmez
+                if not places:
+                    continue
+
+                # Aynı sorgunun eski sonuçları yenileriyle değiştirilir
+                db.query(Place).filter(
+                    Place.destination_key == destination_key,
+                    Place.category == category
+                ).delete(synchronize_session=False)
+
+                rows.extend(
+                    {
+                        "destination_key": destination_key,
+                        "category": category,
+                        "position": position,
+                        "google_place_id": place.get("google_place_id"),
+                        "name": place.get("name") or "",
+                        "rating": place.get("rating", 0),
+                        "price_level": place.get("price_level", 0),
+                        "address": place.get("address", ""),
+                        "latitude": place.get("latitude"),
+                        "longitude": place.get("longitude"),
+                        "types": place.get("types", []),
+                        "photos": place.get("photos", []),
+                        "opening_hours": place.get("opening_hours"),
+                        "fetched_at": fetched_at
+                    }
+                    for position, place in enumerate(places)
+                )
+
+            db.bulk_insert_mappings(Place, rows)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def lookup(self, destination_key: str, category: str) -> Optional[Tuple[List[Dict], datetime]]:
+        """
+        Katalogdaki sonuçları ve en eski çekilme zamanını döndürür
+        """
+        return await asyncio.to_thread(self._lookup_blocking, destination_key, category)
+
+    async def store(self, destination_key: str, category: str, places: List[Dict]):
+        """
+        Sorgu sonuçlarını kataloğa yazar
+        """
+        await asyncio.to_thread(self._store_blocking, destination_key, category, places)
+
+    def is_fresh(self, fetched_at: datetime) -> bool:
+        return datetime.utcnow() - fetched_at < timedelta(seconds=settings.PLACES_CATALOG_FRESH_SECONDS)
+
+    def is_servable(self, fetched_at: datetime) -> bool:
+        """
+        Bayat olsa bile yenilenirken sunulabilir mi
+        """
+        return datetime.utcnow() - fetched_at < timedelta(seconds=settings.PLACES_CATALOG_MAX_STALE_SECONDS)
+
+
+place_catalog = PlaceCatalog()
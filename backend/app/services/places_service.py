@@ -0,0 +1,255 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.services.gazetteer import gazetteer
+from app.services.place_catalog import place_catalog
+from app.utils.cache import TTLCache
+from app.utils.http_client import get_json
+
+settings = get_settings()
+
+PLACES_TEXTSEARCH_URL = f"{settings.GOOGLE_PLACES_BASE_URL}/textsearch/json"
+
+# Süreç genelinde paylaşılan text search önbelleği
+places_cache = TTLCache(
+    ttl_seconds=settings.PLACES_CACHE_TTL_SECONDS,
+    max_entries=settings.PLACES_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PLACES_CACHE_MAX_BYTES
+)
+
+
+class PlacesService:
+    """
+    Google Places text search çağrılarını yapan servis
+    """
+
+    def __init__(self):
+        self.api_key = settings.GOOGLE_PLACES_API_KEY
+        self.language = "tr"
+        self.region = "tr"
+
+        # Arka planda yenilenen sorgular ve çalışan görevler
+        self._refreshing: Set[Tuple[str, str, str, str]] = set()
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    def _build_query(self, destination: str, category: str) -> str:
+        """
+        Kategori bazlı arama sorgusunu oluşturur
+        """
+        query_map = {
+            "restaurant": f"best restaurants in {destination}",
+            "tourist_attraction": f"top attractions in {destination}",
+            "museum": f"museums in {destination}",
+            "park": f"parks in {destination}",
+            "shopping_mall": f"shopping in {destination}",
+            "bar": f"bars nightlife in {destination}",
+            "cafe": f"cafes in {destination}"
+        }
+        return query_map.get(category, f"{category} in {destination}")
+
+    def cache_key(self, destination: str, category: str) -> Tuple[str, str, str, str]:
+        """
+        Aynı sorguların aynı anahtara düşmesi için normalize edilmiş anahtar
+        """
+        return gazetteer.canonical_key(destination), category, self.language, self.region
+
+    async def fetch_places(self, destination: str, category: str) -> List[Dict]:
+        """
+        Yer önerilerini sırasıyla önbellekten, katalogdan veya Google Places API'den getirir
+        """
+        key = self.cache_key(destination, category)
+
+        cached = places_cache.get(key)
+        if cached is not None:
+            return [dict(place) for place in cached]
+
+        catalog_entry = await self._lookup_catalog(key)
+        if catalog_entry is not None:
+            places, fetched_at = catalog_entry
+
+            # Çevrimdışı modda katalog (destinasyon paketi) yaşına bakılmadan sunulur
+            if settings.OFFLINE_MODE or place_catalog.is_servable(fetched_at):
+                # Bayat kayıt hemen sunulur, yenisi arka planda çekilir
+                if not settings.OFFLINE_MODE and not place_catalog.is_fresh(fetched_at):
+                    self._schedule_refresh(key, destination, category)
+
+                places_cache.set(key, places)
+                return [dict(place) for place in places]
+
+        if settings.OFFLINE_MODE:
+            return []
+
+        places = await self._fetch_and_store(key, destination, category)
+        if places is None and catalog_entry is not None:
+            # API erişilemezken süresi geçmiş katalog kaydı boş sonuçtan iyidir
+            places = catalog_entry[0]
+
+        return [dict(place) for place in places] if places is not None else []
+
+    async def prefetch(self, destination: str, category: str, force: bool = False) -> int:
+        """
+        Sorguyu önbelleğe ve kataloğa ısıtır, force ile süresi dolmadan API'den yeniler
+
+        Önbellekteki yer sayısını döndürür.
+        """
+        if force and not settings.OFFLINE_MODE:
+            places = await self._fetch_and_store(self.cache_key(destination, category), destination, category)
+            if places is not None:
+                return len(places)
+
+        return len(await self.fetch_places(destination, category))
+
+    async def _lookup_catalog(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[List[Dict], datetime]]:
+        try:
+            return await place_catalog.lookup(key[0], key[1])
+        except Exception as e:
+            print(f"Yer kataloğu okunamadı: {e}")
+            return None
+
+    async def _fetch_and_store(
+            self,
+            key: Tuple[str, str, str, str],
+            destination: str,
+            category: str
+    ) -> Optional[List[Dict]]:
+        """
+        API'den çeker, önbelleğe ve kataloğa yazar
+        """
+        places = await self._fetch_from_api(destination, category)
+        if places is None:
+            return None
+
+        places_cache.set(key, places)
+        self._run_in_background(self._store_catalog(key, places))
+        return places
+
+    async def _store_catalog(self, key: Tuple[str, str, str, str], places: List[Dict]):
+        try:
+            await place_catalog.store(key[0], key[1], places)
+        except Exception as e:
+            print(f"Yer kataloğu yazılamadı: {e}")
+
+    def _schedule_refresh(self, key: Tuple[str, str, str, str], destination: str, category: str):
+        """
+        Aynı sorgu için tek bir arka plan yenilemesi başlatır
+        """
+        if key in self._refreshing:
+            return
+
+        self._refreshing.add(key)
+        self._run_in_background(self._refresh(key, destination, category))
+
+    async def _refresh(self, key: Tuple[str, str, str, str], destination: str, category: str):
+        try:
+            await self._fetch_and_store(key, destination, category)
+        finally:
+            self._refreshing.discard(key)
+
+    def _run_in_background(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _search_params(self, destination: str, category: str) -> Dict:
+        return {
+            "query": self._build_query(destination, category),
+            "key": self.api_key,
+            "language": self.language,
+            "region": self.region
+        }
+
+    async def _fetch_from_api(self, destination: str, category: str) -> Optional[List[Dict]]:
+        """
+        Google Places API'den yer önerilerini getirir, hata durumunda None döner
+        """
+        params = self._search_params(destination, category)
+
+        try:
+            data = await get_json(PLACES_TEXTSEARCH_URL, params, provider="google_places")
+
+            # Hatalı anahtar/kota yanıtları da HTTP 200 döner; boş sonuç olarak saklanmamalı
+            if data.get("status") not in (None, "OK", "ZERO_RESULTS"):
+                raise RuntimeError(f"Places text search hatası: {data.get('status')}")
+
+            return [
+                self._normalize_place(place, category)
+                for place in data.get("results", [])[:settings.PLACES_RESULTS_PER_QUERY]
+            ]
+
+        except Exception as e:
+            print(f"Google Places API hatası: {e}")
+            return None
+
+    async def fetch_all_pages(self, destination: str, category: str, max_pages: int = 3) -> List[Dict]:
+        """
+        Text search sonuçlarını next_page_token ile sayfalayarak getirir (toplu yükleme için)
+
+        Hatalar çağırana iletilir; aynı yer birden fazla sayfada gelirse bir kez alınır.
+        Sonraki sayfa token'ı hiç geçerli olmazsa o ana kadar toplanan yerler döner.
+        """
+        params = self._search_params(destination, category)
+        places: List[Dict] = []
+        seen: Set[str] = set()
+
+        for page in range(max_pages):
+            for _ in range(3):
+                data = await get_json(PLACES_TEXTSEARCH_URL, params, provider="google_places")
+
+                # Yeni token birkaç saniye geçmeden INVALID_REQUEST döner
+                if data.get("status") != "INVALID_REQUEST" or "pagetoken" not in params:
+                    break
+                await asyncio.sleep(settings.PLACES_NEXT_PAGE_DELAY_SECONDS)
+
+            # Token hâlâ geçersizse önceki sayfalarda toplananlar korunur
+            if data.get("status") == "INVALID_REQUEST" and "pagetoken" in params:
+                print(f"Places sayfalama {page + 1}. sayfada kesildi ({destination}, {category}): token geçerli olmadı")
+                break
+
+            if data.get("status") not in (None, "OK", "ZERO_RESULTS"):
+                raise RuntimeError(f"Places text search hatası: {data.get('status')}")
+
+            for result in data.get("results", []):
+                place = self._normalize_place(result, category)
+                if place["google_place_id"] in seen:
+                    continue
+                seen.add(place["google_place_id"])
+                places.append(place)
+
+            token = data.get("next_page_token")
+            if not token:
+                break
+
+            await asyncio.sleep(settings.PLACES_NEXT_PAGE_DELAY_SECONDS)
+            params = {"pagetoken": token, "key": self.api_key}
+
+        return places
+
+    def _normalize_place(self, place: Dict, category: str) -> Dict:
+        """
+        Places API sonucunu plan formatına çevirir
+        """
+        return {
+            "google_place_id": place.get("place_id"),
+            "name": place.get("name"),
+            "category": category,
+            "rating": place.get("rating", 0),
+            "price_level": place.get("price_level", 0),
+            "address": place.get("formatted_address", ""),
+            "latitude": place.get("geometry", {}).get("location", {}).get("lat"),
+            "longitude": place.get("geometry", {}).get("location", {}).get("lng"),
+            "photos": [photo.get("photo_reference") for photo in place.get("photos", [])[:1]],
+            "opening_hours": place.get("opening_hours", {}).get("open_now"),
+            "types": place.get("types", [])
+        }
+
+
+places_service = PlacesService()
+
+
+def get_places_cache_stats() -> Dict:
+    """
+    Places önbelleği istatistiklerini döndürür
+    """
+    return places_cache.stats()
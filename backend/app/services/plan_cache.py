@@ -0,0 +1,70 @@
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.services.gazetteer import gazetteer
+from app.utils.cache import TTLCache
+
+settings = get_settings()
+
+
+def bucket_weather(weather_forecast: Dict, days: int) -> List[List[bool]]:
+    """
+    Hava durumunu planı etkileyen eşiklere göre gruplar (yağmurlu, sıcak)
+    """
+    buckets = []
+    for day in range(1, days + 1):
+        weather_info = weather_forecast.get(f"day_{day}", {})
+        buckets.append([
+            weather_info.get("precipitation_chance", 0) > 70,
+            weather_info.get("temperature_max", 20) > 30
+        ])
+    return buckets
+
+
+class PlanCache:
+    """
+    Üretilmiş günlük planları girdilerin özetine göre saklayan önbellek
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(
+            ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+            max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+            max_bytes=settings.PLAN_CACHE_MAX_BYTES
+        )
+
+    def make_key(
+            self,
+            destination: str,
+            days: int,
+            user_preferences: Dict,
+            weather_forecast: Dict
+    ) -> str:
+        """
+        Plan girdilerinin kararlı SHA-256 özetini üretir
+        """
+        payload = json.dumps({
+            "destination": gazetteer.canonical_key(destination),
+            "days": days,
+            "preferences": user_preferences,
+            "weather": bucket_weather(weather_forecast, days)
+        }, sort_keys=True, ensure_ascii=False, default=str)
+
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Dict):
+        """
+        Planı saklar; tercihler anahtarın parçası olduğundan tercih değişince eski kayıt kullanılmaz
+        """
+        self._cache.set(key, value)
+
+    def stats(self) -> Dict:
+        return self._cache.stats()
+
+
+plan_cache = PlanCache()
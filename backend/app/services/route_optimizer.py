@@ -0,0 +1,198 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from app.services.geo import pairwise_haversine_km
+
+# Kayan nokta karşılaştırmaları için tolerans
+_EPSILON = 1e-9
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+class _Stop:
+    __slots__ = ("point", "group", "alternatives")
+
+    def __init__(self, point: int, group: int, alternatives: List[int]):
+        self.point = point
+        self.group = group
+        self.alternatives = alternatives
+
+
+def _cost(distances: np.ndarray, a: Optional[int], b: Optional[int]) -> float:
+    if a is None or b is None:
+        return 0.0
+    return float(distances[a, b])
+
+
+def _group_bounds(stops: List[_Stop]) -> List[tuple]:
+    """
+    Aynı zaman dilimindeki ardışık durakların [başlangıç, bitiş) aralıkları
+    """
+    bounds = []
+    start = 0
+    for i in range(1, len(stops) + 1):
+        if i == len(stops) or stops[i].group != stops[start].group:
+            bounds.append((start, i))
+            start = i
+    return bounds
+
+
+def _nearest_neighbour(distances: np.ndarray, stops: List[_Stop], bounds: List[tuple], locked: Set[int]):
+    """
+    Her zaman dilimini bir önceki duraktan başlayarak en yakın komşu sırasına dizer
+    """
+    previous = None
+    for start, end in bounds:
+        if stops[start].group in locked:
+            previous = stops[end - 1].point
+            continue
+
+        remaining = stops[start:end]
+        ordered = []
+        while remaining:
+            if previous is None:
+                chosen = remaining[0]
+            else:
+                chosen = min(remaining, key=lambda stop: _cost(distances, previous, stop.point))
+            remaining.remove(chosen)
+            ordered.append(chosen)
+            previous = chosen.point
+        stops[start:end] = ordered
+
+
+def _swap_pass(distances: np.ndarray, stops: List[_Stop], min_saving_km: float) -> bool:
+    """
+    Durakları aynı dilim ve kategorideki alternatifleriyle değiştirerek mesafeyi kısaltır
+    """
+    improved = False
+    used = {stop.point for stop in stops}
+
+    for i, stop in enumerate(stops):
+        previous = stops[i - 1].point if i > 0 else None
+        following = stops[i + 1].point if i + 1 < len(stops) else None
+
+        best_cost = _cost(distances, previous, stop.point) + _cost(distances, stop.point, following)
+        best = None
+        for alternative in stop.alternatives:
+            if alternative in used:
+                continue
+            cost = _cost(distances, previous, alternative) + _cost(distances, alternative, following)
+            if cost < best_cost - min_saving_km:
+                best_cost = cost
+                best = alternative
+
+        if best is not None:
+            used.discard(stop.point)
+            used.add(best)
+            stop.alternatives = [stop.point] + [a for a in stop.alternatives if a != best]
+            stop.point = best
+            improved = True
+
+    return improved
+
+
+def _two_opt_pass(distances: np.ndarray, stops: List[_Stop], bounds: List[tuple], locked: Set[int]) -> bool:
+    """
+    Zaman dilimi sınırlarını koruyarak 2-opt ters çevirmeleri uygular
+    """
+    improved = False
+
+    for start, end in bounds:
+        if stops[start].group in locked:
+            continue
+
+        for i in range(start, end - 1):
+            for j in range(i + 1, end):
+                before = stops[i - 1].point if i > 0 else None
+                after = stops[j + 1].point if j + 1 < len(stops) else None
+
+                current = _cost(distances, before, stops[i].point) + _cost(distances, stops[j].point, after)
+                reversed_cost = _cost(distances, before, stops[j].point) + _cost(distances, stops[i].point, after)
+
+                if reversed_cost < current - _EPSILON:
+                    stops[i:j + 1] = stops[i:j + 1][::-1]
+                    improved = True
+
+    return improved
+
+
+def optimize_day_route(problem: Dict) -> Dict:
+    """
+    Bir günün durak sırasını ve seçimlerini toplam mesafeyi azaltacak şekilde düzenler
+
+    problem:
+        coordinates: (m, 2) enlem/boylam dizisi
+        stops: zaman dilimi sırasındaki durakların nokta indeksleri
+        groups: her durağın zaman dilimi indeksi
+        alternatives: her durak için yerine geçebilecek nokta indeksleri
+        optimize: False ise yalnızca mesafeler hesaplanır
+        min_swap_saving_km: değişimin kabul edilmesi için gereken en az kazanç
+        max_rounds: en fazla iyileştirme turu
+        locked_groups: sırası ve durakları değiştirilmeyecek zaman dilimleri
+    """
+    coordinates = np.asarray(problem["coordinates"], dtype=np.float64).reshape(-1, 2)
+    stops = [
+        _Stop(point, group, list(alternatives))
+        for point, group, alternatives in zip(problem["stops"], problem["groups"], problem["alternatives"])
+    ]
+
+    if not stops:
+        return {"points": [], "groups": [], "legs_km": []}
+
+    # Konumu olmayan noktalar mesafeye katkı yapmaz
+    distances = np.nan_to_num(pairwise_haversine_km(coordinates[:, 0], coordinates[:, 1]), nan=0.0)
+
+    if problem.get("optimize", True):
+        bounds = _group_bounds(stops)
+        locked = set(problem.get("locked_groups", ()))
+        _nearest_neighbour(distances, stops, bounds, locked)
+
+        for _ in range(problem.get("max_rounds", 10)):
+            swapped = _swap_pass(distances, stops, problem.get("min_swap_saving_km", 0.0))
+            reversed_any = _two_opt_pass(distances, stops, bounds, locked)
+            if not swapped and not reversed_any:
+                break
+
+    points = [stop.point for stop in stops]
+    return {
+        "points": points,
+        "groups": [stop.group for stop in stops],
+        "legs_km": [float(distances[a, b]) for a, b in zip(points[:-1], points[1:])]
+    }
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Uzun planların rota optimizasyonu için paylaşılan süreç havuzu
+    """
+    global _process_pool
+
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=workers)
+
+    return _process_pool
+
+
+def discard_process_pool(executor: ProcessPoolExecutor):
+    """
+    Bozulan havuzu bırakır, sonraki çağrı yenisini açar
+    """
+    global _process_pool
+
+    if _process_pool is executor:
+        _process_pool = None
+        executor.shutdown(wait=False)
+
+
+def shutdown_process_pool():
+    """
+    Havuzu kapatır (uygulama kapanırken)
+    """
+    global _process_pool
+
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        _process_pool = None
@@ -0,0 +1,342 @@
+import heapq
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Minimum kalite eşiği
+MIN_SCORE = 30
+
+# Hava durumuna göre tercih edilen mekan tipleri
+INDOOR_TYPES = ("museum", "shopping_mall", "restaurant")
+OUTDOOR_TYPES = ("park", "tourist_attraction", "outdoor")
+
+# Açık olma durumunun puana eklendiği zaman dilimleri
+OPEN_NOW_SLOTS = ("morning", "afternoon")
+
+# Puanlamada kullanılan tiplerin bit karşılıkları
+_TYPE_BITS = {place_type: 1 << bit for bit, place_type in enumerate(INDOOR_TYPES + OUTDOOR_TYPES)}
+_INDOOR_MASK = sum(_TYPE_BITS[t] for t in INDOOR_TYPES)
+_OUTDOOR_MASK = sum(_TYPE_BITS[t] for t in OUTDOOR_TYPES)
+
+
+class CandidatePool:
+    """
+    Aday yerleri sütun dizilerine çeviren havuz
+    """
+
+    def __init__(self, places: List[Dict]):
+        self.places = places
+
+        self.rating = np.array([place.get("rating") or 0 for place in places], dtype=np.float64)
+        self.price_level = np.array(
+            [2 if place.get("price_level") is None else place.get("price_level") for place in places],
+            dtype=np.int64
+        )
+        self.open_now = np.array([bool(place.get("opening_hours")) for place in places], dtype=bool)
+        self.latitude = np.array(
+            [np.nan if place.get("latitude") is None else place.get("latitude") for place in places],
+            dtype=np.float64
+        )
+        self.longitude = np.array(
+            [np.nan if place.get("longitude") is None else place.get("longitude") for place in places],
+            dtype=np.float64
+        )
+
+        type_bits = np.zeros(len(places), dtype=np.int64)
+        for i, place in enumerate(places):
+            for place_type in place.get("types", []):
+                type_bits[i] |= _TYPE_BITS.get(place_type, 0)
+        self.indoor = (type_bits & _INDOOR_MASK) != 0
+        self.outdoor = (type_bits & _OUTDOOR_MASK) != 0
+
+        self.is_restaurant = np.array(["restaurant" in place.get("category", "") for place in places], dtype=bool)
+        self.types_text = np.array([" ".join(place.get("types", [])).lower() for place in places], dtype=str)
+
+        categories = [place.get("category", "") for place in places]
+        self.category_index: Dict[str, np.ndarray] = {}
+        for category in dict.fromkeys(categories):
+            self.category_index[category] = np.array(
+                [i for i, c in enumerate(categories) if c == category],
+                dtype=np.int64
+            )
+
+        # Plan genelinde tekrarı önlemek için yer anahtarı ve çeşitlilik için ana tip
+        self.place_keys = [place.get("google_place_id") or f"#{i}" for i, place in enumerate(places)]
+        primary_types = [(place.get("types") or [place.get("category", "")])[0] for place in places]
+        type_codes = {place_type: code for code, place_type in enumerate(dict.fromkeys(primary_types))}
+        self.primary_type = np.array([type_codes[t] for t in primary_types], dtype=np.int64)
+
+        self._cuisine_masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def cuisine_mask(self, cuisine: str) -> np.ndarray:
+        """
+        Tip listesinde mutfak tercihini içeren restoranlar
+        """
+        cuisine = cuisine.lower()
+        mask = self._cuisine_masks.get(cuisine)
+        if mask is None:
+            if len(self.places):
+                mask = self.is_restaurant & (np.char.find(self.types_text, cuisine) >= 0)
+            else:
+                mask = np.zeros(0, dtype=bool)
+            self._cuisine_masks[cuisine] = mask
+        return mask
+
+    def indices_for(self, category: str) -> np.ndarray:
+        return self.category_index.get(category, np.zeros(0, dtype=np.int64))
+
+    def scored_place(self, index: int, score: float) -> Dict:
+        """
+        Yeri puanıyla birlikte kopya olarak döndürür
+        """
+        return dict(self.places[index], ai_score=float(score))
+
+
+def base_scores(pool: CandidatePool, user_preferences: Dict) -> np.ndarray:
+    """
+    Rating ve kullanıcı tercihlerinden gelen gün/zaman bağımsız puanlar
+    """
+    scores = pool.rating * 10
+
+    cuisine = user_preferences.get("cuisine")
+    if isinstance(cuisine, str):
+        scores = scores + np.where(pool.cuisine_mask(cuisine), 20, 0)
+
+    budget = user_preferences.get("budget")
+    if budget == "budget":
+        scores = scores + np.where(pool.price_level <= 2, 15, 0)
+    elif budget == "luxury":
+        scores = scores + np.where(pool.price_level >= 3, 15, 0)
+
+    return scores
+
+
+def score_pool(
+        pool: CandidatePool,
+        user_preferences: Dict,
+        weather_by_day: Sequence[Dict],
+        time_slots: Sequence[str]
+) -> np.ndarray:
+    """
+    Tüm günler ve zaman dilimleri için puanları tek seferde hesaplar
+
+    Dönen dizinin şekli (gün, zaman dilimi, aday) şeklindedir.
+    """
+    base = base_scores(pool, user_preferences)
+
+    rainy = np.array(
+        [weather_info.get("precipitation_chance", 0) > 70 for weather_info in weather_by_day],
+        dtype=bool
+    )
+    weather_bonus = np.where(rainy[:, None], pool.indoor[None, :], pool.outdoor[None, :]) * 10
+
+    slot_bonus = np.array(
+        [pool.open_now if time_slot in OPEN_NOW_SLOTS else np.zeros(len(pool), dtype=bool)
+         for time_slot in time_slots],
+        dtype=np.float64
+    ).reshape(len(time_slots), len(pool)) * 5
+
+    return base[None, None, :] + weather_bonus[:, None, :] + slot_bonus[None, :, :]
+
+
+def select_top_k(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """
+    Eşiği geçen adaylardan en yüksek puanlı k tanesini seçer
+
+    Tüm adaylar sıralanmaz: argpartition ile k tanesi ayrılır, yalnızca onlar
+    sıralanır. Eşit puanlarda küçük havuz indeksi önce gelir.
+    """
+    eligible = candidates[scores[candidates] >= MIN_SCORE]
+    if eligible.size == 0 or k <= 0:
+        return eligible[:0]
+
+    if eligible.size > k:
+        eligible_scores = scores[eligible]
+        kth_score = eligible_scores[np.argpartition(-eligible_scores, k - 1)[k - 1]]
+
+        # Eşikteki eşit puanlılardan havuz sırasında önde olanlar alınır
+        above = eligible[eligible_scores > kth_score]
+        ties = eligible[eligible_scores == kth_score]
+        missing = k - above.size
+        if ties.size > missing:
+            ties = np.partition(ties, missing - 1)[:missing]
+        eligible = np.concatenate([above, ties])
+
+    return eligible[np.lexsort((eligible, -scores[eligible]))]
+
+
+def rank_slot_candidates(
+        pool: CandidatePool,
+        slot_scores: np.ndarray,
+        categories: Sequence[str],
+        limit: int = 2,
+        allowed: Optional[np.ndarray] = None,
+        excluded: Optional[np.ndarray] = None
+) -> List[np.ndarray]:
+    """
+    Zaman dilimindeki her kategori için en iyi aday indekslerini sıralı döndürür
+
+    allowed verilirse önce bu maskedeki adaylardan seçilir, eksik kalan
+    yerler havuzun geri kalanından tamamlanır. excluded maskesindeki
+    adaylar hiç seçilmez.
+    """
+    ranked = []
+
+    for category in categories:
+        candidates = pool.indices_for(category)
+        if excluded is not None:
+            candidates = candidates[~excluded[candidates]]
+
+        if allowed is None:
+            selected = select_top_k(slot_scores, candidates, limit)
+        else:
+            selected = select_top_k(slot_scores, candidates[allowed[candidates]], limit)
+
+            missing = limit - selected.size
+            if missing > 0:
+                rest = candidates[~allowed[candidates]]
+                selected = np.concatenate([selected, select_top_k(slot_scores, rest, missing)])
+
+        ranked.append(selected)
+
+    return ranked
+
+
+def allocate_plan(
+        pool: CandidatePool,
+        scores: np.ndarray,
+        slot_categories: Sequence[Sequence[str]],
+        picks: int = 2,
+        alternatives: int = 0,
+        day_labels: Optional[np.ndarray] = None,
+        off_cluster_penalty: float = 0.0,
+        diversity_penalty: float = 0.0,
+        excluded: Optional[np.ndarray] = None
+) -> List[List[List[np.ndarray]]]:
+    """
+    Yerleri tüm (gün, zaman dilimi, kategori) taleplerine plan genelinde dağıtır
+
+    Tüm talep/aday çiftleri tek bir yığında (heap) en yüksek düzeltilmiş puandan
+    başlayarak atanır ve aynı google_place_id planda bir kez kullanılır.
+    Düzeltilmiş puan, günün kümesi dışındaki adaylar ve gün içinde aynı ana
+    tipten önceden seçilmiş yer sayısı kadar düşürülür. Benzersiz aday
+    kalmazsa talepler, aynı günde tekrar etmeyecek şekilde kullanılmış
+    yerlerle tamamlanır. excluded maskesindeki adaylar hiç seçilmez.
+
+    Yığına havuzun tamamı değil, her talebin select_top_k ile seçilmiş en iyi
+    adayları girer. Bir kategoriden plan genelinde en fazla (o kategorideki
+    talep sayısı × talep başına yer) aday kullanılabildiği için bu kadarı
+    yeterlidir; kümeleme cezası varsa günün kümesindeki en iyiler de eklenir.
+
+    Dönen yapı [gün][zaman dilimi][kategori] -> aday indeksleridir; ilk
+    `picks` tanesi seçilen yerler, kalanlar rota için alternatiflerdir.
+    """
+    days = scores.shape[0]
+    demands = [
+        (day, slot, category_index, category)
+        for day in range(days)
+        for slot, categories in enumerate(slot_categories)
+        for category_index, category in enumerate(categories)
+    ]
+
+    category_demands = Counter(category for _, _, _, category in demands)
+    demand_candidates = []
+    for day, slot, _, category in demands:
+        candidates = pool.indices_for(category)
+        if excluded is not None:
+            candidates = candidates[~excluded[candidates]]
+
+        k = category_demands[category] * (picks + alternatives)
+        if candidates.size <= k:
+            # Küçük havuzda seçim gereksiz, sıralamayı yığın yapar
+            demand_candidates.append(candidates[scores[day, slot, candidates] >= MIN_SCORE])
+            continue
+
+        top = select_top_k(scores[day, slot], candidates, k)
+        if day_labels is not None and off_cluster_penalty > 0:
+            labels = day_labels[candidates]
+            in_cluster = candidates[(labels == day) | (labels == -1)]
+            top = np.union1d(top, select_top_k(scores[day, slot], in_cluster, k))
+        demand_candidates.append(top)
+
+    selected = [[[[] for _ in categories] for categories in slot_categories] for _ in range(days)]
+    spare = [[[[] for _ in categories] for categories in slot_categories] for _ in range(days)]
+
+    used_keys = set()
+    day_keys = [set() for _ in range(days)]
+    type_counts = [{} for _ in range(days)]
+
+    def adjusted(day: int, slot: int, index: int) -> float:
+        score = float(scores[day, slot, index])
+        if day_labels is not None and day_labels[index] not in (day, -1):
+            score -= off_cluster_penalty
+        return score - diversity_penalty * type_counts[day].get(int(pool.primary_type[index]), 0)
+
+    def select(day: int, index: int):
+        used_keys.add(pool.place_keys[index])
+        day_keys[day].add(pool.place_keys[index])
+        primary_type = int(pool.primary_type[index])
+        type_counts[day][primary_type] = type_counts[day].get(primary_type, 0) + 1
+
+    def fill(
+            target: List[List[List[List[int]]]],
+            capacity: int,
+            can_use: Callable[[int, int], bool],
+            on_assign: Callable[[int, int], None]
+    ):
+        heap = []
+        for demand, (day, slot, category_index, _) in enumerate(demands):
+            if len(target[day][slot][category_index]) >= capacity:
+                continue
+
+            for index in demand_candidates[demand]:
+                index = int(index)
+                if can_use(day, index):
+                    heap.append((-adjusted(day, slot, index), demand, index))
+        heapq.heapify(heap)
+
+        while heap:
+            negative_score, demand, index = heapq.heappop(heap)
+            day, slot, category_index, _ = demands[demand]
+            assigned = target[day][slot][category_index]
+            if len(assigned) >= capacity or not can_use(day, index):
+                continue
+
+            # Ceza yalnızca artabildiği için bayat kayıt güncel puanla geri konur
+            current = adjusted(day, slot, index)
+            if current < -negative_score - 1e-9:
+                heapq.heappush(heap, (-current, demand, index))
+                continue
+
+            assigned.append(index)
+            on_assign(day, index)
+
+    # 1) Benzersiz seçimler
+    fill(selected, picks, lambda day, index: pool.place_keys[index] not in used_keys, select)
+
+    # 2) Aday yetmezse günler arası tekrar, gün içinde tekrar yok
+    fill(selected, picks, lambda day, index: pool.place_keys[index] not in day_keys[day], select)
+
+    # 3) Rota alternatifleri de tek bir talebe ayrılır, günler aynı yeri seçemez
+    if alternatives > 0:
+        fill(
+            spare,
+            alternatives,
+            lambda day, index: pool.place_keys[index] not in used_keys,
+            lambda day, index: used_keys.add(pool.place_keys[index])
+        )
+
+    return [
+        [
+            [
+                np.array(chosen + extra, dtype=np.int64)
+                for chosen, extra in zip(selected[day][slot], spare[day][slot])
+            ]
+            for slot in range(len(slot_categories))
+        ]
+        for day in range(days)
+    ]
@@ -1,80 +1,145 @@
-
-import requests
+import asyncio
+import copy
+import json
+import re
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.models.trip import Trip, TravelRecommendation, DailyPlan
 from app.models.conversation import UserPreference
 from app.utils.config import get_settings
+from app.services.gazetteer import gazetteer
+from app.services.places_service import places_service
+from app.services.plan_cache import plan_cache
+from app.services.geo import cluster_by_day
+from app.services.route_optimizer import discard_process_pool, get_process_pool, optimize_day_route
+from app.services.scoring import CandidatePool, allocate_plan, rank_slot_candidates, score_pool
+from app.services.weather_service import weather_service
+from app.utils.singleflight import SingleFlight
 
 settings = get_settings()
 
+# Süreç genelinde devam eden plan üretimleri
+plan_flights = SingleFlight()
+
+TIME_SLOTS = ["morning", "lunch", "afternoon", "dinner", "evening"]
+
+# Zaman dilimleri için önerilen saatler
+SLOT_SUGGESTED_TIMES = {
+    "morning": "09:00-12:00",
+    "lunch": "12:00-14:00",
+    "afternoon": "14:00-18:00",
+    "dinner": "19:00-21:00",
+    "evening": "21:00-23:00"
+}
+
+# Aktivite süreleri (dakika)
+SLOT_DURATIONS = {
+    "morning": 180,  # 3 saat
+    "lunch": 120,  # 2 saat
+    "afternoon": 240,  # 4 saat
+    "dinner": 120,  # 2 saat
+    "evening": 120  # 2 saat
+}
+
+# Zaman dilimlerinin kategori tanımları
+SLOT_CATEGORIES = {
+    "morning": ["tourist_attraction", "museum", "park", "landmark"],
+    "lunch": ["restaurant", "cafe", "food"],
+    "afternoon": ["shopping_mall", "market", "cultural_center", "gallery"],
+    "dinner": ["restaurant", "local_cuisine", "fine_dining"],
+    "evening": ["bar", "nightclub", "theater", "entertainment"]
+}
+
+
+def pool_categories() -> List[str]:
+    """
+    Aday havuzu için çekilen kategoriler (her zaman diliminden en fazla 2)
+    """
+    return list(dict.fromkeys(
+        category
+        for time_slot in TIME_SLOTS
+        for category in SLOT_CATEGORIES.get(time_slot, ["tourist_attraction"])[:2]
+    ))
+
+
+def client_plan(travel_plan: Dict) -> Dict:
+    """
+    İstemciye dönen plan kopyası; aday havuzu yalnızca kayıtlı planda ve önbellekte tutulur
+    """
+    return {key: value for key, value in travel_plan.items() if key != "candidate_pool"}
+
+
+def _set_json_path(document: Dict, path: str, value) -> None:
+    """
+    "$.a.b[0].c" biçimindeki JSON yolunu belgede günceller
+    """
+    tokens = re.findall(r"\.([^.\[]+)|\[(\d+)\]", path[1:])
+    keys = [name if name else int(index) for name, index in tokens]
+
+    target = document
+    for key in keys[:-1]:
+        target = target[key]
+    target[keys[-1]] = value
+
 
 class TravelPlannerService:
     """
     Seyahat planları oluşturan ve öneri veren servis
+
+    Süreç başına tek örnek kullanılır (travel_planner); veritabanı oturumu
+    isteğe aittir ve ihtiyaç duyan metotlara parametre olarak verilir.
     """
 
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self):
         self.google_places_api_key = settings.GOOGLE_PLACES_API_KEY
         self.weather_api_key = settings.WEATHER_API_KEY
 
         # Kategori tanımları
-        self.categories = {
-            "morning": ["tourist_attraction", "museum", "park", "landmark"],
-            "lunch": ["restaurant", "cafe", "food"],
-            "afternoon": ["shopping_mall", "market", "cultural_center", "gallery"],
-            "dinner": ["restaurant", "local_cuisine", "fine_dining"],
-            "evening": ["bar", "nightclub", "theater", "entertainment"]
-        }
+        self.categories = SLOT_CATEGORIES
 
     async def generate_travel_plan(
             self,
+            db: Session,
             user_id: str,
             destination: str,
             days: int,
             start_date: Optional[datetime] = None,
-            preferences: Optional[Dict] = None
+            preferences: Optional[Dict] = None,
+            on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None
     ) -> Dict:
         """
         Kapsamlı seyahat planı oluşturur
+
+        on_progress verilirse her gün hazır olduğunda ilerleme bilgisiyle çağrılır.
         """
         try:
-            # Kullanıcı tercihlerini al
-            user_prefs = await self._get_user_preferences(user_id)
-
-            # Hava durumu bilgilerini al
-            weather_forecast = await self._get_weather_forecast(destination, days)
-
-            # Genel destinasyon bilgilerini al
-            destination_info = await self._get_destination_info(destination)
-
-            # Ana plan objesi
-            travel_plan = {
-                "destination": destination,
-                "days": days,
-                "start_date": start_date.isoformat() if start_date else None,
-                "weather_forecast": weather_forecast,
-                "general_info": destination_info,
-                "daily_plans": [],
-                "summary": {
-                    "total_recommendations": 0,
-                    "categories_covered": [],
-                    "estimated_budget": 0
-                }
-            }
+            # "baku", "Bakü'ye" gibi yazımlar tek kanonik ada indirgenir
+            destination = gazetteer.canonical_name(destination)
 
-            # Her gün için plan oluştur
-            for day in range(1, days + 1):
-                daily_plan = await self._create_daily_plan(
-                    destination,
-                    day,
-                    user_prefs,
-                    weather_forecast.get(f"day_{day}", {})
+            # Kullanıcı tercihlerini al
+            user_prefs = await self._get_user_preferences(db, user_id)
+
+            if on_progress is None:
+                # Aynı girdilerle eş zamanlı gelen istekler tek bir plan üretimini bekler
+                flight_key = self._plan_flight_key(destination, days, start_date, user_prefs)
+                shared_plan = await plan_flights.do(
+                    flight_key,
+                    lambda: self._build_travel_plan(destination, days, start_date, user_prefs)
                 )
-                travel_plan["daily_plans"].append(daily_plan)
-                travel_plan["summary"]["total_recommendations"] += len(daily_plan["recommendations"])
+            else:
+                # İlerleme yalnızca planı üreten çağırana bildirilebildiği için tekilleştirme atlanır
+                shared_plan = await self._build_travel_plan(
+                    destination, days, start_date, user_prefs, on_progress
+                )
+
+            # Ortak sonuç her çağırana ayrı kopya olarak döner
+            travel_plan = copy.deepcopy(shared_plan)
+            travel_plan["destination"] = destination
+            travel_plan["start_date"] = start_date.isoformat() if start_date else None
 
             return {
                 "status": "success",
@@ -88,21 +153,469 @@ class TravelPlannerService:
                 "message": f"Plan oluşturulurken hata: {str(e)}"
             }
 
-    async def _create_daily_plan(
+    def _plan_flight_key(
             self,
             destination: str,
+            days: int,
+            start_date: Optional[datetime],
+            user_preferences: Dict
+    ) -> Tuple:
+        """
+        Plan girdilerinin kanonik anahtarını üretir
+        """
+        return (
+            gazetteer.canonical_key(destination),
+            days,
+            start_date.date().isoformat() if start_date else None,
+            json.dumps(user_preferences, sort_keys=True, default=str)
+        )
+
+    async def stream_travel_plan(
+            self,
+            db: Session,
+            user_id: str,
+            destination: str,
+            days: int,
+            start_date: Optional[datetime] = None,
+            preferences: Optional[Dict] = None,
+            include_candidate_pool: bool = False
+    ) -> AsyncIterator[Dict]:
+        """
+        Planı parça parça üretir: önce başlık, sonra her gün, en son özet
+
+        include_candidate_pool ile planı kaydeden çağıranlar (plan işleri) aday
+        havuzunu da "candidate_pool" olayı olarak alır.
+
+        Başlık yer verisi beklenmeden gelir. Günler ise tüm havuz çekilip plan
+        genelinde dağıtıldıktan sonra, yalnızca rotası bitmiş oldukça gelir.
+        """
+        try:
+            destination = gazetteer.canonical_name(destination)
+            user_prefs = await self._get_user_preferences(db, user_id)
+
+            async for event, data in self._iter_travel_plan(destination, days, start_date, user_prefs):
+                # Aday havuzu yalnızca kaydedilen plan için tutulur, istemciye gönderilmez
+                if event == "candidate_pool" and not include_candidate_pool:
+                    continue
+                if event == "summary":
+                    data = dict(data, message=f"{destination} için {days} günlük planınız hazır!")
+                yield {"event": event, "data": data}
+
+        except Exception as e:
+            yield {
+                "event": "error",
+                "data": {"message": f"Plan oluşturulurken hata: {str(e)}"}
+            }
+
+    async def _build_travel_plan(
+            self,
+            destination: str,
+            days: int,
+            start_date: Optional[datetime],
+            user_prefs: Dict,
+            on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None
+    ) -> Dict:
+        """
+        Plan üretim hattını çalıştırıp parçaları tek plan objesinde birleştirir
+        """
+        travel_plan = {}
+
+        async for event, data in self._iter_travel_plan(destination, days, start_date, user_prefs):
+            if event == "header":
+                travel_plan = dict(data, daily_plans=[])
+            elif event == "candidate_pool":
+                travel_plan["candidate_pool"] = data
+            elif event == "day":
+                travel_plan["daily_plans"].append(data)
+                if on_progress is not None:
+                    await on_progress({
+                        "days_completed": len(travel_plan["daily_plans"]),
+                        "total_days": days,
+                        "current_day": data["day"]
+                    })
+            elif event == "summary":
+                travel_plan["summary"] = data
+
+        return travel_plan
+
+    async def _iter_travel_plan(
+            self,
+            destination: str,
+            days: int,
+            start_date: Optional[datetime],
+            user_prefs: Dict
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Plan üretim hattını çalıştırır, her gün rotası hazır olduğunda üretir
+
+        Havuz, puanlama ve dağıtım yerlerin günler arasında tekrar etmemesi için
+        tüm günlere birlikte yapılır; gün gün akan yalnızca rota optimizasyonudur.
+        """
+        # Hava durumu ve destinasyon bilgilerini paralel al
+        weather_forecast, destination_info = await asyncio.gather(
+            self._get_weather_forecast(destination, days),
+            self._get_destination_info(destination)
+        )
+
+        # Plan başlığı
+        yield "header", {
+            "destination": destination,
+            "days": days,
+            "start_date": start_date.isoformat() if start_date else None,
+            "weather_forecast": weather_forecast,
+            "general_info": destination_info
+        }
+
+        summary = {
+            "total_recommendations": 0,
+            "unique_places": 0,
+            "categories_covered": [],
+            "estimated_budget": 0
+        }
+
+        # Aynı girdilerle daha önce üretilmiş plan varsa yeniden puanlama yapılmaz
+        cache_key = plan_cache.make_key(destination, days, user_prefs, weather_forecast)
+        cached = plan_cache.get(cache_key)
+
+        if cached is not None:
+            yield "candidate_pool", copy.deepcopy(cached.get("candidate_pool", []))
+            for daily_plan in cached["daily_plans"]:
+                # İç içe yer listeleri de kopyalanır ki çağıranın değişikliği önbelleği bozmasın
+                daily_plan = copy.deepcopy(daily_plan)
+                daily_plan["weather"] = weather_forecast.get(f"day_{daily_plan['day']}", {})
+                yield "day", daily_plan
+            yield "summary", copy.deepcopy(cached["summary"])
+            return
+
+        # Plan için gereken tüm kategoriler tek seferde çekilir
+        pool = await self._build_candidate_pool(destination)
+
+        # Gün veya zaman dilimi yeniden üretilirken tekrar çekmeden puanlanabilmesi için
+        yield "candidate_pool", copy.deepcopy(pool.places)
+
+        # Tüm günler ve zaman dilimleri tek geçişte puanlanır
+        weather_by_day = [weather_forecast.get(f"day_{day}", {}) for day in range(1, days + 1)]
+        scores = score_pool(pool, user_prefs, weather_by_day, TIME_SLOTS)
+
+        # Adaylar her güne bir coğrafi küme düşecek şekilde bölünür
+        day_labels = self._cluster_candidates_by_day(pool, days)
+
+        # Yerler tüm günlere tek seferde, planda tekrar etmeyecek şekilde dağıtılır
+        allocation = allocate_plan(
+            pool,
+            scores,
+            [self._get_slot_categories(time_slot) for time_slot in TIME_SLOTS],
+            picks=2,
+            alternatives=settings.ROUTE_SWAP_CANDIDATES,
+            day_labels=day_labels,
+            off_cluster_penalty=settings.PLAN_OFF_CLUSTER_PENALTY,
+            diversity_penalty=settings.PLAN_DIVERSITY_PENALTY
+        )
+
+        # Rotalar günler sırayla beklenecek şekilde başlatılır
+        route_problems = [self._route_problem_from_ranked(pool, ranked_day) for ranked_day in allocation]
+
+        routes = self._schedule_routes([problem for problem, _ in route_problems])
+
+        daily_plans = []
+        plan_place_ids = set()
+        for day, (_, point_ids), route in zip(range(1, days + 1), route_problems, routes):
+            daily_plan = self._assemble_daily_plan(
+                day,
+                weather_by_day[day - 1],
+                pool,
+                scores[day - 1],
+                await route,
+                point_ids
+            )
+            daily_plans.append(daily_plan)
+            summary["total_recommendations"] += len(daily_plan["recommendations"])
+            plan_place_ids.update(place.get("google_place_id") for place in daily_plan["recommendations"])
+            summary["unique_places"] = len(plan_place_ids)
+
+            # Önbellekteki kopya sonradan değişmesin diye dışarıya kopya verilir
+            yield "day", copy.deepcopy(daily_plan)
+
+        # Dış servis hatasıyla boş kalan planlar önbelleğe alınmaz
+        if summary["total_recommendations"] > 0:
+            plan_cache.set(cache_key, {
+                "candidate_pool": pool.places,
+                "daily_plans": daily_plans,
+                "summary": copy.deepcopy(summary)
+            })
+
+        yield "summary", summary
+
+    async def regenerate_plan_fragment(
+            self,
+            db: Session,
+            user_id: str,
+            travel_plan: Dict,
             day: int,
-            user_preferences: Dict,
-            weather_info: Dict
+            time_slot: Optional[str] = None,
+            exclude_place_ids: Optional[List[str]] = None,
+            refresh_weather: bool = False
     ) -> Dict:
         """
-        Günlük detay plan oluşturur
+        Kayıtlı planın tek bir gününü veya zaman dilimini yeniden üretir
+
+        Plandaki aday havuzu yeniden puanlanır, yer aramaları tekrarlanmaz.
+        Dönen "updates" JSON yolu -> yeni değer eşlemesidir ve yalnızca
+        değişen parçaları içerir.
+        """
+        try:
+            daily_plans = travel_plan.get("daily_plans", [])
+            if not 1 <= day <= len(daily_plans):
+                return {"status": "error", "message": f"Planda {day}. gün bulunmuyor"}
+
+            if time_slot is not None and time_slot not in TIME_SLOTS:
+                return {"status": "error", "message": f"Geçersiz zaman dilimi: {time_slot}"}
+
+            destination = gazetteer.canonical_name(travel_plan.get("destination", ""))
+            places = travel_plan.get("candidate_pool")
+            if places is None:
+                # Aday havuzu tutulmadan önce oluşturulmuş planlar için önbellekten kurulur
+                pool = await self._build_candidate_pool(destination)
+            else:
+                pool = CandidatePool(places)
+
+            user_prefs = await self._get_user_preferences(db, user_id)
+            day_index = day - 1
+            updates = {}
+
+            weather_info = daily_plans[day_index].get("weather", {})
+            if refresh_weather:
+                forecast = await self._get_weather_forecast(destination, travel_plan.get("days", len(daily_plans)))
+                weather_info = forecast.get(f"day_{day}", weather_info)
+                updates[f"$.weather_forecast.day_{day}"] = weather_info
+
+            # Beğenilmeyen yerler ve planın diğer günlerindeki yerler önerilmez
+            used_elsewhere = {
+                place.get("google_place_id")
+                for other_day in daily_plans if other_day.get("day") != day
+                for place in other_day.get("recommendations", [])
+            }
+            excluded = np.isin(
+                np.array(pool.place_keys, dtype=object),
+                list(set(exclude_place_ids or []) | used_elsewhere)
+            )
+
+            if time_slot is None:
+                daily_plan = self._regenerate_day(pool, user_prefs, weather_info, day, len(daily_plans), excluded)
+                updates[f"$.daily_plans[{day_index}]"] = daily_plan
+            else:
+                daily_plan = self._regenerate_slot(
+                    pool, user_prefs, weather_info, daily_plans[day_index], time_slot, excluded
+                )
+                updates[f"$.daily_plans[{day_index}].time_slots.{time_slot}"] = daily_plan["time_slots"][time_slot]
+                updates[f"$.daily_plans[{day_index}].recommendations"] = daily_plan["recommendations"]
+                updates[f"$.daily_plans[{day_index}].route"] = daily_plan["route"]
+                if refresh_weather:
+                    updates[f"$.daily_plans[{day_index}].weather"] = weather_info
+
+            return {
+                "status": "success",
+                "day": day,
+                "time_slot": time_slot,
+                "daily_plan": daily_plan,
+                "updates": updates,
+                "message": f"{day}. gün" + (f" ({time_slot})" if time_slot else "") + " yeniden oluşturuldu"
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Plan yeniden oluşturulurken hata: {str(e)}"
+            }
+
+    def _regenerate_day(
+            self,
+            pool: CandidatePool,
+            user_prefs: Dict,
+            weather_info: Dict,
+            day: int,
+            days: int,
+            excluded: np.ndarray
+    ) -> Dict:
+        """
+        Günü aynı kümeleme ve dağıtım kurallarıyla havuzdan yeniden seçer
+        """
+        scores = score_pool(pool, user_prefs, [weather_info], TIME_SLOTS)
+
+        # Kümeleme sabit tohumla çalıştığı için gün ilk plandaki bölgesini korur
+        day_labels = self._cluster_candidates_by_day(pool, days)
+        if day_labels is not None:
+            day_labels = np.where(day_labels == day - 1, 0, np.where(day_labels == -1, -1, 1))
+
+        allocation = allocate_plan(
+            pool,
+            scores,
+            [self._get_slot_categories(time_slot) for time_slot in TIME_SLOTS],
+            picks=2,
+            alternatives=settings.ROUTE_SWAP_CANDIDATES,
+            day_labels=day_labels,
+            off_cluster_penalty=settings.PLAN_OFF_CLUSTER_PENALTY,
+            diversity_penalty=settings.PLAN_DIVERSITY_PENALTY,
+            excluded=excluded
+        )
+
+        problem, point_ids = self._route_problem_from_ranked(pool, allocation[0])
+        route = optimize_day_route(problem)
+
+        return self._assemble_daily_plan(day, weather_info, pool, scores[0], route, point_ids)
+
+    def _regenerate_slot(
+            self,
+            pool: CandidatePool,
+            user_prefs: Dict,
+            weather_info: Dict,
+            daily_plan: Dict,
+            time_slot: str,
+            excluded: np.ndarray
+    ) -> Dict:
+        """
+        Yalnızca bir zaman dilimini puanlar; diğer dilimler ve sıraları korunur
+        """
+        slot_index = TIME_SLOTS.index(time_slot)
+        slot_scores = score_pool(pool, user_prefs, [weather_info], [time_slot])[0, 0]
+
+        # Günün diğer dilimlerindeki yerler tekrar önerilmez
+        kept_ids = {
+            place.get("google_place_id")
+            for other_slot, slot in daily_plan["time_slots"].items() if other_slot != time_slot
+            for place in slot["recommendations"]
+        }
+        excluded = excluded | np.isin(np.array(pool.place_keys, dtype=object), list(kept_ids))
+
+        point_places: List[Dict] = []
+        stops, groups, alternatives = [], [], []
+
+        for index, other_slot in enumerate(TIME_SLOTS):
+            if index == slot_index:
+                ranked = rank_slot_candidates(
+                    pool,
+                    slot_scores,
+                    self._get_slot_categories(time_slot),
+                    2 + settings.ROUTE_SWAP_CANDIDATES,
+                    excluded=excluded
+                )
+                for candidates in ranked:
+                    points = []
+                    for candidate in candidates:
+                        points.append(len(point_places))
+                        point_places.append(pool.scored_place(candidate, slot_scores[candidate]))
+                    for point in points[:2]:
+                        stops.append(point)
+                        groups.append(index)
+                        alternatives.append(points[2:])
+            else:
+                for place in daily_plan["time_slots"].get(other_slot, {}).get("recommendations", []):
+                    stops.append(len(point_places))
+                    groups.append(index)
+                    alternatives.append([])
+                    point_places.append(place)
+
+        problem = {
+            "coordinates": np.array(
+                [[np.nan if place.get(key) is None else place.get(key) for key in ("latitude", "longitude")]
+                 for place in point_places],
+                dtype=np.float64
+            ).reshape(-1, 2),
+            "stops": stops,
+            "groups": groups,
+            "alternatives": alternatives,
+            "optimize": settings.ROUTE_OPTIMIZATION,
+            "min_swap_saving_km": settings.ROUTE_MIN_SWAP_SAVING_KM,
+            "locked_groups": [index for index in range(len(TIME_SLOTS)) if index != slot_index]
+        }
+        route = optimize_day_route(problem)
+
+        regenerated = copy.deepcopy(daily_plan)
+        regenerated["weather"] = weather_info
+        regenerated["time_slots"][time_slot] = {
+            "recommendations": [
+                point_places[point] for point, group in zip(route["points"], route["groups"]) if group == slot_index
+            ],
+            "suggested_time": self._get_suggested_time(time_slot),
+            "duration": self._get_estimated_duration(time_slot)
+        }
+        regenerated["recommendations"] = [point_places[point] for point in route["points"]]
+        regenerated["route"] = self._describe_route(point_places, route)
+
+        return regenerated
+
+    def persist_plan_updates(self, db: Session, conversation, updates: Dict) -> None:
+        """
+        Plandaki yalnızca değişen parçaları veritabanına yazar
+
+        SQLite'ta tüm planı yeniden yazmak yerine json_set ile ilgili yollar güncellenir.
+        """
+        if not updates:
+            return
+
+        if db.get_bind().dialect.name == "sqlite":
+            arguments = []
+            params = {"conversation_id": conversation.id}
+            for index, (path, value) in enumerate(updates.items()):
+                arguments.append(f":path_{index}, json(:value_{index})")
+                params[f"path_{index}"] = path
+                params[f"value_{index}"] = json.dumps(value, ensure_ascii=False, default=str)
+
+            table = conversation.__table__.name
+            db.execute(
+                text(f"UPDATE {table} SET travel_plan = json_set(travel_plan, {', '.join(arguments)}) "
+                     f"WHERE id = :conversation_id"),
+                params
+            )
+            db.commit()
+            db.expire(conversation, ["travel_plan"])
+            return
+
+        # Diğer veritabanlarında parçalar bellekte uygulanıp plan yazılır
+        travel_plan = copy.deepcopy(conversation.travel_plan)
+        for path, value in updates.items():
+            _set_json_path(travel_plan, path, value)
+        conversation.travel_plan = travel_plan
+        db.commit()
+
+    async def _build_candidate_pool(self, destination: str) -> CandidatePool:
+        """
+        Tüm zaman dilimlerinin kategorilerini çekip tek aday havuzunda birleştirir
+        """
+        categories = pool_categories()
+
+        category_places = await asyncio.gather(
+            *[self._fetch_places_from_google(destination, category) for category in categories],
+            return_exceptions=True
+        )
+
+        places = []
+        for category, result in zip(categories, category_places):
+            if isinstance(result, Exception):
+                print(f"Kategori {category} için öneri alınırken hata: {result}")
+                continue
+            places.extend(result)
+
+        return CandidatePool(places)
+
+    def _assemble_daily_plan(
+            self,
+            day: int,
+            weather_info: Dict,
+            pool: CandidatePool,
+            day_scores: np.ndarray,
+            route: Dict,
+            point_ids: List[int]
+    ) -> Dict:
+        """
+        Optimize edilmiş rotadan günlük planı oluşturur
         """
         daily_plan = {
             "day": day,
             "weather": weather_info,
             "time_slots": {},
             "recommendations": [],
+            "route": self._describe_route([pool.places[index] for index in point_ids], route),
             "notes": []
         }
 
@@ -113,16 +626,13 @@ class TravelPlannerService:
         if weather_info.get("temperature_max", 20) > 30:
             daily_plan["notes"].append("🌡️ Hava sıcak, gölgeli yerler ve bol su tüketimi önerilir")
 
-        # Her zaman dilimi için öneriler al
-        time_slots = ["morning", "lunch", "afternoon", "dinner", "evening"]
-
-        for time_slot in time_slots:
-            recommendations = await self._get_recommendations_for_time_slot(
-                destination,
-                time_slot,
-                user_preferences,
-                weather_info
-            )
+        # Her zaman dilimi için öneriler rota sırasıyla eklenir
+        for slot_index, time_slot in enumerate(TIME_SLOTS):
+            recommendations = [
+                pool.scored_place(point_ids[point], day_scores[slot_index, point_ids[point]])
+                for point, group in zip(route["points"], route["groups"])
+                if group == slot_index
+            ]
 
             daily_plan["time_slots"][time_slot] = {
                 "recommendations": recommendations,
@@ -134,199 +644,145 @@ class TravelPlannerService:
 
         return daily_plan
 
-    async def _get_recommendations_for_time_slot(
+    def _get_slot_categories(self, time_slot: str) -> List[str]:
+        return self.categories.get(time_slot, ["tourist_attraction"])[:2]  # Her zaman dilimi için max 2 kategori
+
+    def _route_problem_from_ranked(
             self,
-            destination: str,
-            time_slot: str,
-            user_preferences: Dict,
-            weather_info: Dict
-    ) -> List[Dict]:
-        """
-        Belirli zaman dilimi için öneriler getirir
+            pool: CandidatePool,
+            ranked_day: List[List[np.ndarray]]
+    ) -> Tuple[Dict, List[int]]:
         """
-        recommendations = []
-        categories = self.categories.get(time_slot, ["tourist_attraction"])
+        Zaman dilimi ve kategori başına sıralı adaylardan rota problemi kurar
 
-        for category in categories[:2]:  # Her zaman dilimi için max 2 kategori
-            try:
-                places = await self._fetch_places_from_google(destination, category)
-
-                # Kullanıcı tercihleri ve hava durumuna göre filtrele
-                filtered_places = self._filter_recommendations(
-                    places,
-                    user_preferences,
-                    weather_info,
-                    time_slot
-                )
+        Problem yalnızca ilgili noktaları içerir; ikinci değer yerel nokta
+        indekslerinin havuz indekslerine karşılığıdır.
+        """
+        point_ids: List[int] = []
+        local_index: Dict[int, int] = {}
+
+        def to_local(index) -> int:
+            index = int(index)
+            if index not in local_index:
+                local_index[index] = len(point_ids)
+                point_ids.append(index)
+            return local_index[index]
+
+        stops, groups, alternatives = [], [], []
+        for slot_index, ranked in enumerate(ranked_day):
+            # Her kategoriden max 2 öneri, kalanlar rota için alternatif
+            for candidates in ranked:
+                extra = [to_local(index) for index in candidates[2:]]
+                for index in candidates[:2]:
+                    stops.append(to_local(index))
+                    groups.append(slot_index)
+                    alternatives.append(extra)
+
+        problem = {
+            "coordinates": np.column_stack([pool.latitude[point_ids], pool.longitude[point_ids]]),
+            "stops": stops,
+            "groups": groups,
+            "alternatives": alternatives,
+            "optimize": settings.ROUTE_OPTIMIZATION,
+            "min_swap_saving_km": settings.ROUTE_MIN_SWAP_SAVING_KM
+        }
+        return problem, point_ids
 
-                recommendations.extend(filtered_places[:2])  # Her kategoriden max 2 öneri
+    def _schedule_routes(self, problems: List[Dict]) -> List[Awaitable[Dict]]:
+        """
+        Günlerin rota optimizasyonlarını başlatır, her gün ayrı beklenebilir
 
+        Uzun planlar event loop'u bloklamamak için süreç havuzunda çalışır.
+        """
+        if settings.ROUTE_OPTIMIZATION and len(problems) >= settings.ROUTE_PROCESS_POOL_MIN_DAYS:
+            try:
+                loop = asyncio.get_running_loop()
+                executor = get_process_pool(settings.ROUTE_PROCESS_POOL_WORKERS)
+                # Görev olarak sarılır ki plan yarıda bırakılsa da sonuçlar sahipsiz kalmasın
+                return [
+                    asyncio.ensure_future(self._await_pooled_route(
+                        executor, loop.run_in_executor(executor, optimize_day_route, problem), problem
+                    ))
+                    for problem in problems
+                ]
             except Exception as e:
-                print(f"Kategori {category} için öneri alınırken hata: {e}")
-                continue
+                print(f"Rota optimizasyonu süreç havuzunda çalıştırılamadı: {e}")
 
-        return recommendations
+        return [self._optimize_route_inline(problem) for problem in problems]
 
-    async def _fetch_places_from_google(self, destination: str, category: str) -> List[Dict]:
+    async def _await_pooled_route(self, executor, future: Awaitable[Dict], problem: Dict) -> Dict:
         """
-        Google Places API'den yer önerilerini getirir
+        Havuzdaki sonucu bekler; havuz hatasında (çöken süreç, pickle hatası) gün yerinde optimize edilir
         """
-        url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-
-        # Kategori bazlı arama sorguları
-        query_map = {
-            "restaurant": f"best restaurants in {destination}",
-            "tourist_attraction": f"top attractions in {destination}",
-            "museum": f"museums in {destination}",
-            "park": f"parks in {destination}",
-            "shopping_mall": f"shopping in {destination}",
-            "bar": f"bars nightlife in {destination}",
-            "cafe": f"cafes in {destination}"
-        }
-
-        params = {
-            "query": query_map.get(category, f"{category} in {destination}"),
-            "key": self.google_places_api_key,
-            "language": "tr",
-            "region": "tr"
-        }
-
         try:
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-
-            places = []
-            for place in data.get("results", [])[:5]:  # İlk 5 sonucu al
-                place_info = {
-                    "google_place_id": place.get("place_id"),
-                    "name": place.get("name"),
-                    "category": category,
-                    "rating": place.get("rating", 0),
-                    "price_level": place.get("price_level", 0),
-                    "address": place.get("formatted_address", ""),
-                    "latitude": place.get("geometry", {}).get("location", {}).get("lat"),
-                    "longitude": place.get("geometry", {}).get("location", {}).get("lng"),
-                    "photos": [photo.get("photo_reference") for photo in place.get("photos", [])[:1]],
-                    "opening_hours": place.get("opening_hours", {}).get("open_now"),
-                    "types": place.get("types", [])
-                }
-                places.append(place_info)
-
-            return places
-
+            return await future
         except Exception as e:
-            print(f"Google Places API hatası: {e}")
-            return []
+            print(f"Rota optimizasyonu süreç havuzunda başarısız, yerinde çalıştırılıyor: {e}")
+            if isinstance(e, BrokenProcessPool):
+                discard_process_pool(executor)
+            return optimize_day_route(problem)
 
-    def _filter_recommendations(
-            self,
-            places: List[Dict],
-            user_preferences: Dict,
-            weather_info: Dict,
-            time_slot: str
-    ) -> List[Dict]:
+    async def _optimize_route_inline(self, problem: Dict) -> Dict:
+        return optimize_day_route(problem)
+
+    def _describe_route(self, point_places: List[Dict], route: Dict) -> Dict:
         """
-        Önerileri kullanıcı tercihleri ve koşullara göre filtreler
+        Ardışık duraklar arasındaki mesafe ve tahmini ulaşım sürelerini döndürür
         """
-        filtered = []
-
-        for place in places:
-            score = 0
-
-            # Rating puanı
-            score += place.get("rating", 0) * 10
-
-            # Kullanıcı tercih puanı
-            for pref_type, pref_value in user_preferences.items():
-                if pref_type == "cuisine" and "restaurant" in place.get("category", ""):
-                    if pref_value.lower() in " ".join(place.get("types", [])).lower():
-                        score += 20
-
-                elif pref_type == "budget":
-                    price_level = place.get("price_level", 2)
-                    if pref_value == "budget" and price_level <= 2:
-                        score += 15
-                    elif pref_value == "luxury" and price_level >= 3:
-                        score += 15
-
-            # Hava durumu uyumu
-            if weather_info.get("precipitation_chance", 0) > 70:
-                # Yağmurlu havada kapalı mekanları tercih et
-                if any(t in place.get("types", []) for t in ["museum", "shopping_mall", "restaurant"]):
-                    score += 10
-            else:
-                # Güzel havada açık alanları tercih et
-                if any(t in place.get("types", []) for t in ["park", "tourist_attraction", "outdoor"]):
-                    score += 10
-
-            # Zaman uyumu
-            if time_slot in ["morning", "afternoon"] and place.get("opening_hours"):
-                score += 5
+        legs = []
+        for from_point, to_point, distance_km in zip(route["points"][:-1], route["points"][1:], route["legs_km"]):
+            from_place = point_places[from_point]
+            to_place = point_places[to_point]
+            legs.append({
+                "from": from_place.get("name"),
+                "from_place_id": from_place.get("google_place_id"),
+                "to": to_place.get("name"),
+                "to_place_id": to_place.get("google_place_id"),
+                "distance_km": round(distance_km, 2),
+                "travel_minutes": round(distance_km / settings.ROUTE_AVERAGE_SPEED_KMH * 60)
+            })
+
+        total_distance = sum(route["legs_km"])
+        return {
+            "legs": legs,
+            "total_distance_km": round(total_distance, 2),
+            "total_travel_minutes": round(total_distance / settings.ROUTE_AVERAGE_SPEED_KMH * 60)
+        }
 
-            place["ai_score"] = score
+    def _cluster_candidates_by_day(self, pool: CandidatePool, days: int) -> Optional[np.ndarray]:
+        """
+        Aday havuzunu koordinatlara göre gün sayısı kadar kümeye böler
+        """
+        if not settings.PLAN_GEO_CLUSTERING or days <= 1 or len(pool) == 0:
+            return None
 
-            # Minimum puan kontrolü
-            if score >= 30:  # Minimum kalite eşiği
-                filtered.append(place)
+        return cluster_by_day(pool.latitude, pool.longitude, days)
 
-        # Puana göre sırala
-        return sorted(filtered, key=lambda x: x["ai_score"], reverse=True)
+    async def _fetch_places_from_google(self, destination: str, category: str) -> List[Dict]:
+        """
+        Google Places API'den yer önerilerini getirir
+        """
+        return await places_service.fetch_places(destination, category)
 
     async def _get_weather_forecast(self, destination: str, days: int) -> Dict:
         """
         Hava durumu tahminini getirir
         """
-        try:
-            # OpenWeatherMap API
-            url = f"http://api.openweathermap.org/data/2.5/forecast"
-            params = {
-                "q": destination,
-                "appid": self.weather_api_key,
-                "units": "metric",
-                "lang": "tr"
-            }
-
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-
-            weather_forecast = {}
-
-            for i in range(min(days, 5)):  # Max 5 günlük tahmin
-                day_data = data.get("list", [])[i * 8] if len(data.get("list", [])) > i * 8 else {}
-
-                weather_forecast[f"day_{i + 1}"] = {
-                    "date": (datetime.now() + timedelta(days=i)).strftime("%Y-%m-%d"),
-                    "temperature_max": day_data.get("main", {}).get("temp_max", 20),
-                    "temperature_min": day_data.get("main", {}).get("temp_min", 15),
-                    "description": day_data.get("weather", [{}])[0].get("description", ""),
-                    "icon": day_data.get("weather", [{}])[0].get("icon", ""),
-                    "precipitation_chance": day_data.get("pop", 0) * 100,
-                    "humidity": day_data.get("main", {}).get("humidity", 50),
-                    "wind_speed": day_data.get("wind", {}).get("speed", 0)
-                }
-
-            return weather_forecast
-
-        except Exception as e:
-            print(f"Hava durumu API hatası: {e}")
-            # Varsayılan hava durumu
-            return {f"day_{i + 1}": {
-                "temperature_max": 22,
-                "temperature_min": 16,
-                "description": "Genellikle güzel",
-                "precipitation_chance": 20
-            } for i in range(days)}
+        return await weather_service.get_forecast(destination, days)
 
     async def _get_destination_info(self, destination: str) -> Dict:
         """
         Destinasyon hakkında genel bilgileri getirir
         """
+        known = gazetteer.resolve(destination) or {}
+
         return {
-            "destination": destination,
-            "country": "Azerbaycan" if "baku" in destination.lower() or "bakü" in destination.lower() else "Bilinmiyor",
-            "timezone": "Asia/Baku" if "baku" in destination.lower() else "UTC",
-            "currency": "AZN" if "baku" in destination.lower() else "USD",
-            "language": "Azerbaycan Türkçesi" if "baku" in destination.lower() else "Yerel Dil",
+            "destination": known.get("name", destination),
+            "destination_id": gazetteer.canonical_key(destination),
+            "country": known.get("country", "Bilinmiyor"),
+            "timezone": known.get("timezone", "UTC"),
+            "currency": known.get("currency", "USD"),
+            "language": known.get("language", "Yerel Dil"),
             "best_time_to_visit": "Nisan-Ekim",
             "emergency_numbers": {
                 "police": "102",
@@ -335,11 +791,11 @@ class TravelPlannerService:
             }
         }
 
-    async def _get_user_preferences(self, user_id: str) -> Dict:
+    async def _get_user_preferences(self, db: Session, user_id: str) -> Dict:
         """
         Kullanıcının geçmiş tercihlerini analiz eder
         """
-        prefs = self.db.query(UserPreference).filter(
+        prefs = db.query(UserPreference).filter(
             UserPreference.user_id == user_id
         ).all()
 
@@ -361,24 +817,14 @@ class TravelPlannerService:
         """
         Zaman dilimi için önerilen saatleri döndürür
         """
-        time_suggestions = {
-            "morning": "09:00-12:00",
-            "lunch": "12:00-14:00",
-            "afternoon": "14:00-18:00",
-            "dinner": "19:00-21:00",
-            "evening": "21:00-23:00"
-        }
-        return time_suggestions.get(time_slot, "Esnek")
+        return SLOT_SUGGESTED_TIMES.get(time_slot, "Esnek")
 
     def _get_estimated_duration(self, time_slot: str) -> int:
         """
         Aktivite süresini dakika cinsinden döndürür
         """
-        durations = {
-            "morning": 180,  # 3 saat
-            "lunch": 120,  # 2 saat
-            "afternoon": 240,  # 4 saat
-            "dinner": 120,  # 2 saat
-            "evening": 120  # 2 saat
-        }
-        return durations.get(time_slot, 120)
\ No newline at end of file
+        return SLOT_DURATIONS.get(time_slot, 120)
+
+
+# Süreç genelinde paylaşılan planlayıcı
+travel_planner = TravelPlannerService()
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.services.destinations import popular_destination_names
+from app.services.places_service import places_service
+from app.services.travel_planner import pool_categories
+from app.services.weather_service import weather_service
+
+settings = get_settings()
+
+
+class WarmupService:
+    """
+    Popüler destinasyonların Places ve hava durumu verisini önceden ısıtan servis
+
+    İlk tur açılışı bekletmeden arka planda çalışır. Sonraki turlar Places
+    önbelleği dolmadan ve yeni hava tahmini yayınlandığında zorla yeniler.
+    """
+
+    def __init__(self, destinations: Optional[List[str]] = None):
+        self.destinations = destinations or popular_destination_names()
+        self._state: Dict[str, Dict] = {
+            destination: {
+                "places": 0,
+                "places_warmed_at": None,
+                "weather_warmed_at": None,
+                "places_due_at": 0.0,
+                "weather_due_at": 0.0,
+                "error": None
+            }
+            for destination in self.destinations
+        }
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._first_pass_done = False
+
+    def start(self):
+        """
+        Isıtmayı arka planda başlatır (çağıran beklemez)
+        """
+        if self._task is not None or not settings.WARMUP_ENABLED:
+            return
+
+        self._started_at = time.time()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        await self.warm_all(force=False)
+        self._first_pass_done = True
+
+        while True:
+            await asyncio.sleep(self._next_due_in())
+            # Çevrimdışı modda API'ye gidilmez, katalog yeniden önbelleğe alınır
+            await self.warm_all(force=not settings.OFFLINE_MODE)
+
+    def _next_due_in(self) -> float:
+        """
+        En yakın yenilemeye kalan süre
+        """
+        due_times = [
+            due_at
+            for state in self._state.values()
+            for due_at in (state["places_due_at"], state["weather_due_at"])
+            if due_at is not None
+        ]
+        if not due_times:
+            return float(settings.WARMUP_RETRY_SECONDS)
+
+        return max(1.0, min(due_times) - time.time())
+
+    async def warm_all(self, force: bool = False):
+        """
+        Zamanı gelen destinasyonları sınırlı eşzamanlılıkla ısıtır
+        """
+        semaphore = asyncio.Semaphore(settings.WARMUP_CONCURRENCY)
+
+        async def warm(destination: str):
+            async with semaphore:
+                await self.warm_destination(destination, force)
+
+        await asyncio.gather(*[warm(destination) for destination in self.destinations])
+
+    async def warm_destination(self, destination: str, force: bool = False):
+        """
+        Destinasyonun zamanı gelen Places ve hava durumu verisini yeniler
+        """
+        state = self._state[destination]
+        now = time.time()
+
+        if state["places_due_at"] is not None and now >= state["places_due_at"]:
+            await self._warm_places(destination, state, force)
+
+        if state["weather_due_at"] is not None and now >= state["weather_due_at"]:
+            await self._warm_weather(destination, state, force)
+
+    async def _warm_places(self, destination: str, state: Dict, force: bool):
+        counts = await asyncio.gather(*[
+            places_service.prefetch(destination, category, force)
+            for category in pool_categories()
+        ])
+
+        if sum(counts) == 0:
+            state["error"] = "Places verisi alınamadı"
+            state["places_due_at"] = time.time() + settings.WARMUP_RETRY_SECONDS
+            return
+
+        state["places"] = sum(counts)
+        state["places_warmed_at"] = time.time()
+        # Önbellek süresi dolmadan, pay bırakılarak yenilenir
+        state["places_due_at"] = state["places_warmed_at"] + max(
+            settings.PLACES_CACHE_TTL_SECONDS - settings.WARMUP_REFRESH_MARGIN_SECONDS,
+            settings.WARMUP_RETRY_SECONDS
+        )
+        state["error"] = None
+
+    async def _warm_weather(self, destination: str, state: Dict, force: bool):
+        if settings.OFFLINE_MODE:
+            state["weather_due_at"] = None
+            return
+
+        try:
+            await weather_service.get_forecast_data(destination, force=force)
+        except Exception as e:
+            print(f"Hava durumu ısıtılamadı ({destination}): {e}")
+            state["error"] = f"Hava durumu alınamadı: {e}"
+            state["weather_due_at"] = time.time() + settings.WARMUP_RETRY_SECONDS
+            return
+
+        state["weather_warmed_at"] = time.time()
+        # Tahmin önbelleği yeni yayınla birlikte geçersizleşir, o anda yenilenir
+        state["weather_due_at"] = state["weather_warmed_at"] + weather_service.seconds_until_forecast_update()
+
+    def _is_warm(self, state: Dict) -> bool:
+        weather_warm = state["weather_warmed_at"] is not None or settings.OFFLINE_MODE
+        return state["places_warmed_at"] is not None and weather_warm
+
+    def is_ready(self) -> bool:
+        """
+        İlk tur bittiyse ya da bekleme süresi dolduysa trafik alınabilir
+        """
+        if not settings.WARMUP_ENABLED or self._first_pass_done:
+            return True
+
+        if self._started_at is None:
+            return False
+
+        return time.time() - self._started_at >= settings.WARMUP_READY_TIMEOUT_SECONDS
+
+    def status(self) -> Dict:
+        now = time.time()
+
+        return {
+            "enabled": settings.WARMUP_ENABLED,
+            "ready": self.is_ready(),
+            "warm": all(self._is_warm(state) for state in self._state.values()),
+            "first_pass_done": self._first_pass_done,
+            "destinations": {
+                destination: {
+                    "warm": self._is_warm(state),
+                    "places": state["places"],
+                    "places_age_seconds": round(now - state["places_warmed_at"], 1) if state["places_warmed_at"] else None,
+                    "weather_age_seconds": round(now - state["weather_warmed_at"], 1) if state["weather_warmed_at"] else None,
+                    "error": state["error"]
+                }
+                for destination, state in self._state.items()
+            }
+        }
+
+
+warmup_service = WarmupService()
@@ -1,83 +1,185 @@
-import requests
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
 from ..config import settings
+from .gazetteer import gazetteer
+from ..utils.cache import TTLCache
+from ..utils.http_client import get_json
+from ..utils.singleflight import SingleFlight
+
+# OpenWeatherMap 5 günlük tahmini 3 saatlik adımlarla yayınlar
+FORECAST_STEPS_PER_DAY = 8
 
 
 class WeatherService:
-    def __init__(self):
-        self.api_key = settings.OPENWEATHERMAP_API_KEY
-        self.base_url = "http://api.openweathermap.org/data/2.5"
+    """
+    Planlayıcı ve hava durumu route'larının ortak kullandığı hava durumu sağlayıcısı
+    """
 
-    async def get_current_weather(self, city: str):
-        """Şu anki hava durumu"""
-        try:
-            url = f"{self.base_url}/weather"
+    def __init__(self) -> None:
+        self.api_key = settings.WEATHER_API_KEY
+        self.base_url = settings.OPENWEATHERMAP_BASE_URL
+
+        self._forecast_cache = TTLCache(
+            ttl_seconds=settings.WEATHER_FORECAST_INTERVAL_SECONDS,
+            max_entries=settings.WEATHER_CACHE_MAX_ENTRIES
+        )
+        self._current_cache = TTLCache(
+            ttl_seconds=settings.WEATHER_CURRENT_TTL_SECONDS,
+            max_entries=settings.WEATHER_CACHE_MAX_ENTRIES
+        )
+        # Sağlayıcıya ulaşılamadığında sunulacak son başarılı yanıtlar
+        self._stale_cache = TTLCache(
+            ttl_seconds=settings.WEATHER_STALE_TTL_SECONDS,
+            max_entries=settings.WEATHER_CACHE_MAX_ENTRIES * 2
+        )
+        self._flights = SingleFlight()
+
+    def _normalize_city(self, city: str) -> str:
+        return gazetteer.canonical_key(city)
+
+    def _forecast_ttl(self) -> float:
+        """
+        Önbellek süresini bir sonraki tahmin yayın zamanına hizalar
+        """
+        interval = settings.WEATHER_FORECAST_INTERVAL_SECONDS
+        now = time.time()
+        next_update = (now // interval + 1) * interval + settings.WEATHER_FORECAST_PUBLISH_DELAY_SECONDS
+        return max(next_update - now, settings.WEATHER_MIN_TTL_SECONDS)
+
+    def seconds_until_forecast_update(self) -> float:
+        """
+        Tahmin önbelleğinin bir sonraki yayınla geçersizleşmesine kalan süre
+        """
+        return self._forecast_ttl()
+
+    async def _get_cached(
+            self,
+            cache: TTLCache,
+            kind: str,
+            city: str,
+            ttl: Optional[float] = None,
+            force: bool = False
+    ) -> Dict:
+        """
+        Önbellekte yoksa (veya force ise) aynı şehir için tek bir istek yaparak veriyi getirir
+        """
+        key = self._normalize_city(city)
+
+        data = None if force else cache.get(key)
+        if data is not None:
+            return data
+
+        async def fetch() -> Dict:
             params = {
                 "q": city,
                 "appid": self.api_key,
                 "units": "metric",
                 "lang": "tr"
             }
+            try:
+                if settings.OFFLINE_MODE:
+                    raise RuntimeError("Çevrimdışı modda hava durumu servisine erişilmez")
+                result = await get_json(f"{self.base_url}/{kind}", params, provider="openweathermap")
+            except Exception:
+                stale = self._stale_cache.get((kind, key))
+                if stale is None:
+                    raise
+                return stale
 
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            cache.set(key, result, ttl)
+            self._stale_cache.set((kind, key), result)
+            return result
 
-            data = response.json()
-            return {
-                "city": city,
-                "temperature": data["main"]["temp"],
-                "description": data["weather"][0]["description"],
-                "humidity": data["main"]["humidity"],
-                "wind_speed": data["wind"]["speed"],
-                "feels_like": data["main"]["feels_like"]
-            }
-        except Exception as e:
-            return {"error": f"Hava durumu alınamadı: {str(e)}"}
+        return await self._flights.do((kind, key), fetch)
 
+    async def get_forecast_data(self, city: str, force: bool = False) -> Dict:
+        """
+        Ham 5 günlük / 3 saatlik tahmin verisini döndürür
 
-weather_service = WeatherService()
-import requests
-from ..config import settings
+        force ile önbellek süresi dolmadan yenilenir (ısıtma için).
+        """
+        return await self._get_cached(self._forecast_cache, "forecast", city, self._forecast_ttl(), force)
 
+    async def get_forecast(self, city: str, days: int) -> Dict:
+        """
+        Planlayıcı için gün bazlı hava durumu tahminini döndürür
+        """
+        try:
+            data = await self.get_forecast_data(city)
+            forecast_list = data.get("list", [])
 
-class WeatherService:
-    def __init__(self) -> None:
-        self.api_key = settings.OPENWEATHERMAP_API_KEY
-        self.base_url = "http://api.openweathermap.org/data/2.5"
+            weather_forecast = {}
 
-    async def get_current_weather(self, city: str):
-        """Şu anki hava durumu"""
-        try:
-            if self.api_key == "test-key":
-                return {
-                    "city": city,
-                    "temperature": 22,
-                    "description": "güneşli",
-                    "humidity": 65,
-                    "wind_speed": 3.2,
-                    "note": "Test verisi - gerçek API key ekleyin"
+            for i in range(min(days, 5)):  # Max 5 günlük tahmin
+                index = i * FORECAST_STEPS_PER_DAY
+                day_data = forecast_list[index] if len(forecast_list) > index else {}
+
+                weather_forecast[f"day_{i + 1}"] = {
+                    "date": (datetime.now() + timedelta(days=i)).strftime("%Y-%m-%d"),
+                    "temperature_max": day_data.get("main", {}).get("temp_max", 20),
+                    "temperature_min": day_data.get("main", {}).get("temp_min", 15),
+                    "description": day_data.get("weather", [{}])[0].get("description", ""),
+                    "icon": day_data.get("weather", [{}])[0].get("icon", ""),
+                    "precipitation_chance": day_data.get("pop", 0) * 100,
+                    "humidity": day_data.get("main", {}).get("humidity", 50),
+                    "wind_speed": day_data.get("wind", {}).get("speed", 0)
                 }
 
-            url = f"{self.base_url}/weather"
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": "metric",
-                "lang": "tr"
-            }
+            return weather_forecast
+
+        except Exception as e:
+            print(f"Hava durumu API hatası: {e}")
+            # Varsayılan hava durumu
+            return {f"day_{i + 1}": {
+                "temperature_max": 22,
+                "temperature_min": 16,
+                "description": "Genellikle güzel",
+                "precipitation_chance": 20
+            } for i in range(days)}
 
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+    async def get_daily_forecast(self, city: str) -> List[Dict]:
+        """
+        Route'lar için günlük özet tahmin listesini döndürür
+        """
+        data = await self.get_forecast_data(city)
 
-            data = response.json()
+        daily = []
+        for entry in data.get("list", [])[::FORECAST_STEPS_PER_DAY]:
+            daily.append({
+                "date": datetime.utcfromtimestamp(entry.get("dt", 0)).strftime("%Y-%m-%d"),
+                "temperature": entry.get("main", {}).get("temp"),
+                "temperature_max": entry.get("main", {}).get("temp_max"),
+                "temperature_min": entry.get("main", {}).get("temp_min"),
+                "description": entry.get("weather", [{}])[0].get("description", ""),
+                "precipitation_chance": entry.get("pop", 0) * 100
+            })
+
+        return daily
+
+    async def get_current_weather(self, city: str):
+        """Şu anki hava durumu"""
+        try:
+            data = await self._get_cached(self._current_cache, "weather", city)
             return {
                 "city": city,
                 "temperature": data["main"]["temp"],
                 "description": data["weather"][0]["description"],
                 "humidity": data["main"]["humidity"],
-                "wind_speed": data["wind"]["speed"]
+                "wind_speed": data["wind"]["speed"],
+                "feels_like": data["main"]["feels_like"]
             }
         except Exception as e:
             return {"error": f"Hava durumu alınamadı: {str(e)}"}
 
+    def stats(self) -> Dict:
+        return {
+            "forecast_cache": self._forecast_cache.stats(),
+            "current_cache": self._current_cache.stats(),
+            "stale_cache": self._stale_cache.stats(),
+            "in_flight": self._flights.stats()
+        }
+
 
-weather_service = WeatherService()
\ No newline at end of file
+weather_service = WeatherService()
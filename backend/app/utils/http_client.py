@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import get_settings
+from app.utils.outbound import ThrottledError, get_governor
+
+settings = get_settings()
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_session() -> requests.Session:
+    """
+    Tüm dış API çağrılarının paylaştığı keep-alive bağlantı havuzunu döndürür
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=settings.HTTP_POOL_MAXSIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+
+    return _session
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """
+    Aynı anda açık olabilecek dış istek sayısını sınırlayan semaforu döndürür
+    """
+    global _semaphore
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.HTTP_MAX_CONCURRENCY)
+
+    return _semaphore
+
+
+def _get_json_blocking(url: str, params: Dict, timeout: float) -> Dict:
+    response = get_session().get(url, params=params, timeout=timeout)
+    if response.status_code == 429:
+        raise ThrottledError(f"HTTP 429: {url}")
+    response.raise_for_status()
+
+    data = response.json()
+    # Google API'leri limit aşımını 200 yanıtı içinde bildirir
+    if isinstance(data, dict) and data.get("status") == "OVER_QUERY_LIMIT":
+        raise ThrottledError(f"OVER_QUERY_LIMIT: {url}")
+    return data
+
+
+async def get_json(
+        url: str,
+        params: Dict,
+        timeout: Optional[float] = None,
+        provider: Optional[str] = None
+) -> Dict:
+    """
+    GET isteğini event loop'u bloklamadan yapar ve JSON gövdesini döndürür
+
+    provider verilirse istek o sağlayıcının limit, devre kesici ve
+    hedging kurallarına göre yapılır.
+    """
+    async def request() -> Dict:
+        async with _get_semaphore():
+            return await asyncio.to_thread(
+                _get_json_blocking,
+                url,
+                params,
+                timeout or settings.HTTP_TIMEOUT_SECONDS
+            )
+
+    if provider is None:
+        return await request()
+
+    return await get_governor(provider).call(request)
+
+
+def close_session():
+    """
+    Bağlantı havuzunu kapatır (uygulama kapanırken)
+    """
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
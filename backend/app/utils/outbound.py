@@ -0,0 +1,387 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class CircuitOpenError(Exception):
+    """
+    Sağlayıcının devre kesicisi açıkken yapılan çağrılar için hata
+    """
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} geçici olarak devre dışı (circuit breaker açık)")
+        self.provider = provider
+
+
+class ThrottledError(Exception):
+    """
+    Sağlayıcı istek limitine takıldığında (HTTP 429, OVER_QUERY_LIMIT)
+    """
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Tekrar denemenin anlamlı olduğu geçici hatalar
+    """
+    if isinstance(error, (ThrottledError, requests.ConnectionError, requests.Timeout)):
+        return True
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+
+    return False
+
+
+class TokenBucket:
+    """
+    Dakikalık limite göre çalışan, limit aşımında hızını düşüren token bucket
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None):
+        self.max_rate = rate_per_minute / 60.0
+        self.rate = self.max_rate
+        self.capacity = burst if burst is not None else max(rate_per_minute, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    async def acquire(self):
+        """
+        Token alınana kadar bekler
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def on_throttled(self):
+        # Limit aşımında hızı yarıya indir (en az %10)
+        with self._lock:
+            self.rate = max(self.rate / 2, self.max_rate * 0.1)
+
+    def on_success(self):
+        # Başarılı isteklerde hızı yavaşça eski değerine çıkar
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """
+    Kayan penceredeki hata oranına göre açılan devre kesici
+    """
+
+    def __init__(self, failure_rate: float, min_requests: int, window_seconds: float, open_seconds: float):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = "closed"  # closed, open, half_open
+        self.opened_at = 0.0
+        self._results: deque = deque()
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> Tuple[bool, bool]:
+        """
+        (izin verildi mi, bu çağrı yarı açık devrenin deneme isteği mi) döndürür
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True, False
+
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = "half_open"
+                self._trial_in_flight = False
+
+            # Yarı açıkken tek bir deneme isteğine izin verilir
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True, True
+
+            return False, False
+
+    def release_trial(self):
+        """
+        Sonucu sayılmayan deneme isteğinin (iptal, kalıcı hata) yerini boşaltır
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "closed"
+                self._results.clear()
+            self._record(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == "half_open":
+                self._open()
+                return
+
+            self._record(False)
+            failures = sum(1 for _, ok in self._results if not ok)
+            if len(self._results) >= self.min_requests and failures / len(self._results) >= self.failure_rate:
+                self._open()
+
+    def _record(self, ok: bool):
+        now = time.monotonic()
+        self._results.append((now, ok))
+        while self._results and now - self._results[0][0] > self.window_seconds:
+            self._results.popleft()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class LatencyHistogram:
+    """
+    Sabit kovalı gecikme histogramı (ms)
+    """
+
+    BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float):
+        with self._lock:
+            for i, bound in enumerate(self.BUCKETS_MS):
+                if latency_ms <= bound:
+                    self.counts[i] += 1
+                    break
+            self.total += 1
+            self.sum_ms += latency_ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Kova üst sınırlarından yüzdelik tahmini
+        """
+        with self._lock:
+            if not self.total:
+                return None
+
+            target = q * self.total
+            seen = 0
+            for bound, count in zip(self.BUCKETS_MS, self.counts):
+                seen += count
+                if seen >= target:
+                    return bound
+            return self.BUCKETS_MS[-1]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            buckets = {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.BUCKETS_MS, self.counts)
+            }
+            total = self.total
+            mean = self.sum_ms / total if total else None
+
+        return {
+            "count": total,
+            "mean_ms": round(mean, 2) if mean is not None else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets
+        }
+
+
+class ProviderGovernor:
+    """
+    Bir dış sağlayıcıya giden çağrıları limitleyen, gerektiğinde hızlı hata veren
+    ve yavaş istekleri yedek istekle (hedging) tamamlayan yönetici
+    """
+
+    def __init__(self, name: str, rate_per_minute: float):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_minute)
+        self.breaker = CircuitBreaker(
+            failure_rate=settings.OUTBOUND_BREAKER_FAILURE_RATE,
+            min_requests=settings.OUTBOUND_BREAKER_MIN_REQUESTS,
+            window_seconds=settings.OUTBOUND_BREAKER_WINDOW_SECONDS,
+            open_seconds=settings.OUTBOUND_BREAKER_OPEN_SECONDS
+        )
+        self.latency = LatencyHistogram()
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.retries = 0
+        self.hedges = 0
+
+    async def call(self, func: Callable[[], Awaitable[Any]], hedge: bool = True) -> Any:
+        """
+        Çağrıyı limit, devre kesici, hedging ve geri çekilmeli tekrar ile çalıştırır
+
+        Yan etkisi iki kez yaşanmaması gereken çağrılarda (akış açma) hedge=False verilir.
+        """
+        allowed, trial = self.breaker.allow()
+        if not allowed:
+            self.rejected += 1
+            raise CircuitOpenError(self.name)
+
+        self.calls += 1
+        attempt = 0
+
+        # trial: o anki deneme yarı açık devrenin deneme isteği mi. Sonucu kaydedilmeden
+        # biterse (kalıcı hata, iptal) yeri boşaltılır, yoksa devre yarı açık kilitli kalır
+        try:
+            while True:
+                try:
+                    result = await self._hedged(func, hedge)
+                    self.breaker.record_success()
+                    trial = False
+                    self.bucket.on_success()
+                    return result
+
+                except Exception as e:
+                    self.failures += 1
+                    retryable = is_retryable(e)
+
+                    if isinstance(e, ThrottledError):
+                        self.bucket.on_throttled()
+                    if retryable:
+                        self.breaker.record_failure()
+                        trial = False
+
+                    if not retryable or attempt >= settings.OUTBOUND_MAX_RETRIES:
+                        raise
+
+                    allowed, trial = self.breaker.allow()
+                    if not allowed:
+                        raise
+
+                    attempt += 1
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff_seconds(attempt))
+        finally:
+            if trial:
+                self.breaker.release_trial()
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        # Tam jitter'lı üstel geri çekilme
+        return random.uniform(0, settings.OUTBOUND_RETRY_BASE_DELAY_MS * (2 ** (attempt - 1))) / 1000
+
+    def _hedge_delay_seconds(self) -> float:
+        """
+        Yedek isteğin ne kadar sonra gönderileceği: gözlenen p95, en az ayarlanan değer
+        """
+        p95 = self.latency.percentile(0.95) if self.latency.total >= 20 else None
+        delay_ms = settings.OUTBOUND_HEDGE_DELAY_MS
+        if p95 is not None and p95 != float("inf"):
+            delay_ms = max(delay_ms, p95)
+        return delay_ms / 1000
+
+    async def _timed(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await func()
+        finally:
+            self.latency.record((time.perf_counter() - started) * 1000)
+
+    async def _hedged(self, func: Callable[[], Awaitable[Any]], hedge: bool = True) -> Any:
+        await self.bucket.acquire()
+        primary = asyncio.ensure_future(self._timed(func))
+
+        if not hedge:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay_seconds())
+        if done or not settings.OUTBOUND_HEDGING or not self.bucket.try_acquire():
+            return await primary
+
+        # İlk istek yavaş kaldı, yedek istek gönderilir ve önce biten kazanır
+        self.hedges += 1
+        pending = {primary, asyncio.ensure_future(self._timed(func))}
+        error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = task.exception()
+
+        raise error
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "circuit_state": self.breaker.state,
+            "rate_per_minute": round(self.bucket.rate * 60, 2),
+            "latency": self.latency.snapshot()
+        }
+
+
+_governors: Dict[str, ProviderGovernor] = {}
+_governors_lock = threading.Lock()
+
+_PROVIDER_RATES = {
+    "google_places": lambda: settings.GOOGLE_API_REQUESTS_PER_MINUTE,
+    "openweathermap": lambda: settings.WEATHER_API_REQUESTS_PER_MINUTE,
+    "openai": lambda: settings.AI_REQUESTS_PER_MINUTE
+}
+
+
+def get_governor(provider: str) -> ProviderGovernor:
+    """
+    Sağlayıcının paylaşılan yöneticisini döndürür
+    """
+    governor = _governors.get(provider)
+    if governor is None:
+        with _governors_lock:
+            governor = _governors.get(provider)
+            if governor is None:
+                rate = _PROVIDER_RATES.get(provider, lambda: 60)()
+                governor = ProviderGovernor(provider, rate)
+                _governors[provider] = governor
+    return governor
+
+
+def get_outbound_stats() -> Dict[str, Dict]:
+    return {name: governor.stats() for name, governor in _governors.items()}
+
+
+def list_providers() -> List[str]:
+    return list(_PROVIDER_RATES)
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Aynı anahtar için eş zamanlı çağrıları tek bir hesaplamada birleştirir
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Anahtar için çalışan bir hesaplama varsa onu bekler, yoksa başlatır
+        """
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            self.started += 1
+
+            def _forget(done: asyncio.Future):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            future.add_done_callback(_forget)
+        else:
+            self.coalesced += 1
+
+        # Bekleyenlerden biri iptal edilirse ortak hesaplama iptal olmasın
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,91 @@
+"""
+AI yanıt servisi benchmark'ı
+
+Sahte OpenAI uyumlu sunucuya karşı eş zamanlı istemcilerle ilk token ve tam
+yanıt gecikmelerini ölçer. Aynı soruların ikinci turu önbellekten gelir;
+sunucuya giden istek sayısı önbelleğin ve eş zamanlılık sınırının etkisini
+gösterir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_ai --clients 16 --prompts 8 --llm-tokens 40 --llm-token-delay-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from benchmarks.fake_providers import CHAT_COMPLETIONS_PATH, add_provider_arguments, config_from_args, start_fake_providers
+
+
+def summarize(values: List[float]) -> Dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1)
+    }
+
+
+async def run_round(ai_service, prompts: List[str], clients: int) -> Dict:
+    first_token, full = [], []
+
+    async def client(index: int):
+        started = time.perf_counter()
+        first = None
+        async for _ in ai_service.stream(prompts[index % len(prompts)], {"destination": "Bakü", "days": 3}):
+            if first is None:
+                first = (time.perf_counter() - started) * 1000
+        first_token.append(first)
+        full.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client(index) for index in range(clients)])
+
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "first_token": summarize(first_token),
+        "full_response": summarize(full)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI yanıt servisi benchmark'ı")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--prompts", type=int, default=8)
+    add_provider_arguments(parser)
+    parser.set_defaults(latency_ms=50.0, jitter_ms=10.0, llm_token_delay_ms=20.0)
+    args = parser.parse_args()
+
+    server = start_fake_providers(config_from_args(args))
+    os.environ.update(server.settings_env())
+
+    # Ayarlar ortam değişkenlerinden okunduğu için uygulama modülleri sunucu başladıktan sonra yüklenir
+    from app.services.ai_service import ai_service
+
+    prompts = [f"Bakü'de {index + 1}. gün akşam ne yapılır?" for index in range(args.prompts)]
+
+    async def run_rounds():
+        # İkinci tur aynı soruları sorar, yanıtlar önbellekten gelir
+        return await run_round(ai_service, prompts, args.clients), await run_round(ai_service, prompts, args.clients)
+
+    cold, warm = asyncio.run(run_rounds())
+
+    print(json.dumps({
+        "clients": args.clients,
+        "prompts": args.prompts,
+        "cold": cold,
+        "warm": warm,
+        "upstream_requests": server.requests.get(CHAT_COMPLETIONS_PATH, 0),
+        "ai": ai_service.stats()
+    }, indent=2, ensure_ascii=False))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark sırasında çalıştırılan ASGI uygulaması
+
+Travel router'ını ve eski main.py uygulamasını (/legacy altında) aynı süreçte
+sunar, ayrıca event loop gecikmesini ölçen bir izleyici ekler.
+
+    uvicorn benchmarks.bench_app:app --port 8100
+"""
+import asyncio
+import time
+from typing import List, Optional
+
+from fastapi import FastAPI
+
+from app.routes.travel import router as travel_router
+from main import app as legacy_app
+
+# İzleyicinin uyanma aralığı; gecikme bu sürenin ne kadar aşıldığıdır
+LOOP_LAG_INTERVAL_SECONDS = 0.01
+
+
+class LoopLagMonitor:
+    """
+    Event loop'un ne kadar geç uyandığını örnekleyen izleyici
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval) * 1000)
+
+    def snapshot(self, reset: bool = False) -> dict:
+        samples = sorted(self.samples)
+        if reset:
+            self.samples = []
+
+        if not samples:
+            return {"samples": 0}
+
+        def percentile(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 3)
+
+        return {
+            "samples": len(samples),
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1], 3)
+        }
+
+
+loop_lag = LoopLagMonitor()
+
+app = FastAPI(title="Your Way Ally - Benchmark")
+app.include_router(travel_router)
+app.mount("/legacy", legacy_app)
+
+
+@app.on_event("startup")
+async def start_monitor():
+    loop_lag.start()
+
+
+@app.on_event("shutdown")
+async def stop_monitor():
+    await loop_lag.stop()
+
+
+@app.get("/_bench/ready")
+async def ready():
+    return {"status": "ok"}
+
+
+@app.get("/_bench/loop_lag")
+async def get_loop_lag(reset: bool = False):
+    return loop_lag.snapshot(reset=reset)
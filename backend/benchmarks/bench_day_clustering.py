@@ -0,0 +1,116 @@
+"""
+Günlere coğrafi kümeleme ile mevcut zaman dilimi seçimini karşılaştırır
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_day_clustering --candidates 2000 --days 5
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.geo import cluster_by_day, haversine_km
+from app.services.scoring import CandidatePool, rank_slot_candidates, score_pool
+
+TIME_SLOTS = ["morning", "lunch", "afternoon", "dinner", "evening"]
+SLOT_CATEGORIES = {
+    "morning": ["tourist_attraction", "museum"],
+    "lunch": ["restaurant", "cafe"],
+    "afternoon": ["shopping_mall", "market"],
+    "dinner": ["restaurant", "local_cuisine"],
+    "evening": ["bar", "nightclub"]
+}
+PREFERENCES = {"budget": "mid-range", "cuisine": "local", "activity_level": "moderate"}
+
+
+def build_candidates(count: int, seed: int):
+    """
+    Birkaç semte dağılmış sentetik şehir adayları üretir
+    """
+    rng = np.random.default_rng(seed)
+    categories = sorted({c for slot in SLOT_CATEGORIES.values() for c in slot})
+    neighbourhoods = rng.normal([40.40, 49.87], 0.04, size=(8, 2))
+
+    places = []
+    for i in range(count):
+        center = neighbourhoods[rng.integers(len(neighbourhoods))]
+        lat, lng = rng.normal(center, 0.008)
+        category = categories[i % len(categories)]
+        places.append({
+            "google_place_id": f"place-{i}",
+            "name": f"Place {i}",
+            "category": category,
+            "rating": round(float(rng.uniform(3.0, 5.0)), 1),
+            "price_level": int(rng.integers(0, 5)),
+            "latitude": float(lat),
+            "longitude": float(lng),
+            "opening_hours": bool(rng.integers(0, 2)),
+            "types": [category, "point_of_interest"]
+        })
+    return places
+
+
+def plan_days(pool: CandidatePool, days: int, clustered: bool):
+    weather_by_day = [{} for _ in range(days)]
+    scores = score_pool(pool, PREFERENCES, weather_by_day, TIME_SLOTS)
+    labels = cluster_by_day(pool.latitude, pool.longitude, days) if clustered else None
+
+    plan = []
+    for day in range(days):
+        allowed = None if labels is None else (labels == day) | (labels == -1)
+        picks = []
+        for slot_index, time_slot in enumerate(TIME_SLOTS):
+            slot_scores = scores[day, slot_index]
+            for selected in rank_slot_candidates(pool, slot_scores, SLOT_CATEGORIES[time_slot], 2, allowed):
+                picks.extend(pool.scored_place(index, slot_scores[index]) for index in selected)
+        plan.append(picks)
+    return plan
+
+
+def day_distance_km(picks) -> float:
+    if len(picks) < 2:
+        return 0.0
+    lat = np.array([p["latitude"] for p in picks])
+    lng = np.array([p["longitude"] for p in picks])
+    return float(haversine_km(lat[:-1], lng[:-1], lat[1:], lng[1:]).sum())
+
+
+def run(candidates: int, days: int, repeats: int, seed: int):
+    places = build_candidates(candidates, seed)
+    results = {}
+
+    for name, clustered in (("per_slot", False), ("geo_clustered", True)):
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            pool = CandidatePool(places)
+            plan = plan_days(pool, days, clustered)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        distances = [day_distance_km(picks) for picks in plan]
+        unique = len({p["google_place_id"] for picks in plan for p in picks})
+        results[name] = {
+            "plan_ms_p50": round(float(np.percentile(timings, 50)), 3),
+            "plan_ms_p95": round(float(np.percentile(timings, 95)), 3),
+            "mean_day_distance_km": round(float(np.mean(distances)), 2),
+            "max_day_distance_km": round(float(np.max(distances)), 2),
+            "unique_places": unique
+        }
+
+    return {"candidates": candidates, "days": days, "repeats": repeats, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.candidates, args.days, args.repeats, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
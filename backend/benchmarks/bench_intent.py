@@ -0,0 +1,219 @@
+"""
+Intent sınıflandırıcı mikro benchmark'ı
+
+Kayıtlı Message.user_message satırları üzerinde eski (istek başına kurulan
+kalıp tablosu + ardışık re.search) yöntemle derlenmiş tek geçişli
+sınıflandırıcıyı karşılaştırır. Sonucu farklı çıkan mesajlar örnekleriyle
+raporlanır; gazetteer'ın çözdüğü ekli destinasyonlar ("Bakü'ye") beklenen
+farklardır. Bilinçli farklar PARITY_CASES tablosunda tutulur; tablo her
+çalıştırmada doğrulanır ve beklenmeyen sonuçta çıkış kodu 1 olur.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_intent --db /tmp/bench.db --repeat 5
+    python -m benchmarks.bench_intent --users 100 --messages 20
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.conversation import Message
+from app.services.intent_classifier import intent_classifier
+from benchmarks.seed_db import seed_database
+
+
+def legacy_intent_patterns() -> Dict[str, List[str]]:
+    """
+    Eski ChatbotService.__init__ içinde her istekte kurulan kalıp tablosu
+    """
+    return {
+        "travel_request": [
+            r"(\w+)(\s+için|\s+ye|\s+ya|\s+da|\s+de).*?(\d+)\s*gün",
+            r"(\d+)\s*gün.*?(\w+)(\s+seyahat|\s+gitmek|\s+gideceğim)",
+            r"(\w+)\s+(\d+)\s*günlük\s*plan"
+        ],
+        "feedback": [
+            r"(beğendim|güzel|harika|mükemmel|süper)",
+            r"(beğenmedim|kötü|berbat|hiç iyi değil)",
+            r"(\d+)\s*(puan|yıldız|star)"
+        ],
+        "question": [
+            r"(nedir|nasıl|ne zaman|nerede|kim|hangi)",
+            r"\?",
+            r"(önerir misin|tavsiye|öneri)"
+        ],
+        "greeting": [
+            r"(merhaba|selam|hey|hi|hello)",
+            r"(nasılsın|naber|ne var ne yok)"
+        ]
+    }
+
+
+def legacy_detect_intent(message: str) -> Tuple[str, Dict]:
+    """
+    Eski ChatbotService._detect_intent (karşılaştırma için birebir kopya)
+    """
+    intent_patterns = legacy_intent_patterns()
+    message_lower = message.lower()
+    entities = {}
+
+    for pattern in intent_patterns["travel_request"]:
+        match = re.search(pattern, message_lower)
+        if match:
+            for group in match.groups():
+                if group and group.isdigit():
+                    entities["days"] = int(group)
+                elif group and not group.isdigit() and len(group) > 2:
+                    if group not in ["için", "ye", "ya", "da", "de", "seyahat", "gitmek", "gideceğim", "günlük",
+                                     "plan"]:
+                        entities["destination"] = group.title()
+
+            if "days" in entities and "destination" in entities:
+                return "travel_request", entities
+
+    for pattern in intent_patterns["feedback"]:
+        if re.search(pattern, message_lower):
+            rating_match = re.search(r"(\d+)\s*(puan|yıldız|star)", message_lower)
+            if rating_match:
+                entities["rating"] = int(rating_match.group(1))
+
+            if any(word in message_lower for word in ["beğendim", "güzel", "harika", "mükemmel", "süper"]):
+                entities["sentiment"] = "positive"
+                if "rating" not in entities:
+                    entities["rating"] = 5
+            elif any(word in message_lower for word in ["beğenmedim", "kötü", "berbat", "hiç iyi değil"]):
+                entities["sentiment"] = "negative"
+                if "rating" not in entities:
+                    entities["rating"] = 1
+
+            return "feedback", entities
+
+    for pattern in intent_patterns["question"]:
+        if re.search(pattern, message_lower):
+            return "question", entities
+
+    for pattern in intent_patterns["greeting"]:
+        if re.search(pattern, message_lower):
+            return "greeting", entities
+
+    return "general", entities
+
+
+# (mesaj, eski intent, yeni intent, yeni sonuçta beklenen entity'ler; None: olmamalı)
+PARITY_CASES = [
+    # Aynı kalanlar
+    ("Planı beğendim, 5 puan", "feedback", "feedback", {"rating": 5, "sentiment": "positive"}),
+    ("Roma için öneri var mı?", "question", "question", {}),
+    ("Merhaba", "greeting", "greeting", {}),
+    ("Paris 3 günlük plan", "travel_request", "travel_request", {"destination": "Paris", "days": 3}),
+    ("Kyoto için 4 gün seyahat", "travel_request", "travel_request", {"destination": "Kyoto", "days": 4}),
+    ("5 gün kaldım Paris'te, harikaydı", "feedback", "feedback", {"rating": 5}),
+    # Bilinçli farklar: ekli ve takma adlı destinasyonlar gazetteer'dan çözülür
+    ("Roma'ye 7 günlük gezi planla", "general", "travel_request", {"destination": "Roma", "days": 7}),
+    ("Bakü'ye 5 gün seyahat edeceğim", "general", "travel_request", {"destination": "Bakü", "days": 5}),
+    ("Bakü'den Tiflis'e 4 gün gitmek istiyorum", "general", "travel_request", {"destination": "Tiflis", "days": 4}),
+    # Bilinçli farklar: bağlaç, çıkış noktası ve geçmiş seyahat destinasyon sayılmaz
+    ("güzel bir 3 günlük plan lazım", "travel_request", "feedback", {"sentiment": "positive", "destination": None}),
+    ("bugün için 3 günlük plan", "travel_request", "general", {"days": 3, "destination": None}),
+    ("Bakü'den 3 gün sonra döneceğim", "general", "general", {"destination": None, "days": None}),
+    ("3 gün Paris'te kaldım", "general", "general", {"destination": "Paris", "days": 3})
+]
+
+
+def check_parity() -> List[Dict]:
+    """
+    PARITY_CASES tablosunu iki sınıflandırıcıyla doğrular, tutmayan satırları döndürür
+    """
+    failures = []
+    for message, legacy_intent, intent, entities in PARITY_CASES:
+        legacy = legacy_detect_intent(message)
+        compiled = intent_classifier.classify(message)
+
+        expected = {key: compiled[1].get(key) for key in entities}
+        if legacy[0] != legacy_intent or compiled[0] != intent or expected != entities:
+            failures.append({"message": message, "legacy": legacy, "compiled": compiled})
+
+    return failures
+
+
+def load_messages(path: str, limit: int) -> List[str]:
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as db:
+        rows = db.query(Message.user_message).filter(Message.user_message.isnot(None)).limit(limit).all()
+    engine.dispose()
+    return [row[0] for row in rows]
+
+
+def measure(classify, messages: List[str], repeat: int) -> float:
+    """
+    En iyi turun saniyedeki mesaj sayısı
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            classify(message)
+        best = min(best, time.perf_counter() - started)
+    return len(messages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intent sınıflandırıcı mikro benchmark'ı")
+    parser.add_argument("--db", default=None, help="Mesajların okunacağı SQLite dosyası (yoksa tohumlanır)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--conversations", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = None
+    path = args.db
+    if not path:
+        workdir = tempfile.TemporaryDirectory(prefix="your_way_ally_intent_")
+        path = os.path.join(workdir.name, "intent.db")
+        seed_database(path, args.users, args.conversations, args.messages, args.seed)
+
+    try:
+        messages = load_messages(path, args.limit)
+    finally:
+        if workdir is not None:
+            workdir.cleanup()
+
+    mismatches = [
+        {"message": message, "legacy": legacy, "compiled": compiled}
+        for message in messages
+        for legacy, compiled in [(legacy_detect_intent(message), intent_classifier.classify(message))]
+        if legacy != compiled
+    ]
+
+    parity_failures = check_parity()
+
+    legacy_rate = measure(legacy_detect_intent, messages, args.repeat)
+    compiled_rate = measure(intent_classifier.classify, messages, args.repeat)
+
+    print(json.dumps({
+        "messages": len(messages),
+        "repeat": args.repeat,
+        "legacy_messages_per_second": round(legacy_rate),
+        "compiled_messages_per_second": round(compiled_rate),
+        "speedup": round(compiled_rate / legacy_rate, 2) if legacy_rate else None,
+        "mismatches": len(mismatches),
+        "intent_mismatches": sum(1 for item in mismatches if item["legacy"][0] != item["compiled"][0]),
+        "mismatch_examples": mismatches[:10],
+        "parity_failures": parity_failures
+    }, indent=2, ensure_ascii=False, default=list))
+
+    if parity_failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
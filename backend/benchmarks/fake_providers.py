@@ -0,0 +1,315 @@
+"""
+Google Places text search, OpenWeatherMap ve OpenAI uyumlu sohbet API'si için yerel sahte sunucular
+
+Gecikme, hata oranı ve yanıt boyutu ayarlanabilir. Uygulama
+GOOGLE_PLACES_BASE_URL, OPENWEATHERMAP_BASE_URL ve OPENAI_BASE_URL
+ayarlarıyla bu sunucuya yönlendirilir. Sohbet API'si "stream": true
+isteklerine token'ları SSE parçaları olarak, aralarında bekleyerek gönderir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.fake_providers --port 8765 --latency-ms 150 --error-rate 0.05
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PLACES_PATH = "/maps/api/place/textsearch/json"
+FORECAST_PATH = "/data/2.5/forecast"
+CURRENT_WEATHER_PATH = "/data/2.5/weather"
+CHAT_COMPLETIONS_PATH = "/v1/chat/completions"
+
+PLACE_TYPES = ["restaurant", "cafe", "museum", "park", "tourist_attraction", "shopping_mall", "bar"]
+
+
+@dataclass
+class ProviderConfig:
+    latency_ms: float = 100.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    places_per_page: int = 20
+    places_pages: int = 1
+    forecast_entries: int = 40
+    llm_tokens: int = 30
+    llm_token_delay_ms: float = 5.0
+
+
+def places_payload(query: str, count: int, page: int = 0, pages: int = 1) -> Dict:
+    """
+    Sorguya göre her seferinde aynı çıkan yer listesi, pages > 1 ise next_page_token ile
+    """
+    seed = zlib.crc32(query.encode("utf-8"))
+    center = random.Random(seed)
+    center_lat, center_lng = 40.40 + center.uniform(-0.5, 0.5), 49.87 + center.uniform(-0.5, 0.5)
+
+    rng = random.Random(seed + page)
+    results = []
+    for i in range(page * count, (page + 1) * count):
+        place_type = PLACE_TYPES[rng.randrange(len(PLACE_TYPES))]
+        results.append({
+            "place_id": f"fake-{zlib.crc32(query.encode('utf-8')):08x}-{i}",
+            "name": f"{query.split(' in ')[0].title()} {i + 1}",
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "price_level": rng.randint(0, 4),
+            "formatted_address": f"{i + 1} Sahte Cadde",
+            "geometry": {"location": {
+                "lat": center_lat + rng.gauss(0, 0.02),
+                "lng": center_lng + rng.gauss(0, 0.02)
+            }},
+            "photos": [{"photo_reference": f"photo-{i}"}],
+            "opening_hours": {"open_now": rng.random() > 0.3},
+            "types": [place_type, "point_of_interest", "establishment"]
+        })
+
+    payload = {"status": "OK", "results": results}
+    if page + 1 < pages:
+        payload["next_page_token"] = base64.urlsafe_b64encode(f"{page + 1}|{query}".encode("utf-8")).decode("ascii")
+    return payload
+
+
+def decode_page_token(token: str) -> Tuple[int, str]:
+    page, query = base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8").split("|", 1)
+    return int(page), query
+
+
+def forecast_payload(city: str, entries: int) -> Dict:
+    rng = random.Random(zlib.crc32(city.encode("utf-8")))
+    start = int(time.time()) // 10800 * 10800
+
+    items = []
+    for i in range(entries):
+        temp = rng.uniform(5, 32)
+        items.append({
+            "dt": start + i * 10800,
+            "main": {
+                "temp": round(temp, 1),
+                "feels_like": round(temp - 1, 1),
+                "temp_min": round(temp - 3, 1),
+                "temp_max": round(temp + 3, 1),
+                "humidity": rng.randint(30, 90)
+            },
+            "weather": [{"main": "Clear", "description": "açık"}],
+            "wind": {"speed": round(rng.uniform(0, 10), 1)},
+            "pop": round(rng.random(), 2)
+        })
+
+    return {"cod": "200", "cnt": entries, "list": items, "city": {"name": city}}
+
+
+def current_weather_payload(city: str) -> Dict:
+    forecast = forecast_payload(city, 1)["list"][0]
+    return {
+        "name": city,
+        "main": forecast["main"],
+        "weather": forecast["weather"],
+        "wind": forecast["wind"]
+    }
+
+
+def completion_tokens(messages: List[Dict], count: int) -> List[str]:
+    """
+    Son kullanıcı mesajına göre her seferinde aynı çıkan yanıt parçaları
+    """
+    prompt = messages[-1]["content"] if messages else ""
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+    words = ["Seyahat", "için", "güzel", "bir", "fikir", "öneririm", "şehir", "merkezi", "müze", "yürüyüş"]
+    return [("" if i == 0 else " ") + words[rng.randrange(len(words))] for i in range(count)]
+
+
+def completion_chunk(content: str, finish_reason=None) -> Dict:
+    return {
+        "object": "chat.completion.chunk",
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}]
+    }
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """
+    Sunucu üzerindeki ProviderConfig'e göre yanıt veren istek işleyici
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        config: ProviderConfig = self.server.config
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        self.server.record(parsed.path)
+        time.sleep(max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+
+        if random.random() < config.throttle_rate:
+            self._send(429, {"error": "rate limited"})
+            return
+
+        if random.random() < config.error_rate:
+            self._send(500, {"error": "fake provider failure"})
+            return
+
+        if parsed.path == PLACES_PATH and "pagetoken" in params:
+            page, query = decode_page_token(params["pagetoken"])
+            self._send(200, places_payload(query, config.places_per_page, page, config.places_pages))
+        elif parsed.path == PLACES_PATH:
+            self._send(200, places_payload(params.get("query", ""), config.places_per_page, 0, config.places_pages))
+        elif parsed.path == FORECAST_PATH:
+            self._send(200, forecast_payload(params.get("q", ""), config.forecast_entries))
+        elif parsed.path == CURRENT_WEATHER_PATH:
+            self._send(200, current_weather_payload(params.get("q", "")))
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        config: ProviderConfig = self.server.config
+        parsed = urlparse(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        self.server.record(parsed.path)
+        time.sleep(max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+
+        if parsed.path != CHAT_COMPLETIONS_PATH:
+            self._send(404, {"error": "not found"})
+            return
+
+        if random.random() < config.throttle_rate:
+            self._send(429, {"error": "rate limited"})
+            return
+
+        if random.random() < config.error_rate:
+            self._send(500, {"error": "fake provider failure"})
+            return
+
+        tokens = completion_tokens(body.get("messages", []), min(config.llm_tokens, body.get("max_tokens") or config.llm_tokens))
+
+        if not body.get("stream"):
+            self._send(200, {
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}]
+            })
+            return
+
+        # Her token ayrı bir chunked parça olarak, üretiliyormuş gibi aralıklarla gönderilir
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for token in tokens:
+                time.sleep(config.llm_token_delay_ms / 1000)
+                self._write_chunk(f"data: {json.dumps(completion_chunk(token), ensure_ascii=False)}\n\n")
+            self._write_chunk(f"data: {json.dumps(completion_chunk('', 'stop'))}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci akışı yarıda bıraktı
+            self.close_connection = True
+
+    def _write_chunk(self, text: str):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: ProviderConfig):
+        super().__init__(address, FakeProviderHandler)
+        self.config = config
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def settings_env(self) -> Dict[str, str]:
+        """
+        Uygulamayı bu sunucuya yönlendiren ortam değişkenleri
+        """
+        return {
+            "GOOGLE_PLACES_BASE_URL": f"{self.base_url}/maps/api/place",
+            "OPENWEATHERMAP_BASE_URL": f"{self.base_url}/data/2.5",
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+            "OPENAI_API_KEY": "fake-key"
+        }
+
+
+def start_fake_providers(config: ProviderConfig, host: str = "127.0.0.1", port: int = 0) -> FakeProviderServer:
+    """
+    Sunucuyu arka plan thread'inde başlatır (port 0: boş port seçilir)
+    """
+    server = FakeProviderServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_provider_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--places-per-page", type=int, default=20)
+    parser.add_argument("--places-pages", type=int, default=1)
+    parser.add_argument("--forecast-entries", type=int, default=40)
+    parser.add_argument("--llm-tokens", type=int, default=30)
+    parser.add_argument("--llm-token-delay-ms", type=float, default=5.0)
+
+
+def config_from_args(args: argparse.Namespace) -> ProviderConfig:
+    return ProviderConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        places_per_page=args.places_per_page,
+        places_pages=args.places_pages,
+        forecast_entries=args.forecast_entries,
+        llm_tokens=args.llm_tokens,
+        llm_token_delay_ms=args.llm_token_delay_ms
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte Places/Weather/LLM sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeProviderServer((args.host, args.port), config_from_args(args))
+    for key, value in server.settings_env().items():
+        print(f"{key}={value}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
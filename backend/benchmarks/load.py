@@ -0,0 +1,277 @@
+"""
+Uçtan uca yük ve gecikme benchmark'ı
+
+Sahte Places/Weather sunucusunu ve tohumlanmış SQLite veritabanını hazırlar,
+benchmarks.bench_app uygulamasını ayrı bir uvicorn sürecinde başlatır ve her
+endpoint için p50/p95/p99 gecikme, saniyedeki istek ve event loop gecikmesini
+JSON olarak raporlar.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.load --duration 15 --concurrency 16 --output before.json
+    python -m benchmarks.load --endpoints plan --latency-ms 400 --error-rate 0.1
+    python -m benchmarks.load --target http://127.0.0.1:8000 --endpoints chat
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.fake_providers import add_provider_arguments, config_from_args, start_fake_providers
+from benchmarks.seed_db import DESTINATIONS, seed_database, user_id_for
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_MESSAGES = [
+    "{destination}'ye {days} günlük gezi planla",
+    "{destination} için neler önerirsin?",
+    "Merhaba",
+    "Planı beğendim, 4 puan"
+]
+
+# Endpoint adı -> (path, payload üreticisi)
+Scenario = Tuple[str, Callable[[random.Random, argparse.Namespace], Dict]]
+
+
+def _plan_payload(rng: random.Random, args: argparse.Namespace) -> Dict:
+    return {
+        "user_id": user_id_for(rng.randrange(args.users)),
+        "destination": rng.choice(DESTINATIONS),
+        "days": rng.randint(1, 5)
+    }
+
+
+def _chat_payload(rng: random.Random, args: argparse.Namespace) -> Dict:
+    return {
+        "user_id": user_id_for(rng.randrange(args.users)),
+        "message": rng.choice(CHAT_MESSAGES).format(destination=rng.choice(DESTINATIONS), days=rng.randint(1, 5))
+    }
+
+
+def _feedback_payload(rng: random.Random, args: argparse.Namespace) -> Dict:
+    return {
+        "conversation_id": rng.randint(1, args.users * args.conversations),
+        "recommendation_id": f"fake-{rng.randrange(1000)}",
+        "recommendation_name": "Benchmark Mekanı",
+        "recommendation_type": rng.choice(["restaurant", "museum", "park"]),
+        "rating": rng.randint(1, 5),
+        "day_number": rng.randint(1, 5),
+        "time_slot": rng.choice(["morning", "lunch", "afternoon", "dinner", "evening"])
+    }
+
+
+def _legacy_chat_payload(rng: random.Random, args: argparse.Namespace) -> Dict:
+    return {"message": rng.choice(["Bakü 5 gün", "İstanbul 3 gün", "merhaba"]), "user_id": "bench"}
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "plan": ("/travel/plan", _plan_payload),
+    "chat": ("/travel/chat", _chat_payload),
+    "feedback": ("/travel/feedback", _feedback_payload),
+    "legacy_chat": ("/legacy/chat", _legacy_chat_payload)
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 3)
+
+
+def run_scenario(
+        base_url: str,
+        name: str,
+        duration: float,
+        concurrency: int,
+        args: argparse.Namespace
+) -> Dict:
+    """
+    Kapalı döngü yük: her worker bir yanıt aldıktan sonra sıradaki isteği gönderir
+    """
+    path, build_payload = SCENARIOS[name]
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int):
+        rng = random.Random(f"{args.seed}-{name}-{index}")
+        session = requests.Session()
+        local_latencies = []
+        local_statuses: Dict[str, int] = {}
+
+        while time.perf_counter() < deadline:
+            payload = build_payload(rng, args)
+            started = time.perf_counter()
+            try:
+                status = str(session.post(f"{base_url}{path}", json=payload, timeout=args.request_timeout).status_code)
+            except requests.RequestException as e:
+                status = type(e).__name__
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+
+        session.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                status_counts[status] = status_counts.get(status, 0) + count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in status_counts.items() if not status.startswith("2"))
+
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": errors,
+        "status_counts": status_counts,
+        "duration_seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": round(latencies[-1], 3) if latencies else None
+        }
+    }
+
+
+def _get_json(url: str) -> Optional[Dict]:
+    try:
+        response = requests.get(url, timeout=5)
+        return response.json() if response.ok else None
+    except requests.RequestException:
+        return None
+
+
+def start_app(port: int, env: Dict[str, str], timeout: float = 30.0) -> subprocess.Popen:
+    """
+    Benchmark uygulamasını ayrı süreçte başlatır ve hazır olmasını bekler
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.bench_app:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env}
+    )
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Benchmark uygulaması başlatılamadı (çıkış kodu {process.returncode})")
+        if _get_json(f"http://127.0.0.1:{port}/_bench/ready"):
+            return process
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("Benchmark uygulaması zamanında hazır olmadı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca yük ve gecikme benchmark'ı")
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help=f"Virgülle ayrılmış: {', '.join(SCENARIOS)}")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--target", default=None, help="Çalışan bir sunucuyu ölç (sahte sunucu ve DB kurulmaz)")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--conversations", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Sonuç JSON dosyası (varsayılan: stdout)")
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Bilinmeyen endpoint: {', '.join(unknown)}")
+
+    provider_config = config_from_args(args)
+    providers = None
+    process = None
+    database = None
+    workdir = None
+
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            workdir = tempfile.TemporaryDirectory(prefix="your_way_ally_bench_")
+            database = seed_database(
+                os.path.join(workdir.name, "bench.db"),
+                args.users, args.conversations, args.messages, args.seed
+            )
+            providers = start_fake_providers(provider_config)
+
+            process = start_app(args.port, {
+                "DATABASE_URL": f"sqlite:///{database['path']}",
+                "GOOGLE_PLACES_API_KEY": "bench",
+                "WEATHER_API_KEY": "bench",
+                "PLAN_JOB_WORKERS": "0",
+                **providers.settings_env()
+            })
+            base_url = f"http://127.0.0.1:{args.port}"
+
+        results = {}
+        for name in endpoints:
+            if args.warmup > 0:
+                run_scenario(base_url, name, args.warmup, args.concurrency, args)
+
+            _get_json(f"{base_url}/_bench/loop_lag?reset=true")
+            result = run_scenario(base_url, name, args.duration, args.concurrency, args)
+            result["loop_lag_ms"] = _get_json(f"{base_url}/_bench/loop_lag?reset=true")
+            results[name] = result
+
+        report = {
+            "started_at": datetime.utcnow().isoformat(),
+            "target": base_url,
+            "config": {
+                "duration_seconds": args.duration,
+                "warmup_seconds": args.warmup,
+                "concurrency": args.concurrency,
+                "seed": args.seed,
+                "providers": vars(provider_config)
+            },
+            "database": database,
+            "provider_requests": dict(providers.requests) if providers else None,
+            "app_metrics": (_get_json(f"{base_url}/travel/metrics") or {}).get("data"),
+            "endpoints": results
+        }
+
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if providers is not None:
+            providers.shutdown()
+        if workdir is not None:
+            workdir.cleanup()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Sonuçlar yazıldı: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
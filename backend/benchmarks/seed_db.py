@@ -0,0 +1,139 @@
+"""
+Benchmark için tohumlanmış (deterministik) SQLite veritabanı oluşturur
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.seed_db --path /tmp/bench.db --users 200 --conversations 5 --messages 20
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.utils.database import Base
+from app.models.conversation import Conversation, Message, TravelFeedback, UserPreference
+from app.models.user import User
+
+DESTINATIONS = ["Bakü", "İstanbul", "Paris", "Roma", "Londra", "Tiflis"]
+USER_MESSAGES = [
+    "{destination}'ye {days} günlük gezi planla",
+    "{destination} için öneri var mı?",
+    "Planı beğendim, 5 puan",
+    "{destination}'de hava nasıl?",
+    "Merhaba",
+    "Müzeleri daha çok görmek istiyorum"
+]
+PREFERENCE_TYPES = ["restaurant", "museum", "park", "cafe", "shopping_mall"]
+
+
+def user_id_for(index: int) -> str:
+    return f"bench_user_{index}"
+
+
+def seed_database(
+        path: str,
+        users: int = 200,
+        conversations_per_user: int = 5,
+        messages_per_conversation: int = 20,
+        seed: int = 0
+) -> Dict:
+    """
+    Veritabanını sıfırdan oluşturur ve özet sayıları döndürür
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    conversation_rows = []
+    for user_index in range(users):
+        for _ in range(conversations_per_user):
+            conversation_rows.append({
+                "user_id": user_id_for(user_index),
+                "destination": rng.choice(DESTINATIONS),
+                "days": rng.randint(1, 7),
+                "is_active": rng.random() < 0.2,
+                "created_at": now - timedelta(days=rng.randint(0, 365))
+            })
+
+    with Session(engine) as db:
+        db.bulk_insert_mappings(User, [
+            {"user_id": user_id_for(i), "username": user_id_for(i), "email": f"{user_id_for(i)}@example.com"}
+            for i in range(users)
+        ])
+        db.bulk_insert_mappings(Conversation, conversation_rows)
+        db.bulk_insert_mappings(UserPreference, [
+            {
+                "user_id": user_id_for(i),
+                "preference_type": preference_type,
+                "preference_value": "liked",
+                "weight": rng.randint(1, 5)
+            }
+            for i in range(users)
+            for preference_type in rng.sample(PREFERENCE_TYPES, 2)
+        ])
+        db.commit()
+
+        # SQLite id'leri 1'den başlayarak sırayla verir
+        message_rows = []
+        feedback_rows = []
+        for conversation_id, conversation in enumerate(conversation_rows, start=1):
+            timestamp = conversation["created_at"]
+            for _ in range(messages_per_conversation):
+                timestamp += timedelta(seconds=rng.randint(5, 600))
+                message_rows.append({
+                    "conversation_id": conversation_id,
+                    "user_message": rng.choice(USER_MESSAGES).format(
+                        destination=conversation["destination"],
+                        days=conversation["days"]
+                    ),
+                    "bot_response": json.dumps({"message": "Tamam"}, ensure_ascii=False),
+                    "timestamp": timestamp
+                })
+
+            if rng.random() < 0.3:
+                feedback_rows.append({
+                    "conversation_id": conversation_id,
+                    "recommendation_id": "general_plan",
+                    "recommendation_type": "general",
+                    "recommendation_name": "Travel Plan",
+                    "rating": rng.randint(1, 5)
+                })
+
+        db.bulk_insert_mappings(Message, message_rows)
+        db.bulk_insert_mappings(TravelFeedback, feedback_rows)
+        db.commit()
+
+    engine.dispose()
+
+    return {
+        "path": path,
+        "users": users,
+        "conversations": len(conversation_rows),
+        "messages": len(message_rows),
+        "feedback": len(feedback_rows),
+        "seed": seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark veritabanı oluşturucu")
+    parser.add_argument("--path", default="bench.db")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--conversations", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(seed_database(args.path, args.users, args.conversations, args.messages, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()